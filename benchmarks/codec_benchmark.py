@@ -0,0 +1,227 @@
+"""
+Microbenchmark of the JSON handling of the Camunda REST calls on realistic job activation and variable search payloads.
+
+Reports CPU time per call, as json, for encoding the request body and decoding the response body:
+  - before: json.dumps of the payload and response.json() of requests
+  - after: the payload template or JsonCodec.encode, and a single JsonCodec.decode_response, for each installed backend
+
+Usage:
+    python -m benchmarks.codec_benchmark --iterations 2000 --output codec_benchmark.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+import requests
+
+# the services import each other from the src directory, as they do in the worker image
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from helpers.json_codec import JsonCodec, orjson
+
+# Job type and worker name of the activations
+JOB_TYPE = "retrieve-animal-image"
+WORKER_NAME = "animal-image-worker"
+
+def create_activation_response(jobs: int) -> bytes:
+    """
+    Creates the body of a job activation response, shaped like the jobs returned by the Zeebe REST gateway
+
+    Args:
+        jobs (int): Number of activated jobs
+
+    Returns:
+        bytes: Response body
+    """
+
+    return json.dumps({
+        "jobs": [
+            {
+                "jobKey": str(2251799813685249 + job),
+                "type": JOB_TYPE,
+                "processInstanceKey": str(2251799813690000 + job),
+                "processDefinitionId": "Process_AnimalImageRetrieval",
+                "processDefinitionVersion": 3,
+                "processDefinitionKey": "2251799813685200",
+                "elementId": "Activity_RetrieveAnimalImage",
+                "elementInstanceKey": str(2251799813695000 + job),
+                "worker": WORKER_NAME,
+                "retries": 3,
+                "deadline": 1760000000000 + job,
+                "tenantId": "<default>",
+                "customHeaders": {},
+                "variables": { "animal": ("dog", "duck", "fox")[job % 3], "correlation_id": f"0f8fad5b-d9cb-469f-a165-7067{job:08d}" }
+            }
+            for job in range(jobs)
+        ]
+    }).encode()
+
+
+def create_search_response(variables: int) -> bytes:
+    """
+    Creates the body of a variable search response, shaped like the variables returned by the Zeebe REST gateway
+
+    Args:
+        variables (int): Number of variables found
+
+    Returns:
+        bytes: Response body
+    """
+
+    return json.dumps({
+        "items": [
+            {
+                "variableKey": str(2251799813700000 + variable),
+                "name": "animal_url",
+                "value": json.dumps(f"https://random.dog/{variable:04d}-a1b2c3d4.jpg"),
+                "isTruncated": False,
+                "scopeKey": str(2251799813690000 + variable),
+                "processInstanceKey": str(2251799813690000 + variable),
+                "tenantId": "<default>"
+            }
+            for variable in range(variables)
+        ],
+        "page": { "totalItems": variables }
+    }).encode()
+
+
+def create_response(body: bytes) -> requests.Response:
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = body
+
+    return response
+
+
+def measure(call: Callable[[], object], iterations: int) -> float:
+    """
+    Measures the CPU time of a call
+
+    Args:
+        call (Callable[[], object]): Call to measure
+        iterations (int): Number of calls
+
+    Returns:
+        float: CPU seconds per call
+    """
+
+    # warm up caches and lazily created state
+    for _ in range(min(iterations, 100)):
+        call()
+
+    started_at = time.process_time()
+
+    for _ in range(iterations):
+        call()
+
+    return (time.process_time() - started_at) / iterations
+
+
+def run_benchmark(iterations: int = 2000, jobs: int = 32, variables: int = 100) -> dict:
+    """
+    Measures the CPU time per call of the activation and search round trips, before and after
+
+    Args:
+        iterations (int): Calls measured per variant
+        jobs (int): Jobs per activation response
+        variables (int): Variables per search response, and process instances per search request
+
+    Returns:
+        dict: Benchmark parameters and results
+    """
+
+    activation_response = create_response(create_activation_response(jobs))
+    search_response = create_response(create_search_response(variables))
+    process_instance_keys = [str(2251799813690000 + variable) for variable in range(variables)]
+
+    def search_payload() -> dict:
+        return {
+            "filter": { "name": "animal_url", "processInstanceKey": { "$in": process_instance_keys } },
+            "page": { "from": 0, "limit": len(process_instance_keys) }
+        }
+
+    def activate_before():
+        payload = { "type": JOB_TYPE, "timeout": 60000, "maxJobsToActivate": jobs, "requestTimeout": 20000, "worker": WORKER_NAME }
+        json.dumps(payload)
+        return activation_response.json().get("jobs")
+
+    def search_before():
+        json.dumps(search_payload())
+        return search_response.json().get("items")
+
+    variants = { "before": { "activation": activate_before, "search": search_before } }
+
+    for backend in ("json", "orjson") if orjson is not None else ("json",):
+        codec = JsonCodec(backend)
+        template = codec.template(type=JOB_TYPE, worker=WORKER_NAME)
+
+        def activate_after(codec=codec, template=template):
+            template.render(timeout=60000, maxJobsToActivate=jobs, requestTimeout=20000)
+            return codec.decode_response(activation_response).get("jobs")
+
+        def search_after(codec=codec):
+            codec.encode(search_payload())
+            return codec.decode_response(search_response).get("items")
+
+        variants[f"after_{backend}"] = { "activation": activate_after, "search": search_after }
+
+    results = {
+        variant: {
+            operation: { "cpu_microseconds_per_call": measure(call, iterations) * 1e6 }
+            for operation, call in calls.items()
+        }
+        for variant, calls in variants.items()
+    }
+
+    for variant, operations in results.items():
+        for operation, result in operations.items():
+            result["speedup"] = results["before"][operation]["cpu_microseconds_per_call"] / result["cpu_microseconds_per_call"]
+
+    return {
+        "benchmark": "json_codec",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            "iterations": iterations,
+            "jobs": jobs,
+            "variables": variables,
+            "activation_response_bytes": len(activation_response.content),
+            "search_response_bytes": len(search_response.content)
+        },
+        "results": results
+    }
+
+
+def parse_args(args: list[str] | None = None) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="Benchmark the JSON handling of the Camunda REST calls.")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls measured per variant")
+    parser.add_argument("--jobs", type=int, default=32, help="jobs per activation response")
+    parser.add_argument("--variables", type=int, default=100, help="variables per search response")
+    parser.add_argument("--output", help="file the json results are written to. Printed if not set")
+
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+
+    arguments = parse_args()
+
+    benchmark_results = run_benchmark(iterations=arguments.iterations, jobs=arguments.jobs, variables=arguments.variables)
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as output_file:
+            json.dump(benchmark_results, output_file, indent=2)
+    else:
+        print(json.dumps(benchmark_results, indent=2))
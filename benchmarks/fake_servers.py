@@ -0,0 +1,280 @@
+"""
+Local stand-ins for the OAuth server, the Zeebe REST gateway and the animal APIs, with configurable latencies
+"""
+
+import base64
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Paths of the fake animal APIs and the json property holding the image url, matching animal_api_url and RESPONSE_BODY_PROP
+ANIMAL_API_PATHS = {
+    "dog": ("/woof.json", "url"),
+    "duck": ("/api/v2/random", "url"),
+    "fox": ("/floof", "image")
+}
+
+# Paths of the job result endpoints and the outcome they report
+JOB_RESULT_PATH = re.compile(r"^/v2/jobs/(?P<job_key>[^/]+)/(?P<outcome>completion|error|failure)$")
+
+class LatencyDistribution:
+    """
+    Latency of a fake endpoint, parsed from a spec such as "constant:0.01", "uniform:0.01:0.05" or "lognormal:0.05:0.5"
+    (median and sigma). All values are in seconds.
+    """
+
+    def __init__(self, spec: str = "constant:0"):
+
+        self.spec = spec
+
+        kind, *params = spec.split(":")
+        params = [float(param) for param in params]
+
+        if kind == "constant" and len(params) == 1:
+            self._sample = lambda: params[0]
+        elif kind == "uniform" and len(params) == 2:
+            self._sample = lambda: random.uniform(*params)
+        elif kind == "lognormal" and len(params) == 2:
+            self._sample = lambda: params[0] * math.exp(random.gauss(0, params[1]))
+        else:
+            raise ValueError(f"Invalid latency distribution '{spec}'.")
+
+
+    def sample(self) -> float:
+
+        return self._sample()
+
+
+    def sleep(self):
+
+        time.sleep(self.sample())
+
+
+def create_token(lifetime_seconds: int = 3600) -> str:
+    """
+    Creates an unsigned JWT with an expiry, as returned by the fake OAuth server
+
+    Args:
+        lifetime_seconds (int): Seconds until the token expires
+
+    Returns:
+        str: Access token
+    """
+
+    def encode(claims: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+
+    return f"{encode({ 'alg': 'none' })}.{encode({ 'exp': int(time.time()) + lifetime_seconds })}.signature"
+
+
+class FakeZeebeState:
+    """
+    Jobs of the fake gateway. Jobs become available at a given arrival rate and the time from arrival to reported
+    outcome is recorded for each job.
+    """
+
+    def __init__(self, jobs: int, arrival_rate: float, animals: list[str]):
+
+        self.jobs = jobs
+        self.arrival_rate = arrival_rate
+        self.animals = animals
+
+        self._condition = threading.Condition()
+        self._started_at = None
+        self._next_job = 0
+        self._outcomes = {}
+        self._latencies = []
+
+
+    def start(self):
+
+        with self._condition:
+            self._started_at = time.monotonic()
+            self._condition.notify_all()
+
+
+    def _arrived(self, now: float) -> int:
+        """
+        Gets the number of jobs that have arrived so far
+        """
+
+        if self._started_at is None:
+            return 0
+
+        if not self.arrival_rate:
+            return self.jobs
+
+        return min(self.jobs, int((now - self._started_at) * self.arrival_rate))
+
+
+    def _arrival_time(self, job_index: int) -> float:
+
+        return self._started_at + (job_index / self.arrival_rate if self.arrival_rate else 0)
+
+
+    def activate(self, max_jobs: int, request_timeout: float) -> list[dict]:
+        """
+        Hands out up to max_jobs available jobs, holding the request open until jobs arrive or the request timeout expires.
+        """
+
+        deadline = time.monotonic() + request_timeout
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                available = self._arrived(now) - self._next_job
+
+                if available > 0 or now >= deadline or self._next_job >= self.jobs:
+                    break
+
+                # wake up when the next job arrives, or at the deadline
+                next_arrival = self._arrival_time(self._next_job) if self._started_at is not None else deadline
+                self._condition.wait(max(min(next_arrival, deadline) - now, 0.001))
+
+            first_job = self._next_job
+            self._next_job += max(min(available, max_jobs), 0)
+
+        return [
+            {
+                "jobKey": str(job_index),
+                "type": "retrieve-animal-image",
+                "variables": { "animal": self.animals[job_index % len(self.animals)] }
+            }
+            for job_index in range(first_job, self._next_job)
+        ]
+
+
+    def report(self, job_key: str, outcome: str):
+
+        now = time.monotonic()
+
+        with self._condition:
+            if job_key not in self._outcomes:
+                self._outcomes[job_key] = outcome
+                self._latencies.append(now - self._arrival_time(int(job_key)))
+
+
+    def get_stats(self) -> dict:
+
+        with self._condition:
+            outcomes = list(self._outcomes.values())
+
+            return {
+                "jobs": self.jobs,
+                "activated": self._next_job,
+                "reported": len(outcomes),
+                "outcomes": { outcome: outcomes.count(outcome) for outcome in ("completion", "error", "failure") },
+                "latencies": list(self._latencies)
+            }
+
+
+def create_handler(state: FakeZeebeState, zeebe_latency: LatencyDistribution, animal_latency: LatencyDistribution):
+    """
+    Creates the request handler of the fake server, which serves the OAuth, gateway and animal API endpoints.
+    """
+
+    class FakeHandler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+
+        # keeps small keep-alive responses from being held back by delayed acknowledgements
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+
+        def _read_body(self) -> bytes:
+
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+
+        def _send_json(self, body: dict, status: int = 200):
+
+            content = json.dumps(body).encode()
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+
+        def do_GET(self):
+
+            for animal, (path, response_property) in ANIMAL_API_PATHS.items():
+                if self.path == path:
+                    animal_latency.sleep()
+                    return self._send_json({ response_property: f"http://{self.headers.get('Host')}/images/{animal}-{random.getrandbits(32)}.jpg" })
+
+            if self.path == "/stats":
+                return self._send_json(state.get_stats())
+
+            self._send_json({ "error": "Not found" }, status=404)
+
+
+        def do_POST(self):
+
+            body = self._read_body()
+
+            if self.path == "/oauth/token":
+                return self._send_json({ "access_token": create_token(), "expires_in": 3600 })
+
+            if self.path == "/start":
+                state.start()
+                return self._send_json({})
+
+            if self.path == "/v2/jobs/activation":
+                request = json.loads(body)
+                zeebe_latency.sleep()
+                jobs = state.activate(request.get("maxJobsToActivate", 1), request.get("requestTimeout", 0) / 1000)
+                return self._send_json({ "jobs": jobs })
+
+            job_result = JOB_RESULT_PATH.match(self.path)
+
+            if job_result:
+                zeebe_latency.sleep()
+                state.report(job_result.group("job_key"), job_result.group("outcome"))
+
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self._send_json({ "error": "Not found" }, status=404)
+
+    return FakeHandler
+
+
+class FakeServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    # the worker opens many keep-alive connections at once
+    request_queue_size = 256
+
+
+def serve(jobs: int, arrival_rate: float, zeebe_latency: str, animal_latency: str, port_queue):
+    """
+    Runs the fake server until the process is terminated. Meant to run in its own process, so that its CPU time is not
+    counted against the worker being benchmarked.
+
+    Args:
+        jobs (int): Number of jobs served by the fake gateway
+        arrival_rate (float): Jobs per second becoming available after /start. 0 makes all jobs available at once
+        zeebe_latency (str): Latency distribution of the gateway endpoints
+        animal_latency (str): Latency distribution of the animal APIs
+        port_queue: Queue on which the port of the server is put once it is listening
+    """
+
+    state = FakeZeebeState(jobs=jobs, arrival_rate=arrival_rate, animals=list(ANIMAL_API_PATHS))
+    handler = create_handler(state, LatencyDistribution(zeebe_latency), LatencyDistribution(animal_latency))
+
+    server = FakeServer(("127.0.0.1", 0), handler)
+
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
@@ -0,0 +1,233 @@
+"""
+Benchmark of the job worker against local stand-ins for the OAuth server, the Zeebe REST gateway and the animal APIs.
+
+Reports jobs per second, percentiles of the time from a job becoming available to its outcome being reported, and CPU
+time of the worker per job, as json. The fake servers run in a separate process so that only the worker's CPU time is counted.
+
+Usage:
+    python -m benchmarks.worker_benchmark --jobs 1000 --animal-latency lognormal:0.05:0.5 --output worker_benchmark.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+# the worker modules import each other from the src directory, as they do in the worker image
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from benchmarks.fake_servers import ANIMAL_API_PATHS, serve
+from helpers.activation_scheduler import ActivationScheduler
+from helpers.config import JobWorkerConfig
+from helpers.http_transport import HttpTransport
+from job_worker import main as job_worker
+from service.animal_api_service import AnimalService
+from service.camunda_service import CamundaService
+from service.result_reporter import ResultReporter
+
+# Seconds to wait for the fake server to start listening
+SERVER_START_TIMEOUT_SECONDS = 10
+
+def percentile(values: list[float], percentile: float) -> float | None:
+    """
+    Gets a percentile of the values using the nearest-rank method
+
+    Args:
+        values (list[float]): Values
+        percentile (float): Percentile between 0 and 100
+
+    Returns:
+        float | None: Percentile. None if there are no values.
+    """
+
+    if not values:
+        return None
+
+    values = sorted(values)
+    rank = max(int(round(percentile / 100 * len(values))) - 1, 0)
+
+    return values[min(rank, len(values) - 1)]
+
+
+def start_fake_server(jobs: int, arrival_rate: float, zeebe_latency: str, animal_latency: str) -> tuple[multiprocessing.Process, str]:
+    """
+    Starts the fake servers in a separate process
+
+    Returns:
+        tuple[multiprocessing.Process, str]: Server process and base url of the server
+    """
+
+    context = multiprocessing.get_context("spawn")
+    port_queue = context.Queue()
+
+    server_process = context.Process(target=serve, args=(jobs, arrival_rate, zeebe_latency, animal_latency, port_queue), daemon=True)
+    server_process.start()
+
+    return server_process, f"http://127.0.0.1:{port_queue.get(timeout=SERVER_START_TIMEOUT_SECONDS)}"
+
+
+def run_benchmark(jobs: int = 500,
+                  max_concurrent_jobs: int = 5,
+                  arrival_rate: float = 0,
+                  zeebe_latency: str = "constant:0.002",
+                  animal_latency: str = "lognormal:0.02:0.5",
+                  request_timeout_ms: int = 1000,
+                  result_reporter: bool = True,
+                  prefetch: bool = False,
+                  activation_scheduler: bool = True) -> dict:
+    """
+    Runs the job worker until all jobs of the fake gateway have been handled and their outcomes reported
+
+    Args:
+        jobs (int): Number of jobs to handle
+        max_concurrent_jobs (int): Jobs handled concurrently by the worker
+        arrival_rate (float): Jobs per second becoming available. 0 makes all jobs available at once
+        zeebe_latency (str): Latency distribution of the gateway endpoints, e.g. "constant:0.002"
+        animal_latency (str): Latency distribution of the animal APIs, e.g. "lognormal:0.02:0.5"
+        request_timeout_ms (int): Long-polling period of the activation requests
+        result_reporter (bool): Reports the job outcomes from background senders
+        prefetch (bool): Prefetches animal image urls
+        activation_scheduler (bool): Sizes the activations from the load
+
+    Returns:
+        dict: Benchmark parameters and results
+    """
+
+    server_process, base_url = start_fake_server(jobs, arrival_rate, zeebe_latency, animal_latency)
+
+    try:
+        transport = HttpTransport(pool_maxsize=max(20, max_concurrent_jobs * 2))
+
+        camunda_service = CamundaService(
+            base_url=base_url,
+            token_audience="benchmark",
+            client_id="benchmark",
+            client_secret="benchmark",
+            auth_url=f"{base_url}/oauth/token",
+            transport=transport
+        )
+
+        animal_service = AnimalService(
+            prefetch=prefetch,
+            animal_api_url={ animal: f"{base_url}{path}" for animal, (path, _) in ANIMAL_API_PATHS.items() }
+        )
+
+        reporter = ResultReporter(camunda_service) if result_reporter else None
+        executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="job")
+        job_slots = threading.Semaphore(max_concurrent_jobs)
+        worker_config = JobWorkerConfig(max_concurrent_jobs=max_concurrent_jobs, request_timeout_ms=request_timeout_ms)
+        scheduler = ActivationScheduler(max_concurrent_jobs=max_concurrent_jobs) if activation_scheduler else None
+
+        # request the token before the clock starts
+        camunda_service.get_token()
+        transport.post(f"{base_url}/start")
+
+        started_at = time.monotonic()
+        cpu_started_at = time.process_time()
+        activated = 0
+
+        while activated < jobs:
+            activated += len(job_worker.main(camunda_service, animal_service, executor, job_slots, worker_config, reporter, scheduler) or [])
+
+        executor.shutdown(wait=True)
+
+        if reporter:
+            reporter.flush()
+            reporter.close()
+
+        duration = time.monotonic() - started_at
+        cpu_seconds = time.process_time() - cpu_started_at
+
+        animal_service.close()
+        stats = requests.get(f"{base_url}/stats", timeout=10).json()
+
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+    latencies = stats.pop("latencies")
+
+    return {
+        "benchmark": "job_worker",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            "jobs": jobs,
+            "max_concurrent_jobs": max_concurrent_jobs,
+            "arrival_rate": arrival_rate,
+            "zeebe_latency": zeebe_latency,
+            "animal_latency": animal_latency,
+            "request_timeout_ms": request_timeout_ms,
+            "result_reporter": result_reporter,
+            "prefetch": prefetch,
+            "activation_scheduler": activation_scheduler
+        },
+        "results": {
+            "duration_seconds": duration,
+            "jobs_per_second": stats["reported"] / duration,
+            "completion_latency_seconds": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies, default=None)
+            },
+            "cpu_seconds_per_job": cpu_seconds / max(stats["reported"], 1),
+            "reported": stats["reported"],
+            "outcomes": stats["outcomes"]
+        }
+    }
+
+
+def parse_args(args: list[str] | None = None) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="Benchmark the job worker against local fake servers.")
+    parser.add_argument("--jobs", type=int, default=500, help="number of jobs to handle")
+    parser.add_argument("--max-concurrent-jobs", type=int, default=5, help="jobs handled concurrently by the worker")
+    parser.add_argument("--arrival-rate", type=float, default=0, help="jobs per second becoming available. 0 makes all jobs available at once")
+    parser.add_argument("--zeebe-latency", default="constant:0.002", help="latency of the gateway endpoints, e.g. constant:0.002, uniform:0.001:0.01")
+    parser.add_argument("--animal-latency", default="lognormal:0.02:0.5", help="latency of the animal APIs, e.g. lognormal:0.02:0.5 (median, sigma)")
+    parser.add_argument("--request-timeout-ms", type=int, default=1000, help="long-polling period of the activation requests")
+    parser.add_argument("--no-result-reporter", dest="result_reporter", action="store_false", help="report outcomes from the job threads")
+    parser.add_argument("--prefetch", action="store_true", help="prefetch animal image urls")
+    parser.add_argument("--no-activation-scheduler", dest="activation_scheduler", action="store_false", help="activate all free slots with fixed timeouts")
+    parser.add_argument("--output", help="file the json results are written to. Printed if not set")
+
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+
+    arguments = parse_args()
+
+    # the worker logs every job at debug level
+    logging.getLogger().setLevel(logging.WARNING)
+
+    benchmark_results = run_benchmark(
+        jobs=arguments.jobs,
+        max_concurrent_jobs=arguments.max_concurrent_jobs,
+        arrival_rate=arguments.arrival_rate,
+        zeebe_latency=arguments.zeebe_latency,
+        animal_latency=arguments.animal_latency,
+        request_timeout_ms=arguments.request_timeout_ms,
+        result_reporter=arguments.result_reporter,
+        prefetch=arguments.prefetch,
+        activation_scheduler=arguments.activation_scheduler
+    )
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as output_file:
+            json.dump(benchmark_results, output_file, indent=2)
+    else:
+        print(json.dumps(benchmark_results, indent=2))
@@ -4,12 +4,24 @@ Entry point of flask application
 
 import logging
 import os
-from pathlib import Path
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+from itertools import islice
+from typing import Callable
 
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, session
+from flask import Flask, Response, jsonify, render_template, request, url_for
 
+from helpers.asset_store import AssetStore
+from helpers.http_transport import get_shared_transport
+from helpers.metrics import CONTENT_TYPE, REGISTRY
+from helpers.config import get_config, install_reload_signal_handler
+from helpers.logging_setup import configure_logging
 from service.camunda_service import CamundaService
+from service.deployment_registry import DeploymentRegistry
+from service.process_submitter import ProcessSubmitter
+from service.variable_poller import VariablePoller
 
 # Process name
 PROCESS_MODEL = "Process_AnimalImageRetrieval"
@@ -17,26 +29,66 @@ PROCESS_MODEL = "Process_AnimalImageRetrieval"
 # Name of input variable to service task that retrieves animal image
 INPUT_ANIMAL_VAR = "animal"
 
+# Name of output variable that holds the animal image url
+OUTPUT_ANIMAL_URL_VAR = "animal_url"
+
 # Directories where the Camunda resources to be deployed are placed
 ASSET_DIR = "assets"
 
+# Submit mode in which the home page creates the process instance in the background
+SUBMIT_MODE_ASYNC = "async"
 
- # Configure root-level logging.
- # For debugging purposes, this is currently set to DEBUG
- # TODO: Complete mechanism to overwrite log level based on a yaml config file
- # TODO: Add option to output to either StreamHandler or FileHandler or both
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+# Submit mode in which the home page waits for the process instance to complete
+SUBMIT_MODE_AWAIT = "await"
+
+# Name of variable that holds the correlation ID of an awaited process instance
+CORRELATION_ID_VAR = "correlation_id"
+
+# Attempts, and seconds between them, to find a process instance whose await timed out
+LOCATE_ATTEMPTS = 10
+LOCATE_RETRY_SECONDS = 1
+
+
+# Configure root-level logging from the logging section of the config file
+configure_logging(get_config().logging)
 
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# The config is parsed once, then reloaded when the file changes or on SIGHUP
+install_reload_signal_handler()
+
+# Metrics are only recorded when enabled
+REGISTRY.enabled = get_config().metrics.enabled
+
+# Load the deployment resources from the assets directory into memory once at startup
+asset_store = AssetStore(
+    asset_dir=os.path.join(os.path.dirname(__file__), ASSET_DIR),
+    reload_interval=get_config().assets.reload_interval
+)
+
+# Deploys the resources in the assets directory once per distinct asset set and reuses the deployment key
+deployment_registry = DeploymentRegistry(asset_store=asset_store)
+
+# Creates process instances in the background for the async submit mode and the /submit endpoint
+process_submitter = ProcessSubmitter(
+    max_workers=get_config().web_app.submit_workers,
+    max_tracked_requests=get_config().web_app.max_tracked_requests
+)
+
+# Bounds the number of process instances created concurrently by the /api/requests endpoint, across all of its requests
+bulk_executor = ThreadPoolExecutor(max_workers=get_config().web_app.bulk_max_concurrency, thread_name_prefix="bulk")
+
+# Waits for the animal image urls of the process instances streamed to pages. One poller is shared by all pages of this process
+animal_url_poller = VariablePoller(
+    get_camunda_service=lambda: initialise_camunda_service(),
+    variable_name=OUTPUT_ANIMAL_URL_VAR,
+    poll_interval=get_config().web_app.result_stream.poll_interval_seconds,
+    batch_size=get_config().web_app.result_stream.batch_size,
+    max_wait_seconds=get_config().web_app.result_stream.max_wait_seconds
+)
+
 # Load the environment variables
 load_dotenv()
 
@@ -52,59 +104,168 @@ def home():
 
     if request.method == 'POST':
 
-        # # Retrieves config values
-        # config_values = Utils.get_config_values()
-        # logger.debug("config_values -> %s", config_values)
-
         animal_selected = request.form.get('animal')
         logger.info("%s -> Animal selected: %s", logger.name, animal_selected)
 
-        camunda_service = initialise_camunda_service()
-        logger.debug("%s -> Retrieved base url: %s", logger.name, camunda_service.base_url)
-
-        # Check if a token exists in the session and, if it does, check if it is still valid
-        # TODO: Implement token refresh functionality using jwt package to check for expiry.
-        #       At the moment, a rudimentary method that makes a request to get the cluster topology is used to see if the token is still valid
-        token_refresh_results = get_or_refresh_token(camunda_service=camunda_service)
+        # In await mode the page waits for the process instance to complete and shows the image from its result.
+        # If it does not complete in time, the page links to its status as in async mode
+        if get_config().web_app.submit_mode == SUBMIT_MODE_AWAIT:
+            correlation_id = uuid.uuid4().hex
+            result, error_message = start_process_instance(animal_selected, correlation_id=correlation_id, await_completion=True)
 
-        if not token_refresh_results["valid"]:
-            return render_template('index.html', show_error_message=True, error_message=token_refresh_results["error_message"])
+            if result:
+                return render_template('index.html', complete=True, animal_image_url=result.get("variables", {}).get(OUTPUT_ANIMAL_URL_VAR, ""))
 
+            if error_message:
+                return render_template('index.html', show_error_message=True, error_message=error_message)
 
-        # Retrieve the deployment resources from the assets directory
-        assets_rel_dir = os.path.relpath(path=os.path.join(os.path.dirname(__file__), ASSET_DIR), start=os.path.abspath(os.curdir))
+            request_id = process_submitter.submit(lambda: locate_process_instance(correlation_id), animal=animal_selected)
 
-        resource_files = os.listdir(assets_rel_dir)
-        resource_paths = ['./' + Path(assets_rel_dir).as_posix() + "/" + file for file in resource_files]
+            return render_template('index.html', submitted=True, request_id=request_id, status_url=url_for('status', request_id=request_id))
 
-        logger.info("%s -> Retrieved deployment resources resource: %s", logger.name, resource_paths)
+        # In async mode the process instance is created in the background and the page links to its status
+        if get_config().web_app.submit_mode == SUBMIT_MODE_ASYNC:
+            request_id = process_submitter.submit(lambda: start_process_instance(animal_selected), animal=animal_selected)
 
+            return render_template('index.html', submitted=True, request_id=request_id, status_url=url_for('status', request_id=request_id))
 
-        # Deploy the resources
-        deployment_key = camunda_service.deploy_resources(resource_paths)
+        process_instance_key, error_message = start_process_instance(animal_selected)
 
-        if not deployment_key:
-            # Log the error message to the logger's handler(s) and output it to the html form
-            error_message = "Failed to deploy resources"
-            logger.error("%s -> %s", logger.name, error_message)
+        if not process_instance_key:
             return render_template('index.html', show_error_message=True, error_message=error_message)
 
-        logger.info("%s -> successfully deployed resources. Deployment Key: %s", logger.name, deployment_key)
+        return render_template('index.html', complete=True, animal_image_url="",
+                               stream_url=url_for('stream', process_instance_key=process_instance_key))
+
+    return render_template('index.html')
+
+
+@app.route('/submit', methods=['POST'])
+def submit():
+    """
+    Queues the creation of a process instance for the animal in the form or json body and returns its request ID right away
+    """
+
+    animal_selected = request.form.get('animal') or (request.get_json(silent=True) or {}).get('animal')
+
+    if animal_selected not in get_config().animal_api_url:
+        return jsonify({ "error": f"Unknown animal '{animal_selected}'." }), 400
+
+    request_id = process_submitter.submit(lambda: start_process_instance(animal_selected), animal=animal_selected)
 
+    return jsonify({ "requestId": request_id, "statusUrl": url_for('status', request_id=request_id) }), 202
+
+
+@app.route('/api/requests', methods=['POST'])
+def create_requests():
+    """
+    Creates a process instance for each animal request in the json body, e.g. { "requests": [{ "animal": "dog" }, { "animal": "fox" }] }.
+    The instances are created concurrently on a bounded thread pool shared by all calls, with at most bulk_max_concurrency_per_request
+    of each call's instances in flight so that concurrent calls interleave, and with one token check and one deployment for the whole batch.
+    Returns the process instance key or the error of each request, in the order of the requests.
+    """
 
-        # Create and start a process instance
-        process_instance_key = camunda_service.create_process_instance(process_model=PROCESS_MODEL, variables={INPUT_ANIMAL_VAR: animal_selected})
+    body = request.get_json(silent=True)
+    animal_requests = body.get("requests") if isinstance(body, dict) else body
+    max_items = get_config().web_app.bulk_max_items
+
+    if not isinstance(animal_requests, list) or not all(isinstance(animal_request, dict) for animal_request in animal_requests):
+        return jsonify({ "error": "Expected a json array of requests, e.g. { \"requests\": [{ \"animal\": \"dog\" }] }." }), 400
+
+    if len(animal_requests) > max_items:
+        return jsonify({ "error": f"At most {max_items} requests can be created at once." }), 400
+
+    camunda_service, error_message = prepare_camunda_service()
+
+    if not camunda_service:
+        return jsonify({ "error": error_message }), 502
+
+    def create_request(animal_request: dict) -> dict:
+        animal = animal_request.get("animal")
+
+        if animal not in get_config().animal_api_url:
+            return { "animal": animal, "error": f"Unknown animal '{animal}'." }
+
+        process_instance_key = camunda_service.create_process_instance(process_model=PROCESS_MODEL, variables={ INPUT_ANIMAL_VAR: animal })
 
         if not process_instance_key:
-            error_message = "Failed to create process instance"
-            logger.error("%s -> %s", logger.name, error_message)
-            return render_template('index.html', show_error_message=True, error_message=error_message)
+            return { "animal": animal, "error": "Failed to create process instance" }
 
-        logger.info("%s -> Successfully created process instance. Process Instance Key: %s", logger.name, process_instance_key)
+        return { "animal": animal, "processInstanceKey": process_instance_key }
 
-        return render_template('index.html', complete=True, animal_image_url="")
+    results = map_bounded(create_request, animal_requests, get_config().web_app.bulk_max_concurrency_per_request)
+    failed = sum("error" in result for result in results)
 
-    return render_template('index.html')
+    logger.info("%s -> Created %s of %s process instances", logger.name, len(results) - failed, len(results))
+
+    return jsonify({ "created": len(results) - failed, "failed": failed, "results": results })
+
+
+@app.route('/status/<request_id>', methods=['GET'])
+def status(request_id: str):
+    """
+    Status of a submission and, once its process instance is created, the key and state of the instance
+    """
+
+    submission = process_submitter.get_status(request_id)
+
+    if submission is None:
+        return jsonify({ "error": f"Unknown request '{request_id}'." }), 404
+
+    if submission.get("processInstanceKey"):
+        process_instance = initialise_camunda_service().get_process_instance(submission["processInstanceKey"])
+        submission["state"] = process_instance.get("state")
+
+    return jsonify(submission)
+
+
+@app.route('/stream/<process_instance_key>', methods=['GET'])
+def stream(process_instance_key: str):
+    """
+    Server-sent events stream that sends the animal image url of a process instance as soon as the worker has set it
+    """
+
+    stream_config = get_config().web_app.result_stream
+    future = animal_url_poller.watch(process_instance_key)
+
+    def events():
+        while True:
+            try:
+                animal_image_url = future.result(timeout=stream_config.heartbeat_seconds)
+            except TimeoutError:
+                # keeps proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            if animal_image_url:
+                yield f"event: {OUTPUT_ANIMAL_URL_VAR}\ndata: {animal_image_url}\n\n"
+            else:
+                yield "event: timeout\ndata: \n\n"
+
+            return
+
+    return Response(events(), mimetype="text/event-stream", headers={ "Cache-Control": "no-cache", "X-Accel-Buffering": "no" })
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Metrics of this process in the Prometheus text format
+    """
+
+    if not REGISTRY.enabled:
+        return jsonify({ "error": "Metrics are disabled." }), 404
+
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+@app.route('/transport-stats', methods=['GET'])
+def transport_stats():
+    """
+    Connection pool hit and miss counters of the shared HTTP transport, per host
+    """
+
+    return jsonify(get_shared_transport().get_pool_stats())
 
 
 def initialise_camunda_service() -> CamundaService:
@@ -133,10 +294,115 @@ def initialise_camunda_service() -> CamundaService:
     return camunda_service
 
 
+def prepare_camunda_service() -> tuple[CamundaService | None, str]:
+    """
+    Initialises the camunda service, checks that a valid token is available and deploys the resources if needed
+
+    Returns:
+        tuple[CamundaService | None, str]: Camunda service and, if any step failed, None and an error message
+    """
+
+    camunda_service = initialise_camunda_service()
+    logger.debug("%s -> Retrieved base url: %s", logger.name, camunda_service.base_url)
+
+    # Check that a valid token is available. The token is shared by all requests of this process,
+    # its expiry is checked locally and it is refreshed in the background ahead of expiry
+    token_refresh_results = get_or_refresh_token(camunda_service=camunda_service)
+
+    if not token_refresh_results["valid"]:
+        return None, token_refresh_results["error_message"]
+
+
+    # Deploy the resources, unless the same asset set has already been deployed by this process
+    deployment_key = deployment_registry.get_or_deploy(camunda_service)
+
+    if not deployment_key:
+        # Log the error message to the logger's handler(s) and return it for the html form
+        error_message = "Failed to deploy resources"
+        logger.error("%s -> %s", logger.name, error_message)
+        return None, error_message
+
+    logger.info("%s -> Using deployed resources. Deployment Key: %s", logger.name, deployment_key)
+
+    return camunda_service, None
+
+
+def start_process_instance(animal_selected: str, correlation_id: str | None = None, await_completion: bool = False) -> tuple[str | dict | None, str]:
+    """
+    Checks the token, deploys the resources if needed and creates a process instance for the selected animal
+
+    Args:
+        animal_selected (str): Animal type
+        correlation_id (str | None): Stored in a variable of the process instance, so that it can be found if the await times out
+        await_completion (bool): Waits for the process instance to complete, up to web_app.await_timeout_ms
+
+    Returns:
+        tuple[str | dict | None, str]: Process instance key, or with await_completion the result of the completed process instance
+                                       (None if it did not complete in time), and, if any step failed, an error message
+    """
+
+    camunda_service, error_message = prepare_camunda_service()
+
+    if not camunda_service:
+        return "", error_message
+
+    variables = { INPUT_ANIMAL_VAR: animal_selected }
+
+    if correlation_id:
+        variables[CORRELATION_ID_VAR] = correlation_id
+
+    # Create and start a process instance
+    result = camunda_service.create_process_instance(
+        process_model=PROCESS_MODEL,
+        variables=variables,
+        await_completion=await_completion,
+        request_timeout=get_config().web_app.await_timeout_ms,
+        fetch_variables=[OUTPUT_ANIMAL_URL_VAR]
+    )
+
+    if result is None:
+        logger.info("%s -> Process instance %s did not complete in time", logger.name, correlation_id)
+        return None, None
+
+    if not result:
+        error_message = "Failed to create process instance"
+        logger.error("%s -> %s", logger.name, error_message)
+        return "", error_message
+
+    logger.info("%s -> Successfully created process instance. Result: %s", logger.name, result)
+
+    return result, None
+
+
+def locate_process_instance(correlation_id: str) -> tuple[str, str]:
+    """
+    Finds the process instance created with a correlation ID. The search is retried for a while, as newly set variables
+    take a moment to become searchable.
+
+    Args:
+        correlation_id (str): Correlation ID of the process instance
+
+    Returns:
+        tuple[str, str]: Process instance key and, if it could not be found, an error message
+    """
+
+    camunda_service = initialise_camunda_service()
+
+    for attempt in range(LOCATE_ATTEMPTS):
+        process_instance_key = camunda_service.find_process_instance_key(CORRELATION_ID_VAR, correlation_id)
+
+        if process_instance_key:
+            return process_instance_key, None
+
+        time.sleep(LOCATE_RETRY_SECONDS)
+
+    return "", f"Process instance {correlation_id} not found"
+
+
 def get_or_refresh_token(camunda_service: CamundaService) -> dict[bool, str]:
     """
-    Checks if a valid access token exists in the session. If not, refreshes the token and stores it in the session.
-    Uses a request to get the cluster topology to check if the token is valid.
+    Checks that the process-wide token manager holds a valid access token, requesting a new token only if
+    there is none or it has expired.
 
     Args:
         camunda_service (CamundaService): CamundaService object
@@ -145,35 +411,45 @@ def get_or_refresh_token(camunda_service: CamundaService) -> dict[bool, str]:
         dict[bool, str]: A dictionary indicating success or failure with error message, e.g. { "valid": False, "error_message": "Token invalid." }
     """
 
-    token_valid = False
+    if camunda_service.access_token:
+        logger.info("%s -> Found valid token", logger.name)
+        return { "valid": True, "error_message": None }
 
-    # if the token is not in the session
-    if not session.get('token'):
-        logger.info("%s -> Token not found.", logger.name)
-    else:
-        logger.info("%s -> Found token in session", logger.name)
-        camunda_service.access_token = session['token']
-        token_verified = camunda_service.get_cluster_topology()
+    return { "valid": False, "error_message": "Failed to get token." }
 
-        if token_verified is None: # None: Could not connect to check cluster topology to check token validity
-            return { "valid": False, "error_message": "Failed to check for token validity or token invalid." }
 
-        if not token_verified: # False: Unauthorised to retrieve cluster topology
-            logger.info("%s -> Token invalid", logger.name)
-        else:
-            token_valid = True
-            logger.info("%s -> Token still valid", logger.name)
-            return { "valid": True, "error_message": None }
+def map_bounded(function: Callable[[dict], dict], items: list[dict], max_in_flight: int) -> list[dict]:
+    """
+    Runs the function on the bulk executor for each item, with at most max_in_flight items of this call queued or running
+    at once. The executor is shared by all /api/requests calls, so bounding each call lets the items of concurrent calls
+    interleave instead of waiting behind a large batch.
 
-    # if the token is not in the session or the validity check failed, get a new token
-    if not token_valid:
-        camunda_service.get_token()
+    Args:
+        function (Callable[[dict], dict]): Function run for each item
+        items (list[dict]): Items, e.g. the animal requests of one call
+        max_in_flight (int): Maximum number of items of this call submitted to the executor at once
 
-        if camunda_service.access_token:
-            session['token'] = camunda_service.access_token
-            return { "valid": True, "error_message": None }
+    Returns:
+        list[dict]: Result of each item, in the order of the items
+    """
 
-    return { "valid": False, "error_message": "Failed to get token." }
+    results = [None] * len(items)
+    pending = {}
+    remaining = iter(enumerate(items))
+
+    for index, item in islice(remaining, max_in_flight):
+        pending[bulk_executor.submit(function, item)] = index
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            results[pending.pop(future)] = future.result()
+
+            for index, item in islice(remaining, 1):
+                pending[bulk_executor.submit(function, item)] = index
+
+    return results
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+"""
+Adaptive sizing and pacing of the job activations of the job worker
+"""
+
+import random
+import threading
+
+from helpers.hedging import LatencyTracker
+
+class ActivationScheduler:
+    """
+    Sizes each activation from how full the previous ones were and sets the job timeout from recent job durations.
+
+    The batch limit follows the backlog: it doubles while activations come back full and halves when they come back
+    partly filled, so that replicas share a small backlog instead of one of them taking every job that arrives.
+    While there is a backlog, the worker waits briefly for more free slots before activating, so that it sends fewer,
+    larger activations. All waits and the long-polling period are jittered so that replicas do not poll in lockstep.
+    """
+
+    def __init__(self,
+                 max_concurrent_jobs: int,
+                 min_job_timeout_ms: int = 60000,
+                 job_timeout_factor: float = 3,
+                 max_slot_wait_seconds: float = 0.5,
+                 jitter: float = 0.1,
+                 latency_tracker: LatencyTracker | None = None):
+        """
+        Args:
+            max_concurrent_jobs (int): Jobs handled concurrently by the worker, the upper bound of the batch limit.
+            min_job_timeout_ms (int): Lower bound of the job timeout. The recent job durations are shared by all animals, so
+                                      this must cover the slowest animal API, or its jobs expire behind a run of fast ones.
+            job_timeout_factor (float): Multiple of the p99 job duration used as the job timeout.
+            max_slot_wait_seconds (float): Maximum time to wait for more free slots while there is a backlog.
+            jitter (float): Fraction (0-1) by which waits and the long-polling period are randomly varied.
+            latency_tracker (LatencyTracker | None): Tracker of the recent job durations.
+        """
+
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.min_job_timeout_ms = min_job_timeout_ms
+        self.job_timeout_factor = job_timeout_factor
+        self.max_slot_wait_seconds = max_slot_wait_seconds
+        self.jitter = jitter
+        self.latency_tracker = latency_tracker or LatencyTracker()
+
+        self._batch_limit = max_concurrent_jobs
+        self._backlog = False
+        self._lock = threading.Lock()
+
+
+    def _jittered(self, value: float) -> float:
+
+        return value * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+    def get_batch_limit(self) -> int:
+        """
+        Gets the maximum number of jobs to activate next
+
+        Returns:
+            int: Batch limit
+        """
+
+        with self._lock:
+            return self._batch_limit
+
+
+    def get_slot_wait(self) -> float:
+        """
+        Gets how long to wait for more free slots before activating. Only non-zero while the last activation was full,
+        and at most a tenth of the median job duration, so that waiting never delays jobs noticeably.
+
+        Returns:
+            float: Seconds to wait
+        """
+
+        median_duration = self.latency_tracker.percentile(50)
+
+        if not self._backlog or median_duration is None:
+            return 0
+
+        return self._jittered(min(median_duration / 10, self.max_slot_wait_seconds))
+
+
+    def get_job_timeout(self, job_timeout_ms: int) -> int:
+        """
+        Gets the timeout for which the next activated jobs are locked to this worker: a multiple of the p99 job duration,
+        so that the jobs of a crashed worker become available again soon, but never below min_job_timeout_ms.
+
+        Args:
+            job_timeout_ms (int): Configured job timeout, the upper bound. Also used until enough jobs have been handled.
+
+        Returns:
+            int: Job timeout in milliseconds
+        """
+
+        p99_duration = self.latency_tracker.percentile(99)
+
+        if p99_duration is None:
+            return job_timeout_ms
+
+        return int(min(max(p99_duration * 1000 * self.job_timeout_factor, self.min_job_timeout_ms), job_timeout_ms))
+
+
+    def get_request_timeout(self, request_timeout_ms: int) -> int:
+        """
+        Gets the jittered long-polling period of the next activation
+
+        Args:
+            request_timeout_ms (int): Configured long-polling period
+
+        Returns:
+            int: Long-polling period in milliseconds
+        """
+
+        return int(self._jittered(request_timeout_ms))
+
+
+    def record_activation(self, requested: int, activated: int):
+        """
+        Adjusts the batch limit to how full an activation was
+
+        Args:
+            requested (int): Maximum number of jobs requested
+            activated (int): Number of jobs activated
+        """
+
+        with self._lock:
+            self._backlog = activated >= requested
+
+            if self._backlog:
+                self._batch_limit = min(self._batch_limit * 2, self.max_concurrent_jobs)
+            elif activated:
+                self._batch_limit = max(self._batch_limit // 2, activated, 1)
+
+
+    def record_job_duration(self, duration: float):
+        """
+        Records the time from the activation of a job until it was handled
+
+        Args:
+            duration (float): Duration in seconds
+        """
+
+        self.latency_tracker.record(duration)
+
+
+    def get_stats(self) -> dict:
+
+        with self._lock:
+            return {
+                "batch_limit": self._batch_limit,
+                "backlog": self._backlog,
+                "p99_job_duration": self.latency_tracker.percentile(99)
+            }
@@ -0,0 +1,111 @@
+"""
+In-memory store of the Camunda resources (.bpmn and .form files) to be deployed
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+# File extensions of the resources that are loaded into the store
+RESOURCE_EXTENSIONS = (".bpmn", ".form")
+
+class AssetStore:
+
+    def __init__(self, asset_dir: str, reload_interval: float | None = None):
+        """
+        Args:
+            asset_dir (str): Directory containing the deployment resources.
+            reload_interval (float | None): Minimum number of seconds between checks of the asset directory for changed files.
+                                            None disables reloading, so the resources are only read once.
+        """
+
+        self.asset_dir = asset_dir
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._last_checked = 0.0
+        self._signature = {}
+        self._resources = MappingProxyType({})
+        self._digest = ""
+
+        self.load()
+
+
+    def _get_signature(self) -> dict[str, tuple[int, int]]:
+        """
+        Gets the modification time and size of each resource file in the asset directory
+
+        Returns:
+            dict[str, tuple[int, int]]: Modification time in nanoseconds and size in bytes, keyed by file name
+        """
+
+        signature = {}
+
+        for file in sorted(os.listdir(self.asset_dir)):
+            if file.endswith(RESOURCE_EXTENSIONS):
+                file_stat = os.stat(os.path.join(self.asset_dir, file))
+                signature[file] = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        return signature
+
+
+    def load(self):
+        """
+        Reads all resource files in the asset directory into memory and computes the digest of the asset set.
+        """
+
+        signature = self._get_signature()
+
+        resources = {}
+        digest = hashlib.sha256()
+
+        for file in signature:
+            with open(os.path.join(self.asset_dir, file), 'rb') as resource_file:
+                content = resource_file.read()
+
+            resources[file] = content
+            digest.update(file.encode("utf-8"))
+            digest.update(hashlib.sha256(content).digest())
+
+        with self._lock:
+            self._signature = signature
+            self._resources = MappingProxyType(resources)
+            self._digest = digest.hexdigest()
+            self._last_checked = time.monotonic()
+
+        logger.info("%s -> Loaded deployment resources %s. Digest: %s", logger.name, list(resources), self._digest)
+
+
+    def _reload_if_changed(self):
+        """
+        Reloads the resources if reloading is enabled, the reload interval has elapsed and any resource file has changed.
+        """
+
+        if self.reload_interval is None or time.monotonic() - self._last_checked < self.reload_interval:
+            return
+
+        self._last_checked = time.monotonic()
+
+        if self._get_signature() != self._signature:
+            logger.info("%s -> Deployment resources changed in '%s'. Reloading.", logger.name, self.asset_dir)
+            self.load()
+
+
+    def get_snapshot(self) -> tuple[Mapping[str, bytes], str]:
+        """
+        Gets the in-memory resources together with the digest of that same asset set
+
+        Returns:
+            tuple[Mapping[str, bytes], str]: Read-only mapping of file name to file content, and the hex digest of the asset set
+        """
+
+        self._reload_if_changed()
+
+        with self._lock:
+            return self._resources, self._digest
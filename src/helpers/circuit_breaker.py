@@ -0,0 +1,131 @@
+"""
+Circuit breaker that stops calls to an endpoint while its recent calls are failing or slow
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+
+    def __init__(self,
+                 name: str,
+                 window_size: int = 20,
+                 minimum_calls: int = 5,
+                 failure_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 10,
+                 slow_call_rate_threshold: float = 0.8,
+                 open_seconds: float = 30):
+        """
+        Args:
+            name (str): Name of the protected endpoint, used in log messages.
+            window_size (int): Number of most recent calls over which the failure and slow call rates are computed.
+            minimum_calls (int): Minimum number of calls in the window before the circuit can open.
+            failure_rate_threshold (float): Failure rate (0-1) at or above which the circuit opens.
+            slow_call_seconds (float): Duration in seconds above which a call counts as slow.
+            slow_call_rate_threshold (float): Slow call rate (0-1) at or above which the circuit opens.
+            open_seconds (float): Seconds the circuit stays open before a trial call is let through.
+        """
+
+        self.name = name
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+
+        # (failed, slow) outcome of the most recent calls
+        self._calls = deque(maxlen=window_size)
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+
+
+    @property
+    def state(self) -> str:
+
+        return self._state
+
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a call may be made. Once the open period has elapsed, a single trial call is let through.
+
+        Returns:
+            bool: True if the call may be made
+        """
+
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+                logger.info("%s -> Circuit for '%s' half-open. Letting a trial call through.", logger.name, self.name)
+
+            if self._state == HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+
+            return False
+
+
+    def release(self):
+        """
+        Gives back a call let through by allow_request that was not made, so that a half-open circuit lets the next trial call through.
+        """
+
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_progress = False
+
+
+    def record(self, success: bool, duration: float):
+        """
+        Records the outcome of a call and opens or closes the circuit accordingly.
+
+        Args:
+            success (bool): Whether the call succeeded
+            duration (float): Duration of the call in seconds
+        """
+
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_progress = False
+
+                if success and duration < self.slow_call_seconds:
+                    self._calls.clear()
+                    self._state = CLOSED
+                    logger.info("%s -> Circuit for '%s' closed.", logger.name, self.name)
+                else:
+                    self._open()
+
+                return
+
+            self._calls.append((not success, duration >= self.slow_call_seconds))
+
+            if self._state == CLOSED and len(self._calls) >= self.minimum_calls:
+                failure_rate = sum(failed for failed, _ in self._calls) / len(self._calls)
+                slow_call_rate = sum(slow for _, slow in self._calls) / len(self._calls)
+
+                if failure_rate >= self.failure_rate_threshold or slow_call_rate >= self.slow_call_rate_threshold:
+                    logger.warning("%s -> Failure rate %.2f, slow call rate %.2f for '%s'.", logger.name, failure_rate, slow_call_rate, self.name)
+                    self._open()
+
+
+    def _open(self):
+
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+        logger.warning("%s -> Circuit for '%s' opened for %s seconds.", logger.name, self.name, self.open_seconds)
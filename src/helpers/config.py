@@ -0,0 +1,491 @@
+"""
+Process-wide configuration, parsed once from the yaml config file and reloaded when the file changes
+"""
+
+import dataclasses
+import logging
+import os
+import signal
+import threading
+import time
+import types
+import typing
+from dataclasses import dataclass, field
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE_NAME = "config.yaml"
+
+# Handlers that can be listed in 'logging.handlers'
+LOG_HANDLERS = ("stream", "file")
+
+# JSON backends of the REST clients. auto uses orjson if it is installed and the standard library otherwise
+JSON_BACKENDS = ("auto", "json", "orjson")
+
+# Ways in which the web app creates process instances
+SUBMIT_MODES = ("sync", "async", "await")
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    log_level: str = "INFO"
+    format: str = "[%(asctime)s] %(levelname)s: %(message)s"
+    # "stream" (stderr) and/or "file"
+    handlers: tuple[str, ...] = ("stream",)
+    # path of the log file, required by the file handler
+    file_path: str | None = None
+    # write the log records from a background thread, so that request and job threads never wait for the I/O
+    queue: bool = True
+
+
+@dataclass(frozen=True)
+class ReloadConfig:
+    # seconds between checks of the config file for changes. None disables the check
+    watch_interval_seconds: float | None = 5
+
+
+@dataclass(frozen=True)
+class PrefetchConfig:
+    enabled: bool = False
+    buffer_size: int = 10
+    low_water_mark: int = 5
+    max_age_seconds: float = 300
+    fetchers_per_animal: int = 1
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    window_size: int = 20
+    minimum_calls: int = 5
+    failure_rate_threshold: float = 0.5
+    slow_call_seconds: float = 50
+    slow_call_rate_threshold: float = 0.8
+    open_seconds: float = 30
+
+
+@dataclass(frozen=True)
+class StaleFallbackConfig:
+    enabled: bool = True
+    history_size: int = 20
+
+
+@dataclass(frozen=True)
+class HedgingConfig:
+    enabled: bool = False
+    animals: tuple[str, ...] = ()
+    percentile: float = 95
+    window_size: int = 100
+    minimum_samples: int = 20
+    max_hedge_ratio: float = 0.1
+    max_concurrent_hedges: int = 4
+    max_workers: int = 32
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    enabled: bool = False
+    requests_per_second: float = 5
+    # requests per second of individual animal APIs, overriding requests_per_second
+    animals: dict[str, float] = field(default_factory=dict)
+    burst: int = 5
+    max_wait_seconds: float = 10
+    # pause used for a 429 response without a valid Retry-After header
+    default_retry_after_seconds: float = 1
+
+
+@dataclass(frozen=True)
+class AnimalServiceConfig:
+    prefetch: PrefetchConfig = field(default_factory=PrefetchConfig)
+    circuit_breaker: CircuitBreakerConfig = field(default_factory=CircuitBreakerConfig)
+    stale_fallback: StaleFallbackConfig = field(default_factory=StaleFallbackConfig)
+    hedging: HedgingConfig = field(default_factory=HedgingConfig)
+    rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
+
+
+@dataclass(frozen=True)
+class AssetsConfig:
+    reload_interval: float | None = None
+
+
+@dataclass(frozen=True)
+class HttpTransportConfig:
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    connect_timeout: float = 5
+    read_timeout: float = 60
+    async_max_connections: int = 200
+    connection_retries: int = 2
+    connection_retry_base_seconds: float = 0.1
+    connection_retry_max_seconds: float = 2
+    # "auto", "json" or "orjson"
+    json_backend: str = "auto"
+
+
+@dataclass(frozen=True)
+class ResultReporterConfig:
+    senders: int = 4
+    max_attempts: int = 3
+    retry_base_seconds: float = 0.5
+    queue_size: int = 100
+
+
+@dataclass(frozen=True)
+class RetryPolicyConfig:
+    enabled: bool = True
+    initial_retries: int = 3
+    backoff_base_ms: int = 5000
+    backoff_max_ms: int = 300000
+
+
+@dataclass(frozen=True)
+class ActivationSchedulerConfig:
+    enabled: bool = True
+    min_job_timeout_ms: int = 60000
+    job_timeout_factor: float = 3
+    max_slot_wait_seconds: float = 0.5
+    jitter: float = 0.1
+
+
+@dataclass(frozen=True)
+class SupervisorConfig:
+    # worker processes started by the supervisor. 1 runs the worker in the main process without a supervisor
+    processes: int = 1
+    # delay before a worker process that exited is restarted, doubled for each crash in a row up to the max
+    restart_delay_seconds: float = 1
+    restart_delay_max_seconds: float = 30
+    # file through which the worker processes share one access token. A file in a temporary directory if not set
+    token_cache_file: str | None = None
+
+
+@dataclass(frozen=True)
+class JobWorkerConfig:
+    max_concurrent_jobs: int = 5
+    job_timeout_ms: int = 60000
+    request_timeout_ms: int = 20000
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 30
+    # name the jobs are activated under. Worker processes of the supervisor append their number
+    worker_name: str = "animal-image-worker"
+    result_reporter: ResultReporterConfig = field(default_factory=ResultReporterConfig)
+    retry_policy: RetryPolicyConfig = field(default_factory=RetryPolicyConfig)
+    activation_scheduler: ActivationSchedulerConfig = field(default_factory=ActivationSchedulerConfig)
+    supervisor: SupervisorConfig = field(default_factory=SupervisorConfig)
+
+
+@dataclass(frozen=True)
+class ResultStreamConfig:
+    poll_interval_seconds: float = 1
+    batch_size: int = 100
+    max_wait_seconds: float = 120
+    heartbeat_seconds: float = 15
+
+
+@dataclass(frozen=True)
+class WebAppConfig:
+    submit_mode: str = "sync"
+    submit_workers: int = 8
+    max_tracked_requests: int = 10000
+    await_timeout_ms: int = 10000
+    bulk_max_items: int = 1000
+    bulk_max_concurrency: int = 16
+    bulk_max_concurrency_per_request: int = 4
+    result_stream: ResultStreamConfig = field(default_factory=ResultStreamConfig)
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    enabled: bool = False
+    worker_port: int | None = None
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    animal_api_url: dict[str, str]
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    config: ReloadConfig = field(default_factory=ReloadConfig)
+    animal_service: AnimalServiceConfig = field(default_factory=AnimalServiceConfig)
+    assets: AssetsConfig = field(default_factory=AssetsConfig)
+    http_transport: HttpTransportConfig = field(default_factory=HttpTransportConfig)
+    job_worker: JobWorkerConfig = field(default_factory=JobWorkerConfig)
+    web_app: WebAppConfig = field(default_factory=WebAppConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+
+
+def _convert(value, value_type, path: str):
+    """
+    Converts a yaml value to the given type, raising a ValueError if it does not match
+
+    Args:
+        value: Value parsed from yaml
+        value_type: Type annotation of the config field
+        path (str): Dotted path of the value in the config file, used in error messages
+
+    Returns:
+        Converted value
+    """
+
+    if dataclasses.is_dataclass(value_type):
+        if value is None:
+            value = {}
+
+        if not isinstance(value, dict):
+            raise ValueError(f"'{path}' must be a mapping.")
+
+        field_types = typing.get_type_hints(value_type)
+        unknown_keys = set(value) - set(field_types)
+
+        if unknown_keys:
+            raise ValueError(f"Unknown config item(s) in '{path}': {sorted(unknown_keys)}")
+
+        return value_type(**{ key: _convert(item, field_types[key], f"{path}.{key}".lstrip(".")) for key, item in value.items() })
+
+    origin = typing.get_origin(value_type)
+    args = typing.get_args(value_type)
+
+    if origin in (types.UnionType, typing.Union):
+        if value is None and type(None) in args:
+            return None
+
+        return _convert(value, next(arg for arg in args if arg is not type(None)), path)
+
+    if origin is tuple:
+        if not isinstance(value, list):
+            raise ValueError(f"'{path}' must be a list.")
+
+        return tuple(_convert(item, args[0], f"{path}[]") for item in value)
+
+    if origin is dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"'{path}' must be a mapping.")
+
+        return { _convert(key, args[0], path): _convert(item, args[1], f"{path}.{key}") for key, item in value.items() }
+
+    if value_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+
+    if not isinstance(value, value_type) or value_type is int and isinstance(value, bool):
+        raise ValueError(f"'{path}' must be of type {value_type.__name__}, got {value!r}.")
+
+    return value
+
+
+def parse_config(yaml_config: dict) -> AppConfig:
+    """
+    Validates the values of a yaml config file and converts them into a typed config
+
+    Args:
+        yaml_config (dict): Values parsed from the yaml config file
+
+    Raises:
+        ValueError: When a value is missing, unknown or invalid.
+
+    Returns:
+        AppConfig: Typed config
+    """
+
+    if not isinstance(yaml_config, dict) or "animal_api_url" not in yaml_config:
+        raise ValueError("'animal_api_url' is required.")
+
+    app_config = _convert(yaml_config, AppConfig, "")
+
+    if app_config.logging.log_level not in logging.getLevelNamesMapping():
+        raise ValueError(f"'logging.log_level' must be a log level name, got {app_config.logging.log_level!r}.")
+
+    unknown_handlers = set(app_config.logging.handlers) - set(LOG_HANDLERS)
+
+    if unknown_handlers:
+        raise ValueError(f"'logging.handlers' must only contain {LOG_HANDLERS}, got {sorted(unknown_handlers)}.")
+
+    if "file" in app_config.logging.handlers and not app_config.logging.file_path:
+        raise ValueError("'logging.file_path' is required by the file handler.")
+
+    if app_config.http_transport.json_backend not in JSON_BACKENDS:
+        raise ValueError(f"'http_transport.json_backend' must be one of {JSON_BACKENDS}, got {app_config.http_transport.json_backend!r}.")
+
+    if app_config.web_app.submit_mode not in SUBMIT_MODES:
+        raise ValueError(f"'web_app.submit_mode' must be one of {SUBMIT_MODES}, got {app_config.web_app.submit_mode!r}.")
+
+    if not 0 < app_config.web_app.bulk_max_concurrency_per_request <= app_config.web_app.bulk_max_concurrency:
+        raise ValueError("'web_app.bulk_max_concurrency_per_request' must be between 1 and 'web_app.bulk_max_concurrency'.")
+
+    prefetch_config = app_config.animal_service.prefetch
+
+    if not 0 < prefetch_config.low_water_mark <= prefetch_config.buffer_size:
+        raise ValueError("'animal_service.prefetch.low_water_mark' must be between 1 and the buffer size.")
+
+    unknown_animals = set(app_config.animal_service.hedging.animals) - set(app_config.animal_api_url)
+
+    if unknown_animals:
+        raise ValueError(f"'animal_service.hedging.animals' contains animals without an api url: {sorted(unknown_animals)}")
+
+    rate_limit_config = app_config.animal_service.rate_limit
+    unknown_animals = set(rate_limit_config.animals) - set(app_config.animal_api_url)
+
+    if unknown_animals:
+        raise ValueError(f"'animal_service.rate_limit.animals' contains animals without an api url: {sorted(unknown_animals)}")
+
+    if min([rate_limit_config.requests_per_second, *rate_limit_config.animals.values()]) <= 0 or rate_limit_config.burst < 1:
+        raise ValueError("'animal_service.rate_limit' requires rates above 0 and a burst of at least 1.")
+
+    return app_config
+
+
+class ConfigStore:
+
+    def __init__(self, config_path: str):
+
+        self.config_path = config_path
+
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._mtime_ns, self._config = self._load()
+
+
+    def _load(self) -> tuple[int, AppConfig]:
+        """
+        Reads and validates the config file
+
+        Raises:
+            Exception: When the config file is not present.
+            ValueError: When the config file is invalid.
+
+        Returns:
+            tuple[int, AppConfig]: Modification time of the file in nanoseconds and the typed config
+        """
+
+        if not os.path.exists(self.config_path):
+            raise Exception(f"Missing {self.config_path} file.")
+
+        mtime_ns = os.stat(self.config_path).st_mtime_ns
+
+        with open(self.config_path, encoding='utf-8') as yaml_file:
+            yaml_config = yaml.safe_load(yaml_file)
+
+        return mtime_ns, parse_config(yaml_config)
+
+
+    def get(self) -> AppConfig:
+        """
+        Gets the current config without any I/O
+
+        Returns:
+            AppConfig: Typed config
+        """
+
+        return self._config
+
+
+    def reload(self) -> bool:
+        """
+        Reloads the config file. If the file is invalid, the current config is kept.
+
+        Returns:
+            bool: True if the config was reloaded
+        """
+
+        with self._lock:
+            try:
+                previous_log_level = self._config.logging.log_level
+                self._mtime_ns, self._config = self._load()
+            except Exception as exception:
+                logger.error("%s -> Failed to reload '%s'. Keeping the current config -> %s", logger.name, self.config_path, str(exception))
+                return False
+
+        # the log level applies without a restart, the handlers only when logging is configured again
+        if self._config.logging.log_level != previous_log_level:
+            logging.getLogger().setLevel(self._config.logging.log_level)
+
+        logger.info("%s -> Reloaded '%s'", logger.name, self.config_path)
+
+        return True
+
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reloads the config file if its modification time has changed
+
+        Returns:
+            bool: True if the config was reloaded
+        """
+
+        try:
+            mtime_ns = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return False
+
+        return mtime_ns != self._mtime_ns and self.reload()
+
+
+    def start_watching(self, interval: float):
+        """
+        Starts a background thread that reloads the config file whenever its modification time changes.
+
+        Args:
+            interval (float): Seconds between checks of the modification time
+        """
+
+        if self._watcher:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+
+# Config store shared by this process
+_config_store = None
+_config_store_lock = threading.Lock()
+
+
+def get_config_store() -> ConfigStore:
+    """
+    Gets the config store of this process, parsing the config file and starting the file watcher on first use.
+
+    Returns:
+        ConfigStore: Shared config store
+    """
+
+    global _config_store
+
+    if _config_store is None:
+        with _config_store_lock:
+            if _config_store is None:
+                config_store = ConfigStore(os.path.join(os.path.dirname(os.path.dirname(__file__)), CONFIG_FILE_NAME))
+                watch_interval = config_store.get().config.watch_interval_seconds
+
+                if watch_interval:
+                    config_store.start_watching(watch_interval)
+
+                _config_store = config_store
+
+    return _config_store
+
+
+def get_config() -> AppConfig:
+    """
+    Gets the current config of this process. Only the first call reads the config file.
+
+    Returns:
+        AppConfig: Typed config
+    """
+
+    return get_config_store().get()
+
+
+def install_reload_signal_handler():
+    """
+    Reloads the config file when the process receives SIGHUP. Must be called from the main thread.
+    """
+
+    if not hasattr(signal, "SIGHUP"):
+        return
+
+    try:
+        signal.signal(signal.SIGHUP, lambda signum, frame: get_config_store().reload())
+    except ValueError:
+        logger.warning("%s -> Config reload signal handler can only be installed from the main thread", logger.name)
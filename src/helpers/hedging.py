@@ -0,0 +1,114 @@
+"""
+Latency tracking and load budget for hedged requests
+"""
+
+import threading
+from collections import deque
+
+class LatencyTracker:
+
+    def __init__(self, window_size: int = 100, minimum_samples: int = 20):
+        """
+        Args:
+            window_size (int): Number of most recent latencies kept.
+            minimum_samples (int): Minimum number of latencies recorded before percentiles are reported.
+        """
+
+        self.minimum_samples = minimum_samples
+
+        self._latencies = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+
+    def record(self, latency: float):
+        """
+        Records the latency of a request
+
+        Args:
+            latency (float): Latency in seconds
+        """
+
+        with self._lock:
+            self._latencies.append(latency)
+
+
+    def percentile(self, percentile: float) -> float | None:
+        """
+        Gets a percentile of the recorded latencies using the nearest-rank method
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            float | None: Latency in seconds. None if fewer than the minimum number of latencies have been recorded.
+        """
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if len(latencies) < self.minimum_samples:
+            return None
+
+        rank = max(int(round(percentile / 100 * len(latencies))) - 1, 0)
+
+        return latencies[min(rank, len(latencies) - 1)]
+
+
+class HedgeBudget:
+    """
+    Caps the extra load caused by hedged requests. Every request earns a fraction of a hedge and every hedge
+    spends a whole one, so hedges can never exceed that fraction of the requests. The number of hedges in flight
+    is capped as well, so that hedging cannot amplify an outage.
+    """
+
+    def __init__(self, max_hedge_ratio: float = 0.1, max_concurrent_hedges: int = 4):
+        """
+        Args:
+            max_hedge_ratio (float): Maximum number of hedged requests per request.
+            max_concurrent_hedges (int): Maximum number of hedged requests in flight.
+        """
+
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_concurrent_hedges = max_concurrent_hedges
+
+        # the balance is capped so that a long quiet period cannot be followed by a burst of hedges
+        self._max_balance = max(max_concurrent_hedges, 1)
+        self._balance = 0.0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+
+    def record_request(self):
+        """
+        Records a request, earning a fraction of a hedge.
+        """
+
+        with self._lock:
+            self._balance = min(self._balance + self.max_hedge_ratio, self._max_balance)
+
+
+    def try_acquire(self) -> bool:
+        """
+        Spends one hedge if the budget allows it
+
+        Returns:
+            bool: True if a hedged request may be sent. release() must be called once it finishes.
+        """
+
+        with self._lock:
+            if self._balance < 1 or self._in_flight >= self.max_concurrent_hedges:
+                return False
+
+            self._balance -= 1
+            self._in_flight += 1
+
+            return True
+
+
+    def release(self):
+        """
+        Records that a hedged request has finished.
+        """
+
+        with self._lock:
+            self._in_flight -= 1
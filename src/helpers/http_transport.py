@@ -0,0 +1,158 @@
+"""
+Pooled keep-alive HTTP transport shared by the REST API services
+"""
+
+import logging
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from helpers.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Defaults of transports created without the config values
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+
+# Transport shared by all services of this process
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+class PoolStatsAdapter(HTTPAdapter):
+    """
+    HTTP adapter that counts, per host, how many requests reused a pooled connection (hit)
+    and how many had to open a new connection (miss).
+    """
+
+    def __init__(self, pool_connections: int, pool_maxsize: int):
+
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+
+        self._stats_lock = threading.Lock()
+        self.pool_stats = {}
+
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+
+        pool = self.get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        connections_before = pool.num_connections
+
+        try:
+            return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        finally:
+            outcome = "misses" if pool.num_connections > connections_before else "hits"
+
+            with self._stats_lock:
+                host_stats = self.pool_stats.setdefault(pool.host, { "hits": 0, "misses": 0 })
+                host_stats[outcome] += 1
+
+
+class HttpTransport:
+
+    def __init__(self,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT):
+        """
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep.
+            pool_maxsize (int): Maximum number of keep-alive connections kept per host.
+            connect_timeout (float): Seconds to wait for a connection to be established.
+            read_timeout (float): Seconds to wait for the server to send a response.
+        """
+
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.adapter = PoolStatsAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request over a pooled connection, applying the default timeouts unless a timeout is passed.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request url
+
+        Returns:
+            requests.Response: Response to the request
+        """
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        return self.session.request(method=method, url=url, **kwargs)
+
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+
+        return self.request("GET", url, **kwargs)
+
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+
+        return self.request("POST", url, **kwargs)
+
+
+    def get_pool_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Gets the connection pool hit and miss counters
+
+        Returns:
+            dict[str, dict[str, int]]: Hits and misses keyed by host, e.g. { "random.dog": { "hits": 9, "misses": 1 } }
+        """
+
+        with self.adapter._stats_lock:
+            return { host: dict(host_stats) for host, host_stats in self.adapter.pool_stats.items() }
+
+
+def get_shared_transport() -> HttpTransport:
+    """
+    Gets the transport shared by this process, creating it from the http_transport config values on first use.
+
+    Returns:
+        HttpTransport: Shared transport
+    """
+
+    global _shared_transport
+
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            transport_config = get_config().http_transport
+            logger.debug("%s -> http_transport -> %s", logger.name, transport_config)
+
+            _shared_transport = HttpTransport(
+                pool_connections=transport_config.pool_connections,
+                pool_maxsize=transport_config.pool_maxsize,
+                connect_timeout=transport_config.connect_timeout,
+                read_timeout=transport_config.read_timeout
+            )
+
+        return _shared_transport
+
+
+def create_async_client() -> httpx.AsyncClient:
+    """
+    Creates an asyncio HTTP client with keep-alive connection pooling, configured from the http_transport config values.
+    The client must be used from a single event loop.
+
+    Returns:
+        httpx.AsyncClient: Asyncio HTTP client
+    """
+
+    transport_config = get_config().http_transport
+    max_connections = transport_config.async_max_connections
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=httpx.Timeout(transport_config.read_timeout, connect=transport_config.connect_timeout)
+    )
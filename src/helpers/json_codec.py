@@ -0,0 +1,171 @@
+"""
+JSON encoding and decoding of request and response bodies, using orjson when it is installed
+"""
+
+import json
+import logging
+
+import requests
+
+from helpers.config import JSON_BACKENDS, get_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Codec shared by the services of this process
+_codec = None
+
+def _dumps(value: object) -> bytes:
+
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class JsonCodec:
+    """
+    Encodes request bodies to compact UTF-8 json and decodes response bodies in a single pass.
+    Neither requests nor httpx cache the result of response.json(), so callers decode a response once and keep the result.
+    """
+
+    def __init__(self, backend: str = "auto"):
+        """
+        Args:
+            backend (str): "json", "orjson", or "auto" to use orjson if it is installed.
+
+        Raises:
+            ValueError: If the backend is unknown, or orjson is requested but not installed.
+        """
+
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend '{backend}'. Expected one of {JSON_BACKENDS}.")
+
+        if backend == "orjson" and orjson is None:
+            raise ValueError("JSON backend 'orjson' is not installed.")
+
+        self.backend = "orjson" if orjson is not None and backend != "json" else "json"
+
+        self._dumps = orjson.dumps if self.backend == "orjson" else _dumps
+        self._loads = orjson.loads if self.backend == "orjson" else json.loads
+
+
+    def encode(self, value: object) -> bytes:
+        """
+        Encodes a value to compact json
+
+        Args:
+            value (object): Value to encode
+
+        Returns:
+            bytes: UTF-8 encoded json
+        """
+
+        return self._dumps(value)
+
+
+    def decode(self, content: bytes | str) -> object:
+        """
+        Decodes json
+
+        Args:
+            content (bytes | str): UTF-8 encoded json or json text
+
+        Raises:
+            json.JSONDecodeError: If the content is not valid json.
+
+        Returns:
+            object: Decoded value
+        """
+
+        return self._loads(content)
+
+
+    def decode_response(self, response) -> object:
+        """
+        Decodes the body of a requests or httpx response
+
+        Args:
+            response: Response with a json body
+
+        Raises:
+            requests.exceptions.JSONDecodeError: If the body is not valid json. Like response.json() of requests, this is
+                                                 both a RequestException and a ValueError.
+
+        Returns:
+            object: Decoded body
+        """
+
+        try:
+            return self._loads(response.content)
+        except json.JSONDecodeError as exception:
+            raise requests.exceptions.JSONDecodeError(exception.msg, exception.doc, exception.pos) from exception
+
+
+    def template(self, **fields) -> "PayloadTemplate":
+        """
+        Creates a template for request bodies that share the given fields
+
+        Returns:
+            PayloadTemplate: Payload template
+        """
+
+        return PayloadTemplate(self, **fields)
+
+
+class PayloadTemplate:
+    """
+    Request body whose constant fields are encoded once. Rendering only encodes the fields that vary between requests
+    and appends them to the encoded constant fields.
+    """
+
+    def __init__(self, codec: JsonCodec, **fields):
+        """
+        Args:
+            codec (JsonCodec): Codec encoding the fields
+            fields: Constant fields of the body
+        """
+
+        self.codec = codec
+        self.fields = fields
+
+        # encoded constant fields without the closing brace, e.g. b'{"type":"retrieve-animal-image"'
+        self._prefix = codec.encode(fields)[:-1]
+
+
+    def render(self, **fields) -> bytes:
+        """
+        Encodes a body with the constant fields followed by the given ones
+
+        Args:
+            fields: Fields that vary between requests. Must not repeat a constant field.
+
+        Returns:
+            bytes: UTF-8 encoded json
+        """
+
+        if not fields:
+            return self._prefix + b"}"
+
+        separator = b"," if self.fields else b""
+
+        return self._prefix + separator + self.codec.encode(fields)[1:]
+
+
+def get_codec() -> JsonCodec:
+    """
+    Gets the codec of this process, using the backend set in http_transport.json_backend
+
+    Returns:
+        JsonCodec: Shared codec
+    """
+
+    global _codec
+
+    if _codec is None:
+        _codec = JsonCodec(get_config().http_transport.json_backend)
+
+        logger.info("%s -> Using the '%s' JSON backend", logger.name, _codec.backend)
+
+    return _codec
@@ -0,0 +1,132 @@
+"""
+Logging of the web app and the job worker, configured from the logging section of the config file
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable
+
+from helpers.config import LoggingConfig
+
+# Listener writing the queued records of this process, if logging.queue is enabled
+_listener = None
+
+class LazyJson:
+    """
+    Log argument that is only serialised to json when the log record is formatted, i.e. when its level is enabled.
+
+    Usage:
+        logger.debug("%s -> %s - %s", logger.name, url, LazyJson(response.json))
+    """
+
+    __slots__ = ("value", "indent")
+
+    def __init__(self, value: object | Callable[[], object], indent: int | None = 4):
+        """
+        Args:
+            value (object | Callable[[], object]): Value to serialise, or a callable returning it, such as response.json
+            indent (int | None): Indentation of the json
+        """
+
+        self.value = value
+        self.indent = indent
+
+
+    def __str__(self) -> str:
+
+        value = self.value() if callable(self.value) else self.value
+
+        try:
+            return json.dumps(value, indent=self.indent)
+        except (TypeError, ValueError):
+            return str(value)
+
+
+def create_handlers(logging_config: LoggingConfig) -> list[logging.Handler]:
+    """
+    Creates the handlers listed in the config, all using the configured format
+
+    Args:
+        logging_config (LoggingConfig): Logging config
+
+    Returns:
+        list[logging.Handler]: Handlers
+    """
+
+    handlers = []
+
+    for handler_name in logging_config.handlers:
+        if handler_name == "stream":
+            handler = logging.StreamHandler(sys.stderr)
+        else:
+            handler = logging.FileHandler(logging_config.file_path, encoding="utf-8")
+
+        handler.setFormatter(logging.Formatter(logging_config.format))
+        handlers.append(handler)
+
+    return handlers
+
+
+def configure_logging(logging_config: LoggingConfig) -> QueueListener | None:
+    """
+    Replaces the handlers of the root logger with the ones listed in the config and sets the root log level.
+
+    With logging.queue enabled, the root logger only puts the records on a queue and a background listener writes them
+    to the handlers, so that request and job threads never wait for stdout or the log file.
+
+    Args:
+        logging_config (LoggingConfig): Logging config
+
+    Returns:
+        QueueListener | None: Listener writing the queued records. None if logging.queue is disabled.
+    """
+
+    global _listener
+
+    stop_logging()
+
+    root_logger = logging.getLogger()
+
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+
+    handlers = create_handlers(logging_config)
+
+    if logging_config.queue:
+        record_queue = queue.SimpleQueue()
+
+        _listener = QueueListener(record_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+        root_logger.addHandler(QueueHandler(record_queue))
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+
+    root_logger.setLevel(logging_config.log_level)
+
+    return _listener
+
+
+def stop_logging():
+    """
+    Writes the records still on the queue and stops the listener. Called on exit.
+    """
+
+    global _listener
+
+    if _listener:
+        _listener.stop()
+
+        for handler in _listener.handlers:
+            handler.close()
+
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,226 @@
+"""
+Prometheus-style metrics, exposed in the Prometheus text format. Recording is a no-op while metrics are disabled.
+"""
+
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default histogram buckets in seconds, suited to HTTP calls that take from milliseconds up to the slow animal APIs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class MetricsRegistry:
+
+    def __init__(self):
+
+        self.enabled = False
+
+        self._metrics = []
+        self._lock = threading.Lock()
+
+
+    def register(self, metric):
+
+        with self._lock:
+            self._metrics.append(metric)
+
+
+    def render(self) -> str:
+        """
+        Renders all metrics in the Prometheus text format
+
+        Returns:
+            str: Metrics
+        """
+
+        with self._lock:
+            metrics = list(self._metrics)
+
+        return "".join(metric.render() for metric in metrics)
+
+
+class Metric:
+
+    type = ""
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = (), registry: MetricsRegistry | None = None):
+        """
+        Args:
+            name (str): Metric name
+            description (str): Help text of the metric
+            labelnames (tuple[str, ...]): Names of the labels, whose values are passed in the same order when recording
+            registry (MetricsRegistry | None): Registry the metric is rendered by. The process-wide registry if not set.
+        """
+
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.registry = registry or REGISTRY
+
+        # value per tuple of label values
+        self._values = {}
+        self._lock = threading.Lock()
+
+        self.registry.register(self)
+
+
+    def _format_labels(self, label_values: tuple, extra_labels: str = "") -> str:
+
+        labels = [f'{name}="{value}"' for name, value in zip(self.labelnames, label_values)]
+
+        if extra_labels:
+            labels.append(extra_labels)
+
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+
+    def _render_values(self) -> list[str]:
+
+        return [f"{self.name}{self._format_labels(label_values)} {value}" for label_values, value in self._values.items()]
+
+
+    def render(self) -> str:
+
+        with self._lock:
+            lines = self._render_values()
+
+        return f"# HELP {self.name} {self.description}\n# TYPE {self.name} {self.type}\n" + "".join(f"{line}\n" for line in lines)
+
+
+class Counter(Metric):
+
+    type = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+
+        if not self.registry.enabled:
+            return
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+
+    type = "gauge"
+
+    def set(self, value: float, *label_values):
+
+        if not self.registry.enabled:
+            return
+
+        with self._lock:
+            self._values[label_values] = value
+
+
+    def inc(self, *label_values, amount: float = 1):
+
+        if not self.registry.enabled:
+            return
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+    def dec(self, *label_values, amount: float = 1):
+
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = (), registry: MetricsRegistry | None = None,
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets (tuple[float, ...]): Upper bounds of the buckets, in ascending order
+        """
+
+        super().__init__(name, description, labelnames, registry)
+
+        self.buckets = tuple(buckets)
+
+
+    def observe(self, value: float, *label_values):
+
+        if not self.registry.enabled:
+            return
+
+        with self._lock:
+            # per-bucket (not cumulative) counts, with a final +Inf bucket, followed by the sum of the values
+            counts = self._values.setdefault(label_values, [0] * (len(self.buckets) + 1) + [0.0])
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+
+    def _render_values(self) -> list[str]:
+
+        lines = []
+
+        for label_values, counts in self._values.items():
+            cumulative_count = 0
+
+            for upper_bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative_count += count
+                bucket_label = f'le="{upper_bound}"'
+                lines.append(f"{self.name}_bucket{self._format_labels(label_values, bucket_label)} {cumulative_count}")
+
+            lines.append(f"{self.name}_sum{self._format_labels(label_values)} {counts[-1]}")
+            lines.append(f"{self.name}_count{self._format_labels(label_values)} {cumulative_count}")
+
+        return lines
+
+
+def start_metrics_server(port: int, registry: MetricsRegistry | None = None) -> ThreadingHTTPServer:
+    """
+    Serves the metrics on /metrics from a background thread, for processes without a web app such as the job worker.
+
+    Args:
+        port (int): Port to listen on
+        registry (MetricsRegistry | None): Registry whose metrics are served. The process-wide registry if not set.
+
+    Returns:
+        ThreadingHTTPServer: Metrics server
+    """
+
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+
+        def do_GET(self):
+
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+
+            content = registry.render().encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("%s -> Serving metrics on port %s", logger.name, server.server_address[1])
+
+    return server
+
+
+# Registry shared by all metrics of this process. Disabled until metrics are enabled in the config
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,161 @@
+"""
+Token-bucket rate limiter that queues callers until a token is free, up to a deadline
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """
+    Admits calls at a steady rate with bursts of up to `burst` calls. A caller that finds no token reserves the next one
+    and sleeps until it is due, so waiting callers are admitted in order and never retry against the API. Callers whose
+    token would not be due within their deadline are rejected right away instead of queueing.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1, max_wait_seconds: float = 10):
+        """
+        Args:
+            name (str): Name of the limited endpoint, used in log messages.
+            rate (float): Tokens added per second.
+            burst (int): Maximum number of tokens in the bucket, i.e. calls admitted at once after a quiet period.
+            max_wait_seconds (float): Default deadline in seconds for a caller to get a token.
+        """
+
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_wait_seconds = max_wait_seconds
+
+        # tokens can drop below zero, as each waiting caller reserves a token that is not yet in the bucket.
+        # Tokens are added from _updated_at onwards, which is in the future while the limiter is paused
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        self._stats = { "admitted": 0, "rejected": 0, "throttled": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0 }
+
+
+    def _refill(self, now: float):
+
+        # no tokens are added while the limiter is paused
+        if now > self._updated_at:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """
+        Takes a token, waiting until one is due
+
+        Args:
+            timeout (float | None): Maximum seconds to wait for a token. The limiter's max_wait_seconds if not set.
+
+        Returns:
+            bool: True if a token was taken, False if none would be due within the timeout
+        """
+
+        timeout = self.max_wait_seconds if timeout is None else timeout
+        started_at = time.monotonic()
+        deadline = started_at + timeout
+
+        with self._lock:
+            self._refill(started_at)
+
+            admitted_at = max(started_at, self._updated_at) + max(1 - self._tokens, 0) / self.rate
+
+            if admitted_at > deadline:
+                self._stats["rejected"] += 1
+                return False
+
+            self._tokens -= 1
+
+        # the limiter may have been paused by a 429 response while this caller was waiting
+        while (delay := admitted_at - time.monotonic()) > 0:
+            time.sleep(delay)
+
+            with self._lock:
+                admitted_at = max(admitted_at, self._paused_until)
+
+            if admitted_at > deadline:
+                with self._lock:
+                    self._stats["rejected"] += 1
+                    self._tokens = min(self._tokens + 1, self.burst)
+
+                return False
+
+        waited = time.monotonic() - started_at
+
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+        return True
+
+
+    def pause(self, seconds: float):
+        """
+        Holds back all callers for a number of seconds, e.g. as asked by the Retry-After header of a 429 response.
+        The bucket is emptied, so that calls resume at the steady rate rather than in a burst.
+
+        Args:
+            seconds (float): Seconds to pause for
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            self._refill(now)
+            self._tokens = min(self._tokens, 0)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._updated_at = max(self._updated_at, self._paused_until)
+            self._stats["throttled"] += 1
+
+        logger.warning("%s -> '%s' is throttling requests. Pausing calls for %.2f seconds.", logger.name, self.name, seconds)
+
+
+    def get_stats(self) -> dict[str, float]:
+        """
+        Gets the admission counters and wait times
+
+        Returns:
+            dict[str, float]: Admitted, rejected and throttled calls, and the mean and max wait time of admitted calls in seconds
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+
+        stats["mean_wait_seconds"] = stats.pop("total_wait_seconds") / stats["admitted"] if stats["admitted"] else 0.0
+
+        return stats
+
+
+def parse_retry_after(retry_after: str | None) -> float | None:
+    """
+    Parses the value of a Retry-After header, which is either a number of seconds or an HTTP date
+
+    Args:
+        retry_after (str | None): Header value
+
+    Returns:
+        float | None: Seconds to wait. None if the header is missing or invalid.
+    """
+
+    if not retry_after:
+        return None
+
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
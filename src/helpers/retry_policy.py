@@ -0,0 +1,127 @@
+"""
+Classification of failures as transient or permanent, and the backoff between retries
+"""
+
+import random
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# Client error (4xx) status codes of responses worth retrying later: request timeout, too early and throttling.
+# Every server-side (5xx) error is worth retrying as well
+TRANSIENT_CLIENT_ERROR_CODES = (408, 425, 429)
+
+def is_transient_status(status_code: int) -> bool:
+    """
+    Checks whether a failed response may succeed if the request is sent again later
+
+    Args:
+        status_code (int): Status code of the response
+
+    Returns:
+        bool: True if the failure is transient
+    """
+
+    return status_code in TRANSIENT_CLIENT_ERROR_CODES or 500 <= status_code < 600
+
+
+def is_transient_exception(exception: BaseException) -> bool:
+    """
+    Checks whether an exception may not recur if the call is repeated later, i.e. it was caused by the network
+    rather than by the input
+
+    Args:
+        exception (BaseException): Exception raised by the call
+
+    Returns:
+        bool: True if the failure is transient
+    """
+
+    return isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def is_unsent_request_error(exception: BaseException) -> bool:
+    """
+    Checks whether a request failed before it reached the server, so that it can be sent again even if it is not idempotent
+
+    Args:
+        exception (BaseException): Exception raised by the request
+
+    Returns:
+        bool: True if no connection could be established
+    """
+
+    if isinstance(exception, requests.exceptions.ConnectTimeout):
+        return True
+
+    reason = getattr(exception.args[0], "reason", None) if exception.args else None
+
+    return isinstance(reason, NewConnectionError)
+
+
+def get_backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Gets the delay before a retry using exponential backoff with full jitter
+
+    Args:
+        attempt (int): Number of the attempt that failed, starting at 1
+        base_delay (float): Delay cap of the first retry
+        max_delay (float): Delay cap of all retries
+
+    Returns:
+        float: Delay, in the unit of base_delay and max_delay
+    """
+
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (max(attempt, 1) - 1)))
+
+
+class RetryPolicy:
+    """
+    Decides how a job that failed transiently is handed back to Zeebe: with one retry less and a backoff that grows with
+    each retry already used, so that Zeebe re-delivers it later rather than the process taking its error path.
+    """
+
+    def __init__(self, initial_retries: int = 3, backoff_base_ms: int = 5000, backoff_max_ms: int = 300000):
+        """
+        Args:
+            initial_retries (int): Retries of a job when it is created, as defined on the service task. Used to work out
+                                   how many retries have been used.
+            backoff_base_ms (int): Backoff cap of the first retry in milliseconds.
+            backoff_max_ms (int): Backoff cap of all retries in milliseconds.
+        """
+
+        self.initial_retries = initial_retries
+        self.backoff_base_ms = backoff_base_ms
+        self.backoff_max_ms = backoff_max_ms
+
+
+    def can_retry(self, retries: int) -> bool:
+        """
+        Checks whether a job has retries left after the current attempt
+
+        Args:
+            retries (int): Retries of the activated job, including the current attempt
+
+        Returns:
+            bool: True if the job can be failed with retries
+        """
+
+        return retries > 1
+
+
+    def get_retry_back_off(self, retries: int) -> int:
+        """
+        Gets the time after which Zeebe re-delivers the job. At least half of the exponential cap, so that the backoff
+        grows with each retry, and jittered over the other half so that failed jobs do not come back all at once.
+
+        Args:
+            retries (int): Retries of the activated job, including the current attempt
+
+        Returns:
+            int: Backoff in milliseconds
+        """
+
+        attempt = max(self.initial_retries - retries + 1, 1)
+        cap = min(self.backoff_max_ms, self.backoff_base_ms * 2 ** (attempt - 1))
+
+        return int(cap / 2 + random.uniform(0, cap / 2))
@@ -1,18 +1,16 @@
+import dataclasses
 import logging
-import os
-import yaml
 
-from pathlib import Path
+from helpers.config import get_config
 
 logger = logging.getLogger(__name__)
 
-CONFIG_FILE_NAME = "config.yaml"
-
 class Utils:
 
     def get_config_values() -> dict[str, str]:
         """
-        Reads a yaml config file for the current file and returns its values
+        Gets the values of the yaml config file from the process-wide config, without reading the file again.
+        New code should use helpers.config.get_config() for typed access.
 
         Raises:
             Exception: When yaml file is not present.
@@ -21,21 +19,8 @@ class Utils:
             dict[str, str]: Key-value pairs of config items
         """
 
-        yaml_file_path = os.path.dirname(os.path.dirname(__file__)) + "/" + CONFIG_FILE_NAME
-
-        # retrieve config values from yaml file
-        if Path(yaml_file_path).exists:
-            with open(yaml_file_path, encoding='utf-8') as yaml_file:
-                yaml_config = yaml.safe_load(yaml_file)
-        else:
-            raise Exception(f"Missing {yaml_file_path} file.")
-        
-        config_values = {}
-
-        log_level = yaml_config.get("logging").get("log_level")
-        animal_api_url = yaml_config.get("animal_api_url")
-
-        config_values = config_values | { "log_level": log_level } | { "animal_api_url": animal_api_url }
+        config_values = dataclasses.asdict(get_config())
+        config_values["log_level"] = config_values.pop("logging").get("log_level")
 
         return config_values
 
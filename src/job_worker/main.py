@@ -2,14 +2,31 @@
 Entrypoint for job worker
 """
 
+import argparse
+import dataclasses
 import logging
+import multiprocessing
+import multiprocessing.connection
 import os
+import random
+import shutil
+import signal
+import tempfile
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 
 from dotenv import load_dotenv
 
-from service.animal_api_service import AnimalService
+from helpers.activation_scheduler import ActivationScheduler
+from helpers.config import JobWorkerConfig, SupervisorConfig, get_config, install_reload_signal_handler
+from helpers.logging_setup import configure_logging
+from helpers.metrics import REGISTRY, Gauge, Histogram, start_metrics_server
+from helpers.retry_policy import RetryPolicy, is_transient_exception
+from service.animal_api_service import AnimalApiError, AnimalService
 from service.camunda_service import CamundaService
+from service.result_reporter import ResultReporter
 
 # Name of service task to retrieve image
 SERVICE_TASK_JOB_TYPE = "retrieve-animal-image"
@@ -17,63 +34,316 @@ SERVICE_TASK_JOB_TYPE = "retrieve-animal-image"
 # Name of output variable that holds the animal image url
 OUTPUT_ANIMAL_URL_VAR = "animal_url"
 
- # Configure root-level logging.
- # For debugging purposes, this is currently set to DEBUG
- # TODO: Complete mechanism to overwrite log level based on a yaml config file
- # TODO: Add option to output to either StreamHandler or FileHandler or both
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+# Seconds a worker process must run for before exiting is no longer counted as a crash in a row
+STABLE_RUN_SECONDS = 60
+
+# Milliseconds added to the slow call threshold of the animal APIs for the lowest job timeout, to cover the rest of the job
+SLOW_CALL_MARGIN_MS = 10000
+
+# Metrics of the activation loop and the handled jobs
+JOBS_ACTIVATED = Histogram("worker_jobs_activated", "Jobs activated per activation request", buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+JOBS_IN_FLIGHT = Gauge("worker_jobs_in_flight", "Activated jobs whose handler has not finished")
+JOB_DURATION = Histogram("worker_job_duration_seconds", "Time from the activation of a job until its outcome is reported or queued for reporting")
+
+# Configure root-level logging from the logging section of the config file
+configure_logging(get_config().logging)
 
 logger = logging.getLogger(__name__)
 
 # Load the environment variables
 load_dotenv()
 
-# global variable to store the access token
-access_token = ""
-
-def main(camunda_service: CamundaService):
+def handle_job(job_reporter: CamundaService | ResultReporter, animal_service: AnimalService, job: dict, retry_policy: RetryPolicy | None = None):
+    """
+    Retrieves the animal image url for an activated job and reports the completion, error or failure of the job.
 
-    # Activate the jobs for the service task type
-    # NOTE: Set the timeout period to a relatively high 60 seconds as the call that handles the job completion can take around
-    #       45 seconds to complete depending on which animal is picked. The duck and fox REST services are slow
-    jobs = camunda_service.activate_jobs(service_task_job_type=SERVICE_TASK_JOB_TYPE, timeout=60000, max_jobs_to_activate=5)
+    Args:
+        job_reporter (CamundaService | ResultReporter): Reports the outcome, either directly or through the background senders
+        animal_service (AnimalService): AnimalService object
+        job (dict): Activated job
+        retry_policy (RetryPolicy | None): Hands transient failures back to Zeebe with a retry less and a backoff.
+                                           If not set, transient failures raise the BPMN error right away.
+    """
 
-    for job in jobs:
-        animal = job.get("variables").get("animal")
-        job_key = job.get("jobKey")
+    animal = job.get("variables").get("animal")
+    job_key = job.get("jobKey")
 
-        logger.debug("animal_var -> %s", animal)
-        logger.debug("job_key -> %s", job_key)
+    logger.debug("animal_var -> %s", animal)
+    logger.debug("job_key -> %s", job_key)
 
+    try:
         # get an image url based for the animal
-        animal_service = AnimalService()
         animal_image_url = animal_service.get_animal_url(animal=animal)
         logger.info("%s -> Retrieved URL for animal image %s: %s.", logger.name, animal, animal_image_url)
 
-        # handle the job failure or completion
-        if not animal_image_url:
-            camunda_service.throw_error_job(
-                job_key=job_key,
-                error_code="1",
-                error_message=f"Failed to get animal image for {animal}."
-            )
-        elif animal_image_url.endswith(".mp4"):
-            camunda_service.throw_error_job(
-                job_key=job_key,
-                error_code="2",
-                error_message=f"Incorrect extension for {animal} in url {animal_image_url}."
-            )
+    except AnimalApiError as exception:
+        logger.error("%s -> Failed to get animal image for job %s -> %s", logger.name, job_key, str(exception))
+
+        job_reporter.throw_error_job(
+            job_key=job_key,
+            error_code="1",
+            error_message=f"Failed to get animal image for {animal}: {exception}"
+        )
+        return
+
+    except Exception as exception:
+        logger.exception("%s -> Unexpected error while handling job %s", logger.name, job_key)
+
+        if is_transient_exception(exception) and retry_transient_failure(job_reporter, job, str(exception), retry_policy):
+            return
+
+        # any other failure, such as an unknown animal, is permanent and raises the BPMN error right away
+        job_reporter.throw_error_job(
+            job_key=job_key,
+            error_code="1",
+            error_message=f"Failed to get animal image for {animal}: {exception}"
+        )
+        return
+
+    # handle the job failure or completion
+    if not animal_image_url:
+        # the animal service only returns no url if the API failed transiently, was throttled or its circuit is open, all of which may recover.
+        # Permanent error statuses are raised as AnimalApiError instead
+        if retry_transient_failure(job_reporter, job, f"Failed to get animal image for {animal}.", retry_policy):
+            return
+
+        job_reporter.throw_error_job(
+            job_key=job_key,
+            error_code="1",
+            error_message=f"Failed to get animal image for {animal}."
+        )
+    elif animal_image_url.endswith(".mp4"):
+        job_reporter.throw_error_job(
+            job_key=job_key,
+            error_code="2",
+            error_message=f"Incorrect extension for {animal} in url {animal_image_url}."
+        )
+    else:
+        job_reporter.complete_job(job_key=job_key, variables={ OUTPUT_ANIMAL_URL_VAR: animal_image_url })
+
+
+def retry_transient_failure(job_reporter: CamundaService | ResultReporter, job: dict, error_message: str, retry_policy: RetryPolicy | None) -> bool:
+    """
+    Fails a job with one retry less and a backoff, so that Zeebe re-delivers it later, if the job has retries left.
+
+    Args:
+        job_reporter (CamundaService | ResultReporter): Reports the failure
+        job (dict): Activated job
+        error_message (str): Description of the failure
+        retry_policy (RetryPolicy | None): Retry policy. No retries if not set.
+
+    Returns:
+        bool: True if the job was failed with retries, False if the failure is final
+    """
+
+    retries = job.get("retries", 0)
+
+    if retry_policy is None or not retry_policy.can_retry(retries):
+        return False
+
+    retry_back_off = retry_policy.get_retry_back_off(retries)
+
+    logger.warning("%s -> Job %s failed transiently. Retrying %s more time(s), next in %s ms -> %s",
+                   logger.name, job.get("jobKey"), retries - 1, retry_back_off, error_message)
+
+    job_reporter.fail_job(job_key=job.get("jobKey"), error_message=error_message, retries=retries - 1, retry_back_off=retry_back_off)
+
+    return True
+
+
+def acquire_job_slots(job_slots: threading.Semaphore, max_slots: int, wait_seconds: float = 0) -> int:
+    """
+    Waits until at least one job slot is free and then acquires as many of the free slots as possible.
+
+    Args:
+        job_slots (threading.Semaphore): Semaphore counting the free job slots of the executor
+        max_slots (int): Maximum number of slots to acquire
+        wait_seconds (float): Time to wait for more slots to be freed after the first one
+
+    Returns:
+        int: Number of slots acquired
+    """
+
+    job_slots.acquire()
+    acquired = 1
+    deadline = time.monotonic() + wait_seconds
+
+    while acquired < max_slots and job_slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        acquired += 1
+
+    return acquired
+
+
+def main(camunda_service: CamundaService, animal_service: AnimalService, executor: ThreadPoolExecutor, job_slots: threading.Semaphore,
+         worker_config: JobWorkerConfig, result_reporter: ResultReporter | None = None, scheduler: ActivationScheduler | None = None,
+         retry_policy: RetryPolicy | None = None) -> list | None:
+    """
+    Performs one activation cycle: waits for free capacity, long-polls for at most as many jobs as there are free slots
+    and dispatches the activated jobs to the executor.
+
+    Args:
+        camunda_service (CamundaService): CamundaService object
+        animal_service (AnimalService): AnimalService object
+        executor (ThreadPoolExecutor): Executor that handles the jobs
+        job_slots (threading.Semaphore): Semaphore counting the free job slots of the executor
+        worker_config (JobWorkerConfig): job_worker config values
+        result_reporter (ResultReporter | None): Reports the job outcomes in the background. If not set, each job reports its own outcome.
+        scheduler (ActivationScheduler | None): Sizes the activation and sets its timeouts from the load. If not set, all free slots
+                                                are activated with the configured timeouts.
+        retry_policy (RetryPolicy | None): Hands transient job failures back to Zeebe with retries
+
+    Returns:
+        list | None: Activated jobs. None if the activation request failed.
+    """
+
+    if scheduler:
+        free_slots = acquire_job_slots(job_slots, scheduler.get_batch_limit(), scheduler.get_slot_wait())
+        job_timeout = scheduler.get_job_timeout(worker_config.job_timeout_ms)
+        request_timeout = scheduler.get_request_timeout(worker_config.request_timeout_ms)
+    else:
+        free_slots = acquire_job_slots(job_slots, worker_config.max_concurrent_jobs)
+        job_timeout = worker_config.job_timeout_ms
+        request_timeout = worker_config.request_timeout_ms
+
+    # Activate the jobs for the service task type. The gateway holds the request open until jobs are available or the request timeout expires
+    # NOTE: The job timeout is set to a relatively high 60 seconds by default as the call that handles the job completion can take around
+    #       45 seconds to complete depending on which animal is picked. The duck and fox REST services are slow.
+    #       The scheduler lowers it once the job durations are known
+    jobs = camunda_service.activate_jobs(
+        service_task_job_type=SERVICE_TASK_JOB_TYPE,
+        timeout=job_timeout,
+        max_jobs_to_activate=free_slots,
+        request_timeout=request_timeout,
+        worker=worker_config.worker_name
+    )
+
+    activated_at = time.monotonic()
+
+    if jobs is not None:
+        JOBS_ACTIVATED.observe(len(jobs))
+
+        if scheduler:
+            scheduler.record_activation(free_slots, len(jobs))
+
+    # give back the slots that were not filled by the activation
+    for _ in range(free_slots - len(jobs or [])):
+        job_slots.release()
+
+    # Handle the jobs concurrently. Each job frees its slot as soon as its outcome is reported or queued for reporting
+    for job in jobs or []:
+        JOBS_IN_FLIGHT.inc()
+        future = executor.submit(handle_job, result_reporter or camunda_service, animal_service, job, retry_policy)
+        future.add_done_callback(lambda future, job_key=job.get("jobKey"): on_job_done(future, job_key, job_slots, activated_at, scheduler))
+
+    return jobs
+
+
+def on_job_done(future: Future, job_key: str, job_slots: threading.Semaphore, activated_at: float | None = None,
+                scheduler: ActivationScheduler | None = None):
+    """
+    Frees the job slot of a finished job and logs any error raised while handling it.
+
+    Args:
+        future (Future): Future of the finished job
+        job_key (str): Key of the job
+        job_slots (threading.Semaphore): Semaphore counting the free job slots of the executor
+        activated_at (float | None): time.monotonic() value when the job was activated
+        scheduler (ActivationScheduler | None): Scheduler the job duration is recorded for
+    """
+
+    job_slots.release()
+
+    JOBS_IN_FLIGHT.dec()
+
+    if activated_at is not None:
+        job_duration = time.monotonic() - activated_at
+        JOB_DURATION.observe(job_duration)
+
+        if scheduler:
+            scheduler.record_job_duration(job_duration)
+
+    if future.exception():
+        logger.error("%s -> Failed to handle job %s -> %s", logger.name, job_key, future.exception())
+
+
+def get_backoff_delay(failures: int, worker_config: JobWorkerConfig) -> float:
+    """
+    Gets the delay before the next activation after consecutive failed activations, using exponential backoff with full jitter.
+
+    Args:
+        failures (int): Number of consecutive failed activations
+        worker_config (JobWorkerConfig): job_worker config values
+
+    Returns:
+        float: Delay in seconds
+    """
+
+    base_delay = worker_config.backoff_base_seconds
+    max_delay = worker_config.backoff_max_seconds
+
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (failures - 1)))
+
+
+def run(camunda_service: CamundaService, animal_service: AnimalService, executor: ThreadPoolExecutor, worker_config: JobWorkerConfig,
+        result_reporter: ResultReporter | None = None):
+    """
+    Continuously activates and handles jobs, backing off with jitter while the gateway rejects activations (e.g. under backpressure).
+    Timeouts and backoff are read from the process-wide config on every cycle so that config reloads apply without a restart.
+    The number of concurrent jobs is fixed by the executor and the worker name by the process.
+
+    Args:
+        camunda_service (CamundaService): CamundaService object
+        animal_service (AnimalService): AnimalService object
+        executor (ThreadPoolExecutor): Executor that handles the jobs
+        worker_config (JobWorkerConfig): job_worker config values
+        result_reporter (ResultReporter | None): Reports the job outcomes in the background
+    """
+
+    job_slots = threading.Semaphore(worker_config.max_concurrent_jobs)
+    failures = 0
+
+    scheduler_config = worker_config.activation_scheduler
+    scheduler = ActivationScheduler(
+        max_concurrent_jobs=worker_config.max_concurrent_jobs,
+        min_job_timeout_ms=max(scheduler_config.min_job_timeout_ms,
+                               int(get_config().animal_service.circuit_breaker.slow_call_seconds * 1000) + SLOW_CALL_MARGIN_MS),
+        job_timeout_factor=scheduler_config.job_timeout_factor,
+        max_slot_wait_seconds=scheduler_config.max_slot_wait_seconds,
+        jitter=scheduler_config.jitter
+    ) if scheduler_config.enabled else None
+
+    retry_policy_config = worker_config.retry_policy
+    retry_policy = RetryPolicy(
+        initial_retries=retry_policy_config.initial_retries,
+        backoff_base_ms=retry_policy_config.backoff_base_ms,
+        backoff_max_ms=retry_policy_config.backoff_max_ms
+    ) if retry_policy_config.enabled else None
+
+    while True:
+        cycle_config = dataclasses.replace(get_config().job_worker, max_concurrent_jobs=worker_config.max_concurrent_jobs, worker_name=worker_config.worker_name)
+        jobs = main(camunda_service, animal_service, executor, job_slots, cycle_config, result_reporter, scheduler, retry_policy)
+
+        if jobs is None:
+            failures += 1
+            delay = get_backoff_delay(failures, cycle_config)
+
+            logger.warning("%s -> Job activation failed %s time(s) in a row. Retrying in %.2f seconds.", logger.name, failures, delay)
+            time.sleep(delay)
         else:
-            animal_image_url = camunda_service.complete_job(job_key, variables={ OUTPUT_ANIMAL_URL_VAR: animal_image_url })
+            failures = 0
+
+        logger.debug("%s -> Connection pool stats: %s", logger.name, camunda_service.transport.get_pool_stats())
+        logger.debug("%s -> Prefetch stats: %s", logger.name, animal_service.get_prefetch_stats())
+        logger.debug("%s -> Rate limit stats: %s", logger.name, animal_service.get_rate_limit_stats())
+
+        if result_reporter:
+            logger.debug("%s -> Result reporter stats: %s", logger.name, result_reporter.get_stats())
+
+        if scheduler:
+            logger.debug("%s -> Activation scheduler stats: %s", logger.name, scheduler.get_stats())
 
 
-def initialise_camunda_service() -> CamundaService:
+def initialise_camunda_service(token_cache_file: str | None = None) -> CamundaService:
     """
     Initialises an instance of the camunda service and sets its properties from environment variables
 
@@ -84,6 +354,9 @@ def initialise_camunda_service() -> CamundaService:
         - CAMUNDA_CLIENT_SECRET: The client secret used to request an access token from the authorization server.
         - CAMUNDA_OAUTH_URL: The URL of the authorization server from which the access token can be requested.
 
+    Args:
+        token_cache_file (str | None): File through which the access token is shared with the other worker processes
+
     Returns:
         CamundaService: Instance of camunda service
     """
@@ -93,18 +366,161 @@ def initialise_camunda_service() -> CamundaService:
         token_audience = os.getenv('CAMUNDA_TOKEN_AUDIENCE'),
         client_id = os.getenv('CAMUNDA_CLIENT_ID'),
         client_secret = os.getenv('CAMUNDA_CLIENT_SECRET'),
-        auth_url = os.getenv('CAMUNDA_OAUTH_URL')
+        auth_url = os.getenv('CAMUNDA_OAUTH_URL'),
+        token_cache_file = token_cache_file
     )
 
 
-if __name__ == "__main__":
+def start_worker(process_number: int | None = None, token_cache_file: str | None = None):
+    """
+    Sets up the services of a worker process from the config and runs its activation loop.
 
-    camunda_service_init = initialise_camunda_service()
+    Args:
+        process_number (int | None): Number of the worker process, starting at 1, when started by the supervisor.
+                                     It is appended to the worker name and added to the metrics port.
+        token_cache_file (str | None): File through which the access token is shared with the other worker processes
+    """
 
-    # get the access_token and set the value to the global variable
-    camunda_service_init.get_token()
-    access_token = camunda_service_init.access_token
+    # the access token is requested on first use and refreshed in the background ahead of expiry
+    camunda_service_init = initialise_camunda_service(token_cache_file)
 
-    while True:
-        main(camunda_service_init)
-        time.sleep(60)
+    # the config is parsed once, then reloaded when the file changes or on SIGHUP
+    install_reload_signal_handler()
+    worker_config_values = get_config().job_worker
+
+    if process_number is not None:
+        worker_config_values = dataclasses.replace(worker_config_values, worker_name=f"{worker_config_values.worker_name}-{process_number}")
+
+    # metrics are only recorded when enabled, and served on their own port as the worker has no web app
+    REGISTRY.enabled = get_config().metrics.enabled
+
+    if REGISTRY.enabled and get_config().metrics.worker_port:
+        start_metrics_server(get_config().metrics.worker_port + (process_number or 1) - 1)
+
+    # one animal service is shared by all jobs so that its prefetched image urls are reused
+    animal_service_init = AnimalService(prefetch=get_config().animal_service.prefetch.enabled)
+
+    # bounded pool of threads that handle the activated jobs concurrently
+    job_executor = ThreadPoolExecutor(max_workers=worker_config_values.max_concurrent_jobs, thread_name_prefix="job")
+
+    # job outcomes are reported by background senders so that a slow acknowledgement never holds up the next job
+    reporter_config = worker_config_values.result_reporter
+    result_reporter_init = ResultReporter(
+        camunda_service_init,
+        senders=reporter_config.senders,
+        max_attempts=reporter_config.max_attempts,
+        retry_base_seconds=reporter_config.retry_base_seconds,
+        queue_size=reporter_config.queue_size
+    )
+
+    logger.info("%s -> Worker '%s' started", logger.name, worker_config_values.worker_name)
+
+    run(camunda_service_init, animal_service_init, job_executor, worker_config_values, result_reporter_init)
+
+
+def get_restart_delay(crashes: int, supervisor_config: SupervisorConfig) -> float:
+    """
+    Gets the delay before a worker process is restarted, doubling with each crash in a row.
+
+    Args:
+        crashes (int): Number of times in a row the worker process exited within STABLE_RUN_SECONDS of being started
+        supervisor_config (SupervisorConfig): job_worker.supervisor config values
+
+    Returns:
+        float: Delay in seconds
+    """
+
+    return min(supervisor_config.restart_delay_max_seconds, supervisor_config.restart_delay_seconds * 2 ** (max(crashes, 1) - 1))
+
+
+def supervise(processes: int, supervisor_config: SupervisorConfig, target: Callable[[int, str], None] = start_worker,
+              stop_event: threading.Event | None = None):
+    """
+    Runs the worker in several processes, each with its own activation loop, and restarts the processes that exit.
+    The processes share one access token through a cache file. Returns when stop_event is set or on SIGTERM or SIGINT,
+    after terminating the worker processes. SIGHUP is forwarded to the worker processes to reload their config.
+
+    Args:
+        processes (int): Number of worker processes
+        supervisor_config (SupervisorConfig): job_worker.supervisor config values
+        target (Callable[[int, str], None]): Function run by each worker process with its number and the token cache file
+        stop_event (threading.Event | None): Stops the supervisor when set
+    """
+
+    stop_event = stop_event or threading.Event()
+    token_cache_dir = None if supervisor_config.token_cache_file else tempfile.mkdtemp(prefix="job-worker-")
+    token_cache_file = supervisor_config.token_cache_file or os.path.join(token_cache_dir, "access_token")
+
+    # worker processes are spawned rather than forked, as this process already runs threads, e.g. the config watcher
+    context = multiprocessing.get_context("spawn")
+
+    # process, start time, crashes in a row and restart time per process number
+    workers = { process_number: (None, 0, 0, 0) for process_number in range(1, processes + 1) }
+
+    def start_process(process_number: int, crashes: int):
+        process = context.Process(target=target, args=(process_number, token_cache_file), name=f"worker-{process_number}")
+        process.start()
+
+        workers[process_number] = (process, time.monotonic(), crashes, 0)
+        logger.info("%s -> Started worker process %s (pid %s)", logger.name, process_number, process.pid)
+
+    def forward_signal(signum, frame):
+        for process, *_ in workers.values():
+            if process and process.is_alive():
+                os.kill(process.pid, signum)
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, forward_signal)
+
+    try:
+        while not stop_event.is_set():
+            now = time.monotonic()
+
+            for process_number, (process, started_at, crashes, restart_at) in list(workers.items()):
+                if process is None:
+                    if now >= restart_at:
+                        start_process(process_number, crashes)
+                elif not process.is_alive():
+                    crashes = crashes + 1 if now - started_at < STABLE_RUN_SECONDS else 1
+                    delay = get_restart_delay(crashes, supervisor_config)
+
+                    logger.error("%s -> Worker process %s exited with code %s. Restarting in %.2f seconds.", logger.name, process_number, process.exitcode, delay)
+                    workers[process_number] = (None, started_at, crashes, now + delay)
+
+            sentinels = [process.sentinel for process, *_ in workers.values() if process]
+            multiprocessing.connection.wait(sentinels, timeout=min(supervisor_config.restart_delay_seconds, 1))
+
+    finally:
+        for process, *_ in workers.values():
+            if process and process.is_alive():
+                process.terminate()
+
+        for process, *_ in workers.values():
+            if process:
+                process.join()
+
+        if token_cache_dir:
+            shutil.rmtree(token_cache_dir, ignore_errors=True)
+
+
+def parse_args(args: list[str] | None = None) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="Job worker that retrieves animal images.")
+    parser.add_argument("--processes", type=int, help="worker processes run by a supervisor. Defaults to job_worker.supervisor.processes")
+
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+
+    arguments = parse_args()
+    process_count = arguments.processes or get_config().job_worker.supervisor.processes
+
+    if process_count > 1:
+        supervise(process_count, get_config().job_worker.supervisor)
+    else:
+        start_worker()
@@ -2,11 +2,25 @@
 Service to retrieve animal image
 """
 
-import json
+import dataclasses
 import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import requests
 
-from helpers.utils import Utils
+from helpers.circuit_breaker import CircuitBreaker
+from helpers.hedging import HedgeBudget, LatencyTracker
+from helpers.http_transport import get_shared_transport
+from helpers.json_codec import get_codec
+from helpers.logging_setup import LazyJson
+from helpers.metrics import Counter, Histogram
+from helpers.rate_limiter import RateLimiter, parse_retry_after
+from helpers.retry_policy import is_transient_status
+from helpers.config import get_config
 
 # Stores the property within the json response body that contains the image url
 RESPONSE_BODY_PROP = {
@@ -15,49 +29,503 @@ RESPONSE_BODY_PROP = {
     "fox": "image"
 }
 
+# Extensions of urls that point to videos rather than images
+VIDEO_EXTENSIONS = (".mp4", ".webm")
+
+# Seconds a prefetcher waits after failing to get a valid url
+PREFETCH_RETRY_SECONDS = 1
+
+# Latency of the calls to each animal API
+ANIMAL_API_DURATION = Histogram("animal_api_request_duration_seconds", "Duration of requests to the animal APIs", ("animal", "outcome"))
+ANIMAL_API_RATE_LIMIT_WAIT = Histogram("animal_api_rate_limit_wait_seconds", "Time spent waiting for a rate limiter token", ("animal", "outcome"))
+ANIMAL_API_THROTTLED = Counter("animal_api_throttled_total", "Responses with status 429 from the animal APIs", ("animal",))
+
 logger = logging.getLogger(__name__)
 
+class AnimalApiError(Exception):
+    """
+    Raised when an animal API rejects a request with a status that repeating the request will not change, e.g. 404.
+    """
+
+    def __init__(self, animal: str, status_code: int):
+        """
+        Args:
+            animal (str): Animal type
+            status_code (int): Status code of the response
+        """
+
+        super().__init__(f"Animal API of '{animal}' rejected the request. Status Code: {status_code}")
+
+        self.animal = animal
+        self.status_code = status_code
+
+
 class AnimalService:
 
-    def __init__(self):
+    def __init__(self, prefetch: bool = False, animal_api_url: dict[str, str] | None = None):
+        """
+        Args:
+            prefetch (bool): Keeps a buffer of fresh image urls per animal, refilled by background fetchers,
+                             so that most lookups are served from memory.
+            animal_api_url (dict[str, str] | None): Api url per animal. Taken from the process-wide config if not set.
+        """
 
-        # get the api urls from teh config file
-        self.animal_api_url = Utils.get_config_values().get("animal_api_url")
+        # get the api urls from the process-wide config
+        self.animal_api_url = animal_api_url or get_config().animal_api_url
         logger.debug("animal_api_url -> %s", self.animal_api_url)
 
+        # pooled keep-alive connections shared with the other services of this process
+        self.transport = get_shared_transport()
+        self.codec = get_codec()
+
+        animal_service_config = get_config().animal_service
+
+        # one circuit breaker per animal API, so that a failing API fails fast without affecting the others
+        circuit_breaker_config = dataclasses.asdict(animal_service_config.circuit_breaker)
+        self._circuit_breakers = {
+            animal: CircuitBreaker(name=url, **circuit_breaker_config) for animal, url in self.animal_api_url.items()
+        }
+
+        # recently seen urls per animal, served while the animal's circuit is open
+        stale_fallback_config = animal_service_config.stale_fallback
+        self.stale_fallback = stale_fallback_config.enabled
+        self._recent_urls = { animal: deque(maxlen=stale_fallback_config.history_size) for animal in self.animal_api_url }
+
+        # latency distribution per animal API, used to decide when to send a hedged request
+        hedging_config = animal_service_config.hedging
+        self.hedged_animals = set(hedging_config.animals) if hedging_config.enabled else set()
+        self.hedge_percentile = hedging_config.percentile
+        self._latency_trackers = {
+            animal: LatencyTracker(window_size=hedging_config.window_size, minimum_samples=hedging_config.minimum_samples)
+            for animal in self.animal_api_url
+        }
+        self._hedge_budget = HedgeBudget(
+            max_hedge_ratio=hedging_config.max_hedge_ratio,
+            max_concurrent_hedges=hedging_config.max_concurrent_hedges
+        )
+        self._hedge_executor = ThreadPoolExecutor(max_workers=hedging_config.max_workers, thread_name_prefix="hedge") \
+            if self.hedged_animals else None
+
+        # one token bucket per animal API, so that bursts of lookups queue here instead of being throttled by the API
+        rate_limit_config = animal_service_config.rate_limit
+        self.default_retry_after = rate_limit_config.default_retry_after_seconds
+        self._rate_limiters = {
+            animal: RateLimiter(
+                name=url,
+                rate=rate_limit_config.animals.get(animal, rate_limit_config.requests_per_second),
+                burst=rate_limit_config.burst,
+                max_wait_seconds=rate_limit_config.max_wait_seconds
+            )
+            for animal, url in self.animal_api_url.items()
+        } if rate_limit_config.enabled else {}
+
+        self.prefetch = prefetch
+        self._stopped = threading.Event()
+
+        if prefetch:
+            self._start_prefetch()
+
+
+    def _start_prefetch(self):
+        """
+        Creates the per-animal url buffers and starts their background fetchers.
+        """
+
+        prefetch_config = get_config().animal_service.prefetch
+        logger.debug("prefetch -> %s", prefetch_config)
+
+        self.buffer_size = prefetch_config.buffer_size
+        self.low_water_mark = prefetch_config.low_water_mark
+        self.max_age_seconds = prefetch_config.max_age_seconds
+
+        # buffered (fetched at, url) entries, oldest first
+        self._buffers = { animal: deque() for animal in self.animal_api_url }
+        self._buffer_conditions = { animal: threading.Condition() for animal in self.animal_api_url }
+        self._prefetch_stats = { animal: { "hits": 0, "misses": 0 } for animal in self.animal_api_url }
+
+        for animal in self.animal_api_url:
+            for fetcher in range(prefetch_config.fetchers_per_animal):
+                threading.Thread(target=self._run_fetcher, args=(animal,), name=f"prefetch-{animal}-{fetcher}", daemon=True).start()
+
+
+    def _run_fetcher(self, animal: str):
+        """
+        Refills the url buffer of an animal whenever it drops below the low-water mark, until the buffer is full.
+
+        Args:
+            animal (str): Animal type
+        """
+
+        buffer = self._buffers[animal]
+        condition = self._buffer_conditions[animal]
+
+        while not self._stopped.is_set():
+            with condition:
+                condition.wait_for(lambda: self._stopped.is_set() or len(buffer) < self.low_water_mark)
+
+            while not self._stopped.is_set() and len(buffer) < self.buffer_size:
+                try:
+                    url = self._fetch_animal_url(animal, allow_stale=False)
+                except AnimalApiError:
+                    url = ""
+
+                if not self.is_valid_url(url):
+                    # back off briefly so that a failing API is not called in a tight loop
+                    self._stopped.wait(PREFETCH_RETRY_SECONDS)
+                    continue
+
+                with condition:
+                    buffer.append((time.monotonic(), url))
+
+
+    @staticmethod
+    def is_valid_url(url: str) -> bool:
+        """
+        Checks that the url can be displayed as an image
+
+        Args:
+            url (str): Animal image url
+
+        Returns:
+            bool: True if the url is not empty and does not point to a video
+        """
+
+        return bool(url) and not url.lower().endswith(VIDEO_EXTENSIONS)
+
+
+    def _take_prefetched_url(self, animal: str) -> str:
+        """
+        Takes the oldest fresh url from the buffer of an animal, discarding urls older than the maximum age.
+
+        Args:
+            animal (str): Animal type
+
+        Returns:
+            str: Animal image url. Empty string if no fresh url is buffered.
+        """
+
+        buffer = self._buffers[animal]
+        condition = self._buffer_conditions[animal]
+
+        with condition:
+            url = ""
+
+            while buffer and not url:
+                fetched_at, buffered_url = buffer.popleft()
+
+                if time.monotonic() - fetched_at <= self.max_age_seconds:
+                    url = buffered_url
+
+            self._prefetch_stats[animal]["hits" if url else "misses"] += 1
+
+            # wake up the fetchers if the buffer dropped below the low-water mark
+            condition.notify_all()
+
+        return url
+
+
+    def get_prefetch_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Gets the prefetch buffer hit and miss counters
+
+        Returns:
+            dict[str, dict[str, float]]: Hits, misses, hit rate and buffered urls keyed by animal
+        """
+
+        if not self.prefetch:
+            return {}
+
+        prefetch_stats = {}
+
+        for animal, animal_stats in self._prefetch_stats.items():
+            lookups = animal_stats["hits"] + animal_stats["misses"]
+
+            prefetch_stats[animal] = animal_stats | {
+                "hit_rate": animal_stats["hits"] / lookups if lookups else 0.0,
+                "buffered": len(self._buffers[animal])
+            }
+
+        return prefetch_stats
+
+
+    def get_rate_limit_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Gets the admission counters and wait times of the rate limiters
+
+        Returns:
+            dict[str, dict[str, float]]: Rate limiter stats keyed by animal. Empty if rate limiting is disabled.
+        """
+
+        return { animal: rate_limiter.get_stats() for animal, rate_limiter in self._rate_limiters.items() }
+
+
+    def _acquire_rate_limit(self, animal: str, timeout: float | None = None) -> bool:
+        """
+        Waits for a token of the animal API's rate limiter, if rate limiting is enabled
+
+        Args:
+            animal (str): Animal type
+            timeout (float | None): Maximum seconds to wait. The configured max_wait_seconds if not set.
+
+        Returns:
+            bool: True if the API may be called
+        """
+
+        rate_limiter = self._rate_limiters.get(animal)
+
+        if rate_limiter is None:
+            return True
+
+        started_at = time.monotonic()
+        admitted = rate_limiter.acquire(timeout)
+        ANIMAL_API_RATE_LIMIT_WAIT.observe(time.monotonic() - started_at, animal, "admitted" if admitted else "rejected")
+
+        return admitted
+
+
+    def close(self):
+        """
+        Stops the background fetchers and the hedged request threads.
+        """
+
+        self._stopped.set()
+
+        if self._hedge_executor:
+            self._hedge_executor.shutdown(wait=False)
+
+        if self.prefetch:
+            for condition in self._buffer_conditions.values():
+                with condition:
+                    condition.notify_all()
+
 
     def get_animal_url(self, animal: str) -> str:
         """
-        Gets the animal image url
+        Gets the animal image url. When prefetching is enabled, the url is taken from the animal's buffer
+        and the API is only called if the buffer is empty.
 
         Args:
             animal (str): Animal type
 
+        Raises:
+            AnimalApiError: When the API rejected the request with a permanent error status.
+
         Returns:
-            str: Animal image url
+            str: Animal image url. Empty string if the API failed transiently.
         """
 
         logger.debug("%s -> Animal: %s", logger.name, animal)
 
+        if self.prefetch and animal in self._buffers:
+            url = self._take_prefetched_url(animal)
+
+            if url:
+                logger.debug("%s -> Prefetched animal image url: %s", logger.name, url)
+                return url
+
+        return self._fetch_animal_url(animal)
+
+
+    def _fetch_animal_url(self, animal: str, allow_stale: bool = True) -> str:
+        """
+        Calls the animal API through its circuit breaker. While the circuit is open, the API is not called and,
+        if enabled, a recently seen url is served instead.
+
+        Args:
+            animal (str): Animal type
+            allow_stale (bool): Whether a recently seen url may be served while the circuit is open
+
+        Raises:
+            AnimalApiError: When the API rejected the request with a permanent error status.
+
+        Returns:
+            str: Animal image url. Empty string if the API failed transiently, or the circuit is open and no recent url is available.
+        """
+
+        circuit_breaker = self._circuit_breakers[animal]
+
+        if not circuit_breaker.allow_request():
+            logger.warning("%s -> Circuit for '%s' is open. Skipping the API call.", logger.name, animal)
+            return self._get_recent_url(animal) if allow_stale else ""
+
+        # rejections by the rate limiter say nothing about the health of the API, so they are not recorded by the circuit breaker.
+        # The call is given back instead, as it may have been the trial call of a half-open circuit
+        if not self._acquire_rate_limit(animal):
+            circuit_breaker.release()
+            logger.warning("%s -> No rate limit token for '%s' within the deadline. Skipping the API call.", logger.name, animal)
+            return self._get_recent_url(animal) if allow_stale else ""
+
+        started_at = time.monotonic()
+        url = ""
+
+        # the outcome is recorded even if the call raises, so that a half-open circuit never waits for a trial call forever
+        try:
+            url = self._request_with_hedging(animal)
+        finally:
+            circuit_breaker.record(success=bool(url), duration=time.monotonic() - started_at)
+
+        if self.is_valid_url(url):
+            self._recent_urls[animal].append(url)
+
+        return url
+
+
+    def _request_with_hedging(self, animal: str) -> str:
+        """
+        Calls the animal API. If hedging is enabled for the animal and the call has not answered within the configured
+        latency percentile of the API, a second call is sent and whichever successful response arrives first is used.
+        The other call is left to finish in the background and its result is ignored.
+
+        Args:
+            animal (str): Animal type
+
+        Returns:
+            str: Animal image url
+        """
+
+        latency_tracker = self._latency_trackers[animal]
+
+        if animal not in self.hedged_animals:
+            return self._timed_request(animal, latency_tracker)
+
+        self._hedge_budget.record_request()
+        hedge_delay = latency_tracker.percentile(self.hedge_percentile)
+
+        if hedge_delay is None:
+            return self._timed_request(animal, latency_tracker)
+
+        first_request = self._hedge_executor.submit(self._timed_request, animal, latency_tracker)
+        done, _ = wait([first_request], timeout=hedge_delay)
+
+        # a hedged request is only worth sending if the rate limiter has a token free right away
+        if done or not self._hedge_budget.try_acquire():
+            return first_request.result()
+
+        if not self._acquire_rate_limit(animal, timeout=0):
+            self._hedge_budget.release()
+            return first_request.result()
+
+        logger.info("%s -> No response from '%s' API after %.2f seconds. Sending a hedged request.", logger.name, animal, hedge_delay)
+
+        hedged_request = self._hedge_executor.submit(self._timed_request, animal, latency_tracker)
+        hedged_request.add_done_callback(lambda _: self._hedge_budget.release())
+
+        pending = {first_request, hedged_request}
+        url = ""
+
+        while pending and not url:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            url = next((future.result() for future in done if future.result()), "")
+
+        return url
+
+
+    def _timed_request(self, animal: str, latency_tracker: LatencyTracker) -> str:
+        """
+        Calls the animal API and records the latency of successful calls
+
+        Args:
+            animal (str): Animal type
+            latency_tracker (LatencyTracker): Latency tracker of the animal API
+
+        Returns:
+            str: Animal image url
+        """
+
+        started_at = time.monotonic()
+        url = self._request_animal_url(animal)
+
+        if url:
+            latency_tracker.record(time.monotonic() - started_at)
+
+        return url
+
+
+    def _get_recent_url(self, animal: str) -> str:
+        """
+        Gets one of the most recently seen urls of an animal, if the stale fallback is enabled
+
+        Args:
+            animal (str): Animal type
+
+        Returns:
+            str: Animal image url. Empty string if the stale fallback is disabled or no url has been seen.
+        """
+
+        recent_urls = list(self._recent_urls[animal])
+
+        if not self.stale_fallback or not recent_urls:
+            return ""
+
+        url = random.choice(recent_urls)
+        logger.info("%s -> Serving recently seen url for '%s': %s", logger.name, animal, url)
+
+        return url
+
+
+    def _request_animal_url(self, animal: str) -> str:
+        """
+        Calls the animal API to get an animal image url
+
+        Args:
+            animal (str): Animal type
+
+        Raises:
+            AnimalApiError: When the API rejected the request with a permanent error status, e.g. 404.
+
+        Returns:
+            str: Animal image url. Empty string if the call failed transiently, e.g. with a 503 response or a connection error.
+        """
+
         url = self.animal_api_url[animal]
 
         logger.debug("%s -> Animal image url: %s", logger.name, url)
 
-        try:
-            session = requests.Session()
+        started_at = time.perf_counter()
 
-            response = session.get(
+        try:
+            response = self.transport.get(
                 url=url
             )
 
             if response.ok:
-                logger.debug("%s -> %s - %s", logger.name, url, json.dumps(response.json(), indent=4))
+                body = self.codec.decode_response(response)
+
+                logger.debug("%s -> %s - %s", logger.name, url, LazyJson(body))
+                ANIMAL_API_DURATION.observe(time.perf_counter() - started_at, animal, "success")
 
-                return response.json().get(RESPONSE_BODY_PROP[animal])
+                return body.get(RESPONSE_BODY_PROP[animal])
             else:
                 logger.error("%s -> Failed to get animal '%s'. Status Code: %s. Response: %s", logger.name, animal, response.status_code, response.text)
 
+                if response.status_code == 429:
+                    self._on_throttled(animal, response)
+
+                if not is_transient_status(response.status_code):
+                    ANIMAL_API_DURATION.observe(time.perf_counter() - started_at, animal, "failure")
+                    raise AnimalApiError(animal, response.status_code)
+
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, url, str(exception))
 
+        ANIMAL_API_DURATION.observe(time.perf_counter() - started_at, animal, "failure")
+
         return ""
+
+
+    def _on_throttled(self, animal: str, response: requests.Response):
+        """
+        Pauses the rate limiter of an animal API for as long as its 429 response asks
+
+        Args:
+            animal (str): Animal type
+            response (requests.Response): Response with status 429
+        """
+
+        ANIMAL_API_THROTTLED.inc(animal)
+
+        rate_limiter = self._rate_limiters.get(animal)
+
+        if rate_limiter:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            rate_limiter.pause(self.default_retry_after if retry_after is None else retry_after)
@@ -0,0 +1,73 @@
+"""
+Asyncio service to retrieve animal image
+"""
+
+import logging
+
+import httpx
+
+from helpers.http_transport import create_async_client
+from helpers.json_codec import get_codec
+from helpers.config import get_config
+from service.animal_api_service import RESPONSE_BODY_PROP
+
+logger = logging.getLogger(__name__)
+
+class AsyncAnimalService:
+
+    def __init__(self, client: httpx.AsyncClient | None = None):
+
+        # get the api urls from the process-wide config
+        self.animal_api_url = get_config().animal_api_url
+        logger.debug("animal_api_url -> %s", self.animal_api_url)
+
+        # keep-alive connections are reused by all lookups made on the event loop
+        self.client = client or create_async_client()
+        self.codec = get_codec()
+
+
+    async def __aenter__(self):
+
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+
+        await self.aclose()
+
+
+    async def aclose(self):
+        """
+        Closes the pooled connections of the client.
+        """
+
+        await self.client.aclose()
+
+
+    async def get_animal_url(self, animal: str) -> str:
+        """
+        Gets the animal image url
+
+        Args:
+            animal (str): Animal type
+
+        Returns:
+            str: Animal image url
+        """
+
+        url = self.animal_api_url[animal]
+
+        logger.debug("%s -> Animal: %s. Animal image url: %s", logger.name, animal, url)
+
+        try:
+            response = await self.client.get(url=url)
+
+            if response.is_success:
+                return self.codec.decode_response(response).get(RESPONSE_BODY_PROP[animal])
+            else:
+                logger.error("%s -> Failed to get animal '%s'. Status Code: %s. Response: %s", logger.name, animal, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, url, str(exception))
+
+        return ""
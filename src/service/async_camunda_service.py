@@ -0,0 +1,655 @@
+"""
+Asyncio client for the Orchestration Cluster REST API, with the same surface as CamundaService
+"""
+
+import asyncio
+import logging
+import time
+from typing import Mapping
+
+import httpx
+
+from helpers.config import get_config
+from helpers.http_transport import create_async_client
+from helpers.json_codec import PayloadTemplate, get_codec
+from helpers.retry_policy import get_backoff_delay
+from service.camunda_service import AWAIT_TIMEOUT_STATUS_CODES, BACKPRESSURE_STATUS_CODES, NON_IDEMPOTENT_OPERATIONS, CamundaService, record_request
+from service.token_manager import AsyncTokenManager
+
+logger = logging.getLogger(__name__)
+
+class AsyncCamundaService:
+
+    def __init__(self, base_url: str, token_audience: str, client_id: str, client_secret: str, auth_url: str,
+                 client: httpx.AsyncClient | None = None):
+
+        self.base_url = base_url
+        self.token_audience = token_audience
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.auth_url = auth_url
+
+        # keep-alive connections are reused by all requests made on the event loop
+        self.client = client or create_async_client()
+
+        # requests that fail to connect are retried with exponential backoff and jitter
+        transport_config = get_config().http_transport
+        self.connection_retries = transport_config.connection_retries
+        self.connection_retry_base_seconds = transport_config.connection_retry_base_seconds
+        self.connection_retry_max_seconds = transport_config.connection_retry_max_seconds
+
+        # the constant fields of job activations are encoded once per job type and worker
+        self.codec = get_codec()
+        self._activation_templates: dict[tuple[str, str | None], PayloadTemplate] = {}
+
+        # the access token is held on the event loop of this client. It is not shared with the thread-based clients,
+        # whose token manager blocks on a thread lock that must never be taken on the event loop
+        self.token_manager = AsyncTokenManager(fetch_token=self._request_token)
+
+
+    async def __aenter__(self):
+
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+
+        await self.aclose()
+
+
+    async def aclose(self):
+        """
+        Closes the pooled connections of the client.
+        """
+
+        await self.client.aclose()
+
+
+    async def get_token(self):
+        """
+        Gets a new access token and stores it in the token manager.
+        """
+
+        await self.token_manager.refresh()
+
+
+    async def _request_token(self) -> str:
+        """
+        Requests an access token from the authorization server.
+
+        Returns:
+            str: Access token. Empty string if authentication failed.
+        """
+
+        payload = {
+            "grant_type": "client_credentials",
+            "audience": self.token_audience,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret
+        }
+
+        try:
+            response = await self.client.post(
+                url=self.auth_url,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data=payload
+            )
+
+            if response.is_success:
+                return self.codec.decode_response(response).get("access_token")
+            else:
+                logger.error("%s -> Failed to authenticate. Status Code: %s. Response: %s", logger.name, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, self.auth_url, str(exception))
+
+        return ""
+
+
+    async def _get_access_token(self) -> str:
+        """
+        Gets a valid access token, requesting a new one only if there is no token or it has expired.
+        Concurrent callers on the event loop are collapsed into a single request to the authorization server.
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        return await self.token_manager.get_token()
+
+
+    async def _send(self, method: str, url: str, headers: dict, operation: str = "", **kwargs) -> httpx.Response:
+        """
+        Sends a request with the current access token. If the token is rejected with a 401 response,
+        the token is refreshed and the request is retried once. Connection errors are retried as well,
+        see _send_with_retries.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request url
+            headers (dict): Request headers, excluding the Authorization header
+            operation (str): Name of the calling method, used as the operation label of the request metrics
+
+        Returns:
+            httpx.Response: Response to the request
+        """
+
+        started_at = time.perf_counter()
+
+        try:
+            access_token = await self._get_access_token()
+            response = await self._send_with_retries(method, url, headers | {"Authorization": f"Bearer {access_token}"}, operation, **kwargs)
+
+            if response.status_code == 401:
+                logger.info("%s -> Access token rejected by '%s'. Retrying with a new token.", logger.name, url)
+
+                self.token_manager.invalidate(access_token)
+                access_token = await self._get_access_token()
+                response = await self._send_with_retries(method, url, headers | {"Authorization": f"Bearer {access_token}"}, operation, **kwargs)
+
+        except httpx.HTTPError:
+            record_request(operation, None, started_at)
+            raise
+
+        record_request(operation, response.status_code, started_at)
+
+        return response
+
+
+    async def _send_with_retries(self, method: str, url: str, headers: dict, operation: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request, retrying transport errors with exponential backoff and jitter. Requests of non-idempotent
+        operations are only sent again if no connection could be established.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request url
+            headers (dict): Request headers
+            operation (str): Name of the calling method
+
+        Raises:
+            httpx.HTTPError: When the request failed and is not retried (any more)
+
+        Returns:
+            httpx.Response: Response to the request
+        """
+
+        attempt = 0
+
+        while True:
+            try:
+                return await self.client.request(method, url, headers=headers, **kwargs)
+            except (httpx.NetworkError, httpx.ConnectTimeout) as exception:
+                attempt += 1
+                unsent = isinstance(exception, (httpx.ConnectError, httpx.ConnectTimeout))
+
+                if attempt > self.connection_retries or (operation in NON_IDEMPOTENT_OPERATIONS and not unsent):
+                    raise
+
+                delay = get_backoff_delay(attempt, self.connection_retry_base_seconds, self.connection_retry_max_seconds)
+
+                logger.warning("%s -> Failed to connect to '%s'. Retrying in %.2f seconds -> %s", logger.name, url, delay, str(exception))
+                await asyncio.sleep(delay)
+
+
+    def _get_activation_template(self, service_task_job_type: str, worker: str | None) -> PayloadTemplate:
+        """
+        Gets the payload template of job activations with the given job type and worker name
+
+        Args:
+            service_task_job_type (str): Job type
+            worker (str | None): Name of the worker activating the jobs
+
+        Returns:
+            PayloadTemplate: Payload template
+        """
+
+        template = self._activation_templates.get((service_task_job_type, worker))
+
+        if template is None:
+            fields = { "type": service_task_job_type, "worker": worker } if worker else { "type": service_task_job_type }
+            template = self._activation_templates[(service_task_job_type, worker)] = self.codec.template(**fields)
+
+        return template
+
+
+    async def get_cluster_topology(self) -> bool:
+        """
+        Gets the cluster topology. This method can be used to check whether the access token is accepted by the cluster.
+
+        Returns:
+            bool: True if access token is valid else False.
+        """
+
+        request_url = f"{self.base_url}/v2/topology"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        try:
+            response = await self._send("GET", url=request_url, headers=headers, operation="get_cluster_topology")
+
+            if response.is_success:
+                return True
+            else:
+                logger.error("%s -> Failed to get cluster topology'. Status Code: %s. Response: %s", logger.name, response.status_code, response.text)
+
+        except httpx.HTTPError as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return False
+
+
+    async def deploy_resources(self, resource_paths: list[str] | None = None, resources: Mapping[str, bytes] | None = None) -> str:
+        """
+        Deploys one or more resources (e.g. processes, decision models, or forms).
+
+        Args:
+            resource_paths (list[str] | None): List of relative paths of deployment resource files.
+            resources (Mapping[str, bytes] | None): Preloaded deployment resources, keyed by file name.
+
+        Returns:
+            str: Unique identifier of the deployment.
+        """
+
+        request_url = f"{self.base_url}/v2/deployments"
+
+        resource_buffers = dict(resources or {})
+
+        # read the binary data of any deployment resources passed by path
+        for file_path in resource_paths or []:
+            with open(file_path, 'rb') as resource_file:
+                resource_buffers[file_path] = resource_file.read()
+
+        files = [
+            ('resources', (file_name, content, 'application/octet-stream')) for file_name, content in resource_buffers.items()
+        ]
+
+        logger.debug("%s -> Files being deployed: %s", logger.name, list(resource_buffers))
+
+        try:
+            response = await self._send("POST", url=request_url, headers={}, files=files, operation="deploy_resources")
+
+            if response.is_success:
+                return self.codec.decode_response(response).get("deploymentKey")
+            else:
+                logger.error("%s -> Failed to deploy resources '%s'. Status Code: %s. Response: %s", logger.name, list(resource_buffers), response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return ""
+
+
+    async def create_process_instance(self, process_model: str, variables: str, await_completion: bool = False, request_timeout: int | None = None,
+                                      fetch_variables: list[str] | None = None) -> str | dict | None:
+        """
+        Creates and starts an instance of the specified process. The request can wait for the process instance to complete.
+
+        Args:
+            process_model (str): BPMN process ID of the process definition
+            variables (str): JSON object that will instantiate the variables for the root variable scope of the process instance.
+            await_completion (bool): Waits for the process instance to complete and returns its result.
+            request_timeout (int | None): Period in milliseconds to wait for the process instance to complete. The gateway default if not set.
+            fetch_variables (list[str] | None): Names of the variables returned with the result. All variables if not set.
+
+        Returns:
+            str | dict | None: Unique identifier of the created process instance. With await_completion, the result of the completed
+                               process instance including its variables, or None if it did not complete within the request timeout.
+                               Empty if the process instance could not be created.
+        """
+
+        request_url = f"{self.base_url}/v2/process-instances"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        payload = {
+            "processDefinitionId": process_model,
+            "variables": variables
+        }
+
+        timeout = self.client.timeout
+
+        if await_completion:
+            payload["awaitCompletion"] = True
+
+            if request_timeout is not None:
+                payload["requestTimeout"] = request_timeout
+
+                # wait for the process instance on top of the usual read timeout
+                timeout = httpx.Timeout(self.client.timeout.read + request_timeout / 1000, connect=self.client.timeout.connect)
+
+            if fetch_variables is not None:
+                payload["fetchVariables"] = fetch_variables
+
+        try:
+            response = await self._send("POST", url=request_url, headers=headers, content=self.codec.encode(payload), timeout=timeout, operation="create_process_instance")
+
+            if response.is_success:
+                body = self.codec.decode_response(response)
+
+                return body if await_completion else body.get("processInstanceKey")
+            elif await_completion and response.status_code in AWAIT_TIMEOUT_STATUS_CODES:
+                logger.warning("%s -> Process instance of '%s' did not complete within the request timeout. Status Code: %s. Response: %s",
+                               logger.name, process_model, response.status_code, response.text)
+
+                return None
+            else:
+                logger.error("%s -> Failed to create process instance. Status Code: %s. Response: %s", logger.name, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return {} if await_completion else ""
+
+
+    async def get_process_instance(self, process_instance_key: str) -> dict:
+        """
+        Get the process instance by the process instance key.
+
+        Args:
+            process_instance_key (str): Process instance key.
+
+        Returns:
+            dict: Process instance. Empty dictionary if it could not be retrieved.
+        """
+
+        request_url = f"{self.base_url}/v2/process-instances/{process_instance_key}"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        try:
+            response = await self._send("GET", url=request_url, headers=headers, operation="get_process_instance")
+
+            if response.is_success:
+                return self.codec.decode_response(response)
+            else:
+                logger.error("%s -> Failed to get process instance '%s'. Status Code: %s. Response: %s",
+                             logger.name, process_instance_key, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return {}
+
+
+    async def search_jobs(self, process_instance_key: str, service_task_job_type: str) -> str:
+        """
+        Search for jobs based on process instance key and job type.
+
+        Args:
+            process_instance_key (str): Process instance key associated with the job.
+            service_task_job_type (str): Type of the job.
+
+        Returns:
+            str: Unique identifier for the job.
+        """
+
+        request_url = f"{self.base_url}/v2/jobs/search"
+
+        headers = {
+            "Content-Type": "application/json"
+        }
+
+        payload = self.codec.encode({
+            "filter": {
+                "processInstanceKey": f"{process_instance_key}",
+                "type": f"{service_task_job_type}"
+            }
+        })
+
+        try:
+            response = await self._send("POST", url=request_url, headers=headers, content=payload, operation="search_jobs")
+
+            if response.is_success:
+                jobs = self.codec.decode_response(response).get("items")
+
+                if len(jobs) > 0:
+                    return jobs[0].get("jobKey")
+            else:
+                logger.error("%s -> Failed to search for job of type '%s' for process instance '%s'. Status Code: %s. Response: %s",
+                             logger.name, service_task_job_type, process_instance_key, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return ""
+
+
+    async def activate_jobs(self, service_task_job_type: str, timeout: int, max_jobs_to_activate: int, request_timeout: int | None = None,
+                            worker: str | None = None) -> list | None:
+        """
+        Activate jobs based on the job type.
+
+        Args:
+            service_task_job_type (str): Job type, as defined in the BPMN process.
+            timeout (int): Timeout period for which the activated jobs will not be activated by another activation call.
+            max_jobs_to_activate (int): Maximum jobs to activate by this request.
+            request_timeout (int | None): Period in milliseconds for which the gateway holds the request open (long polling)
+                                          until jobs become available. None uses the gateway default.
+            worker (str | None): Name of the worker activating the jobs, shown on the jobs in Operate.
+
+        Returns:
+            list | None: List of jobs. None if the request failed, e.g. because the gateway signalled backpressure.
+        """
+
+        request_url = f"{self.base_url}/v2/jobs/activation"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        template = self._get_activation_template(service_task_job_type, worker)
+
+        if request_timeout is not None:
+            payload = template.render(timeout=timeout, maxJobsToActivate=max_jobs_to_activate, requestTimeout=request_timeout)
+        else:
+            payload = template.render(timeout=timeout, maxJobsToActivate=max_jobs_to_activate)
+
+        try:
+            # wait for the long-polling period on top of the usual read timeout
+            read_timeout = self.client.timeout.read + (request_timeout or 0) / 1000
+
+            response = await self._send("POST", url=request_url, headers=headers, content=payload,
+                                        timeout=httpx.Timeout(read_timeout, connect=self.client.timeout.connect), operation="activate_jobs")
+
+            if response.is_success:
+                return self.codec.decode_response(response).get("jobs")
+            elif response.status_code in BACKPRESSURE_STATUS_CODES:
+                logger.warning("%s -> Gateway signalled backpressure while activating '%s' jobs. Status Code: %s", logger.name, service_task_job_type, response.status_code)
+            else:
+                logger.error("%s -> Failed to activate '%s' jobs. Status Code: %s. Response: %s", logger.name, service_task_job_type, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return None
+
+
+    async def complete_job(self, job_key: str, variables: str) -> bool:
+        """
+        Complete the job for the service task.
+
+        Args:
+            job_key (str): Key of the job handling the service task.
+            variables (str): JSON string of variables to complete the job with.
+
+        Returns:
+            bool: True if the job was successfully marked as complete.
+        """
+
+        request_url = f"{self.base_url}/v2/jobs/{job_key}/completion"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        payload = self.codec.encode({
+            "variables": variables
+        })
+
+        try:
+            response = await self._send("POST", url=request_url, headers=headers, content=payload, operation="complete_job")
+
+            if response.is_success:
+                logger.info("%s -> Job completed: %s", logger.name, job_key)
+
+                return True
+            else:
+                logger.error("%s -> Failed to complete job '%s'. Status Code: %s. Response: %s", logger.name, job_key, response.status_code, response.text)
+
+        except httpx.HTTPError as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return False
+
+
+    async def fail_job(self, job_key: str, error_message: str, retries: int | None = None, retry_back_off: int | None = None) -> bool:
+        """
+        Fail the job for the service task. With retries left, Zeebe re-delivers the job once the backoff has passed,
+        otherwise an incident is raised.
+
+        Args:
+            job_key (str): The key of the job to fail.
+            error_message (str): An optional message describing why the job failed.
+            retries (int | None): Retries the job has left. None leaves it to the gateway default of 0.
+            retry_back_off (int | None): Milliseconds after which the job is re-delivered.
+
+        Returns:
+            bool: True if the job was successfully failed.
+        """
+
+        request_url = f"{self.base_url}/v2/jobs/{job_key}/failure"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        payload = {
+            "errorMessage": f"Job {job_key} failed: {error_message}"
+        }
+
+        if retries is not None:
+            payload["retries"] = retries
+
+        if retry_back_off is not None:
+            payload["retryBackOff"] = retry_back_off
+
+        try:
+            response = await self._send("POST", url=request_url, headers=headers, content=self.codec.encode(payload), operation="fail_job")
+
+            if response.is_success:
+                logger.info("%s -> Job failed: %s", logger.name, job_key)
+
+                return True
+            else:
+                logger.error("%s -> Failed to mark the job '%s' as failed. Status Code: %s. Response: %s", logger.name, job_key, response.status_code, response.text)
+
+        except httpx.HTTPError as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return False
+
+
+    async def throw_error_job(self, job_key: str, error_code: str, error_message: str) -> bool:
+        """
+        Throw a business error for the job.
+
+        Args:
+            job_key (str): The key of the job to throw an error for.
+            error_code (str): The error code that will be matched with an error catch event.
+            error_message (str): An error message that provides additional context.
+
+        Returns:
+            bool: True if the business error was successfully thrown.
+        """
+
+        request_url = f"{self.base_url}/v2/jobs/{job_key}/error"
+
+        headers = {
+            "Content-Type": "application/json"
+        }
+
+        payload = self.codec.encode({
+            "errorCode": error_code,
+            "errorMessage": f"Job {job_key} has thrown error: {error_message}",
+            "variables": {
+                "errorCode": error_code,
+                "errorMessage": f"Job {job_key} has thrown error: {error_message}"
+            }
+        })
+
+        try:
+            response = await self._send("POST", url=request_url, headers=headers, content=payload, operation="throw_error_job")
+
+            if response.is_success:
+                logger.info("%s -> Error thrown for job: %s", logger.name, job_key)
+
+                return True
+            else:
+                logger.error("%s -> Failed to throw error for the job '%s'. Status Code: %s. Response: %s", logger.name, job_key, response.status_code, response.text)
+
+        except httpx.HTTPError as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return False
+
+
+    async def get_variable(self, process_instance_key: str, variable_name: str) -> str:
+        """
+        Get the variable by the variable key.
+
+        Args:
+            process_instance_key (str): Key of the process instance of variable.
+            variable_name (str): Name of variable.
+
+        Returns:
+            str: Variable value
+        """
+
+        request_url = f"{self.base_url}/v2/variables/search"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        payload = self.codec.encode({
+            "filter": {
+                "name": variable_name,
+                "processInstanceKey": process_instance_key,
+                "scopeKey": process_instance_key
+            },
+            "page": {
+                "from": 0,
+                "limit": 1
+            }
+        })
+
+        try:
+            response = await self._send("POST", url=request_url, headers=headers, content=payload, operation="get_variable")
+
+            if response.is_success:
+                variables = self.codec.decode_response(response).get("items")
+
+                if len(variables) > 0:
+                    return CamundaService.parse_variable_value(variables[0].get("value"))
+            else:
+                logger.error("%s -> Failed to get variables for process instance '%s'. Status Code: %s. Response: %s",
+                             logger.name, process_instance_key, response.status_code, response.text)
+
+        except (httpx.HTTPError, ValueError) as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return ""
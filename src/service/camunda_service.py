@@ -1,30 +1,127 @@
 import ast
 import json
 import logging
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Mapping
+
+from helpers.config import get_config
+from helpers.http_transport import HttpTransport, get_shared_transport
+from helpers.json_codec import PayloadTemplate, get_codec
+from helpers.logging_setup import LazyJson
+from helpers.metrics import REGISTRY, Counter, Histogram
+from helpers.retry_policy import get_backoff_delay, is_unsent_request_error
+from service.token_manager import get_token_manager
 
 REQUEST_JSON_HEADERS = {
     "Content-Type": "application/json",
     "Accept": "application/json"
 }
 
+# Status codes with which the gateway signals that it is overloaded
+BACKPRESSURE_STATUS_CODES = (429, 503)
+
+# Status codes with which the gateway signals that an awaited process instance did not complete in time
+AWAIT_TIMEOUT_STATUS_CODES = (408, 504)
+
+# Operations that must not be repeated once the server may have received the request. Their connection errors are
+# only retried if no connection could be established
+NON_IDEMPOTENT_OPERATIONS = ("create_process_instance", "activate_jobs")
+
+# Items requested per page by the paginated iterators, e.g. iter_jobs
+SEARCH_PAGE_SIZE = 100
+
+# Metrics of the requests to the REST API, per CamundaService method and response status code
+REQUEST_DURATION = Histogram("camunda_request_duration_seconds", "Duration of requests to the Camunda REST API", ("operation", "status"))
+REQUEST_ERRORS = Counter("camunda_request_errors_total", "Failed requests to the Camunda REST API", ("operation", "status"))
+
 logger = logging.getLogger(__name__)
 
+def record_request(operation: str, status_code: int | None, started_at: float):
+    """
+    Records the duration and, if it failed, the error of a request to the REST API
+
+    Args:
+        operation (str): Name of the CamundaService method that sent the request
+        status_code (int | None): Response status code. None if no response was received.
+        started_at (float): time.perf_counter() value when the request was sent
+    """
+
+    if not REGISTRY.enabled:
+        return
+
+    status = str(status_code) if status_code else "error"
+    REQUEST_DURATION.observe(time.perf_counter() - started_at, operation, status)
+
+    if not status_code or status_code >= 400:
+        REQUEST_ERRORS.inc(operation, status)
+
+
 class CamundaService:
 
-    def __init__(self, base_url: str, token_audience: str, client_id: str, client_secret: str, auth_url: str):
+    def __init__(self, base_url: str, token_audience: str, client_id: str, client_secret: str, auth_url: str,
+                 transport: HttpTransport | None = None, token_cache_file: str | None = None):
 
         self.base_url = base_url
         self.token_audience = token_audience
         self.client_id = client_id
         self.client_secret = client_secret
         self.auth_url = auth_url
-        self.access_token = ""
+
+        # pooled keep-alive connections shared with the other services of this process
+        self.transport = transport or get_shared_transport()
+
+        # requests that fail to connect are retried with exponential backoff and jitter
+        transport_config = get_config().http_transport
+        self.connection_retries = transport_config.connection_retries
+        self.connection_retry_base_seconds = transport_config.connection_retry_base_seconds
+        self.connection_retry_max_seconds = transport_config.connection_retry_max_seconds
+
+        # responses are decoded once and request bodies encoded without intermediate strings.
+        # The constant fields of job activations are encoded once per job type and worker
+        self.codec = get_codec()
+        self._activation_templates: dict[tuple[str, str | None], PayloadTemplate] = {}
+
+        # the access token is shared by all instances of this process that use the same client credentials
+        self.token_manager = get_token_manager(
+            auth_url=auth_url,
+            client_id=client_id,
+            token_audience=token_audience,
+            fetch_token=self._request_token,
+            token_cache_file=token_cache_file
+        )
+
+
+    @property
+    def access_token(self) -> str:
+        """
+        Valid access token from the shared token manager, requested from the authorization server if required.
+        """
+
+        return self.token_manager.get_token()
+
+
+    @access_token.setter
+    def access_token(self, access_token: str):
+
+        self.token_manager.set_token(access_token)
 
 
     def get_token(self):
         """
-        Gets access token.
+        Gets a new access token and stores it in the shared token manager.
+        """
+
+        self.token_manager.refresh()
+
+
+    def _request_token(self) -> str:
+        """
+        Requests an access token from the authorization server.
+
+        Returns:
+            str: Access token. Empty string if authentication failed.
         """
 
         payload = {
@@ -34,29 +131,185 @@ class CamundaService:
             "client_secret": self.client_secret
         }
 
-        # ensure that the token does not already have a value
-        self.access_token = ""
-
         try:
-            response = requests.post(
+            response = self.transport.post(
                 url=self.auth_url,
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
                 data=payload
             )
 
             if response.ok:
-                access_token = response.json().get("access_token")
-                self.access_token = access_token
+                return self.codec.decode_response(response).get("access_token")
             else:
                 logger.error("%s -> Failed to authenticate. Status Code: %s. Response: %s", logger.name, response.status_code, response.text)
 
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, self.auth_url, str(exception))
 
+        return ""
+
+
+    def _send(self, send: Callable[..., requests.Response], url: str, headers: dict, operation: str = "", **kwargs) -> requests.Response:
+        """
+        Sends a request with the current access token. If the token is rejected with a 401 response,
+        the token is refreshed and the request is retried once. Connection errors are retried as well,
+        see _send_with_retries.
+
+        Args:
+            send (Callable[..., requests.Response]): Function that sends the request, e.g. self.transport.post
+            url (str): Request url
+            headers (dict): Request headers, excluding the Authorization header
+            operation (str): Name of the calling method, used as the operation label of the request metrics
+
+        Returns:
+            requests.Response: Response to the request
+        """
+
+        started_at = time.perf_counter()
+
+        try:
+            access_token = self.access_token
+            response = self._send_with_retries(send, url, headers | {"Authorization": f"Bearer {access_token}"}, operation, **kwargs)
+
+            if response.status_code == 401:
+                logger.info("%s -> Access token rejected by '%s'. Retrying with a new token.", logger.name, url)
+
+                self.token_manager.invalidate(access_token)
+                response = self._send_with_retries(send, url, headers | {"Authorization": f"Bearer {self.access_token}"}, operation, **kwargs)
+
+        except requests.exceptions.RequestException:
+            record_request(operation, None, started_at)
+            raise
+
+        record_request(operation, response.status_code, started_at)
+
+        return response
+
+
+    def _send_with_retries(self, send: Callable[..., requests.Response], url: str, headers: dict, operation: str, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying connection errors with exponential backoff and jitter. Requests of non-idempotent
+        operations are only sent again if they never reached the server.
+
+        Args:
+            send (Callable[..., requests.Response]): Function that sends the request, e.g. self.transport.post
+            url (str): Request url
+            headers (dict): Request headers
+            operation (str): Name of the calling method
+
+        Raises:
+            requests.exceptions.RequestException: When the request failed and is not retried (any more)
+
+        Returns:
+            requests.Response: Response to the request
+        """
+
+        attempt = 0
+
+        while True:
+            try:
+                return send(url=url, headers=headers, **kwargs)
+            except requests.exceptions.ConnectionError as exception:
+                attempt += 1
+
+                if attempt > self.connection_retries or (operation in NON_IDEMPOTENT_OPERATIONS and not is_unsent_request_error(exception)):
+                    raise
+
+                delay = get_backoff_delay(attempt, self.connection_retry_base_seconds, self.connection_retry_max_seconds)
+
+                logger.warning("%s -> Failed to connect to '%s'. Retrying in %.2f seconds -> %s", logger.name, url, delay, str(exception))
+                time.sleep(delay)
+
+
+    def _get_activation_template(self, service_task_job_type: str, worker: str | None) -> PayloadTemplate:
+        """
+        Gets the payload template of job activations with the given job type and worker name
+
+        Args:
+            service_task_job_type (str): Job type
+            worker (str | None): Name of the worker activating the jobs
+
+        Returns:
+            PayloadTemplate: Payload template
+        """
+
+        template = self._activation_templates.get((service_task_job_type, worker))
+
+        if template is None:
+            fields = { "type": service_task_job_type, "worker": worker } if worker else { "type": service_task_job_type }
+            template = self._activation_templates[(service_task_job_type, worker)] = self.codec.template(**fields)
+
+        return template
+
+
+    def _search_page(self, request_url: str, template: PayloadTemplate, page_size: int, cursor: str | None, operation: str) -> tuple[list, str | None]:
+        """
+        Gets one page of search results
+
+        Args:
+            request_url (str): Url of the search endpoint
+            template (PayloadTemplate): Payload template holding the search filter
+            page_size (int): Maximum number of items of the page
+            cursor (str | None): End cursor of the previous page. None for the first page.
+            operation (str): Name of the calling method
+
+        Raises:
+            requests.exceptions.RequestException: When the page could not be retrieved.
+
+        Returns:
+            tuple[list, str | None]: Items of the page and the cursor of the next page. None if this is the last page.
+        """
+
+        page = { "limit": page_size, "after": cursor } if cursor else { "limit": page_size }
+
+        response = self._send(self.transport.post, url=request_url, headers=REQUEST_JSON_HEADERS, data=template.render(page=page), operation=operation)
+
+        if not response.ok:
+            logger.error("%s -> Failed to search '%s'. Status Code: %s. Response: %s", logger.name, request_url, response.status_code, response.text)
+            response.raise_for_status()
+
+        body = self.codec.decode_response(response)
+        items = body.get("items") or []
+        end_cursor = (body.get("page") or {}).get("endCursor")
+
+        logger.debug("%s -> %s - %s items after cursor %s", logger.name, request_url, len(items), cursor)
+
+        return items, end_cursor if len(items) >= page_size else None
+
+
+    def _iter_search(self, request_url: str, search_filter: dict, page_size: int, operation: str) -> Iterator[dict]:
+        """
+        Yields the results of a search page by page, following the end cursor of each page. The next page is requested
+        in the background while the caller handles the current one, so that at most two pages are held in memory.
+
+        Args:
+            request_url (str): Url of the search endpoint
+            search_filter (dict): Search filter
+            page_size (int): Maximum number of items per page
+            operation (str): Name of the calling method
+
+        Raises:
+            requests.exceptions.RequestException: When a page could not be retrieved.
+
+        Yields:
+            dict: Search result
+        """
+
+        template = self.codec.template(filter=search_filter)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="search") as executor:
+            next_page = executor.submit(self._search_page, request_url, template, page_size, None, operation)
+
+            while next_page:
+                items, cursor = next_page.result()
+                next_page = executor.submit(self._search_page, request_url, template, page_size, cursor, operation) if cursor else None
+
+                yield from items
+
 
     def get_cluster_topology(self) -> bool | None:
         """
-        Gets the cluster topology. This method is used to valid whether the access token is still valid.
+        Gets the cluster topology. This method can be used to check whether the access token is accepted by the cluster.
 
         Returns:
             bool | None: True if access token is valid else False. None if could not connect to API service.
@@ -66,12 +319,11 @@ class CamundaService:
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
         try:
-            response = requests.get(url=request_url, headers=headers)
+            response = self._send(self.transport.get, url=request_url, headers=headers, operation="get_cluster_topology")
 
             if response.ok:
                 return True
@@ -84,12 +336,14 @@ class CamundaService:
         return False
 
 
-    def deploy_resources(self, resource_paths: list[str]) -> str:
+    def deploy_resources(self, resource_paths: list[str] | None = None, resources: Mapping[str, bytes] | None = None) -> str:
         """
         Deploys one or more resources (e.g. processes, decision models, or forms).
+        The multipart body is built from memory, so no file handles are held open by the request.
 
         Args:
-            resource_paths (list[str]): List of relative paths of deployment resource files.
+            resource_paths (list[str] | None): List of relative paths of deployment resource files.
+            resources (Mapping[str, bytes] | None): Preloaded deployment resources, keyed by file name.
 
         Returns:
             str: Unique identifier of the deployment.
@@ -97,29 +351,34 @@ class CamundaService:
 
         request_url = f"{self.base_url}/v2/deployments"
 
-        headers = { "Authorization": f"Bearer {self.access_token}" }
+        headers = {}
 
-        files = []
+        resource_buffers = dict(resources or {})
 
-        # get binary data for all deployment resources
-        for file_path in resource_paths:
-            files.append(
-                ('resources', (file_path, open(file_path, 'rb'), 'application/octet-stream'))
-            )
+        # read the binary data of any deployment resources passed by path
+        for file_path in resource_paths or []:
+            with open(file_path, 'rb') as resource_file:
+                resource_buffers[file_path] = resource_file.read()
+
+        files = [
+            ('resources', (file_name, content, 'application/octet-stream')) for file_name, content in resource_buffers.items()
+        ]
 
-        logger.debug("%s -> Files being deployed: %s", logger.name, files)
+        logger.debug("%s -> Files being deployed: %s", logger.name, list(resource_buffers))
 
         payload = {}
 
         try:
-            response = requests.post(url=request_url, headers=headers, data=payload, files=files)
+            response = self._send(self.transport.post, url=request_url, headers=headers, data=payload, files=files, operation="deploy_resources")
 
             if response.ok:
-                logger.debug("%s -> %s - {json.dumps(response.json(), indent=4)}", logger.name, request_url)
+                body = self.codec.decode_response(response)
 
-                return response.json().get("deploymentKey")
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(body))
+
+                return body.get("deploymentKey")
             else:
-                logger.error("%s -> Failed to deploy resources '%s'. Status Code: %s. Response: %s", logger.name, resource_paths, response.status_code, response.text)
+                logger.error("%s -> Failed to deploy resources '%s'. Status Code: %s. Response: %s", logger.name, list(resource_buffers), response.status_code, response.text)
 
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
@@ -127,75 +386,113 @@ class CamundaService:
         return ""
 
 
-    def create_process_instance(self, process_model: str, variables: str) -> str:
+    def create_process_instance(self, process_model: str, variables: str, await_completion: bool = False, request_timeout: int | None = None,
+                                fetch_variables: list[str] | None = None) -> str | dict | None:
         """
-        Creates and starts an instance of the specified process.
+        Creates and starts an instance of the specified process. The request can wait for the process instance to complete.
 
         Args:
             process_model (str): BPMN process ID of the process definition
             variables (str): JSON object that will instantiate the variables for the root variable scope of the process instance.
+            await_completion (bool): Waits for the process instance to complete and returns its result.
+            request_timeout (int | None): Period in milliseconds to wait for the process instance to complete. The gateway default if not set.
+            fetch_variables (list[str] | None): Names of the variables returned with the result. All variables if not set.
 
         Returns:
-            str: Unique identifier of the created process instance.
+            str | dict | None: Unique identifier of the created process instance. With await_completion, the result of the completed
+                               process instance including its variables, or None if it did not complete within the request timeout.
+                               Empty if the process instance could not be created.
         """
 
         request_url = f"{self.base_url}/v2/process-instances"
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
-        payload = json.dumps({
+        payload = {
             "processDefinitionId": process_model,
             "variables": variables
-        })
+        }
+
+        timeout = self.transport.timeout
+
+        if await_completion:
+            payload["awaitCompletion"] = True
+
+            if request_timeout is not None:
+                payload["requestTimeout"] = request_timeout
+
+                # wait for the process instance on top of the usual read timeout
+                connect_timeout, read_timeout = self.transport.timeout
+                timeout = (connect_timeout, read_timeout + request_timeout / 1000)
+
+            if fetch_variables is not None:
+                payload["fetchVariables"] = fetch_variables
 
         try:
-            response = requests.post(
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=self.codec.encode(payload),
+                timeout=timeout,
+                operation="create_process_instance"
             )
 
             if response.ok:
-                logger.debug("%s -> %s - %s", logger.name, request_url, json.dumps(response.json(), indent=4))
+                body = self.codec.decode_response(response)
+
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(body))
+
+                return body if await_completion else body.get("processInstanceKey")
+            elif await_completion and response.status_code in AWAIT_TIMEOUT_STATUS_CODES:
+                logger.warning("%s -> Process instance of '%s' did not complete within the request timeout. Status Code: %s. Response: %s",
+                               logger.name, process_model, response.status_code, response.text)
 
-                return response.json().get("processInstanceKey")
+                return None
             else:
                 logger.error("%s -> Failed to create process instance. Status Code: %s. Response: %s", logger.name, response.status_code, response.text)
 
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
 
-        return ""
+        return {} if await_completion else ""
 
 
-    def get_process_instance(self, process_instance_key: str):
+    def get_process_instance(self, process_instance_key: str) -> dict:
         """
         Get the process instance by the process instance key.
 
         Args:
             process_instance_key (str): Process instance key.
+
+        Returns:
+            dict: Process instance. Empty dictionary if it could not be retrieved.
         """
 
         request_url = f"{self.base_url}/v2/process-instances/{process_instance_key}"
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
         try:
-            response = requests.get(
+            response = self._send(
+                self.transport.get,
                 url=request_url,
-                headers=headers
+                headers=headers,
+                operation="get_process_instance"
             )
 
             if response.ok:
-                logger.debug("%s -> %s - %s", logger.name, request_url, json.dumps(response.json(), indent=4))
+                body = self.codec.decode_response(response)
+
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(body))
+
+                return body
             else:
                 logger.error("%s -> Failed to get process instance '%s'. Status Code: %s. Response: %s",
                              logger.name, process_instance_key, response.status_code, response.text)
@@ -203,6 +500,8 @@ class CamundaService:
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
 
+        return {}
+
 
     def search_jobs(self, process_instance_key: str, service_task_job_type: str) -> str:
         """
@@ -219,29 +518,31 @@ class CamundaService:
         request_url = f"{self.base_url}/v2/jobs/search"
 
         headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Content-Type": "application/json"
         }
 
-        payload = json.dumps({
+        payload = {
             "filter": {
                 "processInstanceKey": f"{process_instance_key}",
                 "type": f"{service_task_job_type}"
             }
-        })
+        }
 
-        logger.info("%s -> payload for job search: %s", logger.name, payload)
+        logger.info("%s -> payload for job search: %s", logger.name, LazyJson(payload, indent=None))
 
         try:
-            response = requests.post(
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=self.codec.encode(payload),
+                operation="search_jobs"
             )
 
             if response.ok:
-                logger.debug("%s -> %s - %s", logger.name, request_url, json.dumps(response.json(), indent=4))
-                jobs = response.json().get("items")
+                jobs = self.codec.decode_response(response).get("items")
+
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(jobs))
 
                 if len(jobs) > 0:
                     return jobs[0].get("jobKey")
@@ -255,7 +556,30 @@ class CamundaService:
         return ""
 
 
-    def activate_jobs(self, service_task_job_type: str, timeout: int, max_jobs_to_activate: int) -> list:
+    def iter_jobs(self, search_filter: dict | None = None, page_size: int = SEARCH_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Iterates over all jobs matching a filter, requesting them page by page as the caller consumes them.
+
+        Usage:
+            for job in camunda_service.iter_jobs({ "type": "retrieve-animal-image", "state": "FAILED" }):
+                ...
+
+        Args:
+            search_filter (dict | None): Job search filter, e.g. { "processInstanceKey": "2251799813685249" }. All jobs if not set.
+            page_size (int): Maximum number of jobs per request.
+
+        Raises:
+            requests.exceptions.RequestException: When a page could not be retrieved.
+
+        Yields:
+            dict: Job
+        """
+
+        return self._iter_search(f"{self.base_url}/v2/jobs/search", search_filter or {}, page_size, "iter_jobs")
+
+
+    def activate_jobs(self, service_task_job_type: str, timeout: int, max_jobs_to_activate: int, request_timeout: int | None = None,
+                      worker: str | None = None) -> list | None:
         """
         Activate jobs based on the job type.
 
@@ -263,43 +587,56 @@ class CamundaService:
             service_task_job_type (str): Job type, as defined in the BPMN process.
             timeout (int): Timeout period for which the activated jobs will not be activated by another activation call.
             max_jobs_to_activate (int): Maximum jobs to activate by this request.
+            request_timeout (int | None): Period in milliseconds for which the gateway holds the request open (long polling)
+                                          until jobs become available. None uses the gateway default.
+            worker (str | None): Name of the worker activating the jobs, shown on the jobs in Operate.
 
         Returns:
-            list: List of jobs
+            list | None: List of jobs. None if the request failed, e.g. because the gateway signalled backpressure.
         """
 
         request_url = f"{self.base_url}/v2/jobs/activation"
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
-        payload = json.dumps({
-            "type": service_task_job_type,
-            "timeout": timeout,
-            "maxJobsToActivate": max_jobs_to_activate
-        })
+        template = self._get_activation_template(service_task_job_type, worker)
+
+        if request_timeout is not None:
+            payload = template.render(timeout=timeout, maxJobsToActivate=max_jobs_to_activate, requestTimeout=request_timeout)
+        else:
+            payload = template.render(timeout=timeout, maxJobsToActivate=max_jobs_to_activate)
 
         try:
-            response = requests.post(
+            # wait for the long-polling period on top of the usual read timeout
+            connect_timeout, read_timeout = self.transport.timeout
+
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=payload,
+                timeout=(connect_timeout, read_timeout + (request_timeout or 0) / 1000),
+                operation="activate_jobs"
             )
 
             if response.ok:
-                logger.info("%s -> %s - %s", logger.name, request_url, json.dumps(response.json(), indent=4))
+                jobs = self.codec.decode_response(response).get("jobs")
+
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(jobs))
 
-                return response.json().get("jobs")
+                return jobs
+            elif response.status_code in BACKPRESSURE_STATUS_CODES:
+                logger.warning("%s -> Gateway signalled backpressure while activating '%s' jobs. Status Code: %s", logger.name, service_task_job_type, response.status_code)
             else:
                 logger.error("%s -> Failed to activate '%s' jobs. Status Code: %s. Response: %s", logger.name, service_task_job_type, response.status_code, response.text)
 
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
-        
-        return []
+
+        return None
 
 
     def complete_job(self, job_key: str, variables: str) -> bool:
@@ -318,20 +655,21 @@ class CamundaService:
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
-        payload = json.dumps({
+        payload = self.codec.encode({
             "variables": variables
         })
 
         try:
             # complete the job
-            response = requests.post(
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=payload,
+                operation="complete_job"
             )
 
             # if the job is successfully completed, return True
@@ -348,13 +686,16 @@ class CamundaService:
         return False
 
 
-    def fail_job(self, job_key:str, error_message: str) -> bool:
+    def fail_job(self, job_key:str, error_message: str, retries: int | None = None, retry_back_off: int | None = None) -> bool:
         """
-        Fail the job for the service task.
+        Fail the job for the service task. With retries left, Zeebe re-delivers the job once the backoff has passed,
+        otherwise an incident is raised.
 
         Args:
             job_key (str): The key of the job to fail.
             error_message (str): An optional message describing why the job failed.
+            retries (int | None): Retries the job has left. None leaves it to the gateway default of 0.
+            retry_back_off (int | None): Milliseconds after which the job is re-delivered.
 
         Returns:
             bool: True if the job was successfully failed.
@@ -364,20 +705,27 @@ class CamundaService:
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
-        payload = json.dumps({
+        payload = {
             "errorMessage": f"Job {job_key} failed: {error_message}"
-        })
+        }
+
+        if retries is not None:
+            payload["retries"] = retries
+
+        if retry_back_off is not None:
+            payload["retryBackOff"] = retry_back_off
 
         try:
             # fail the job
-            response = requests.post(
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=self.codec.encode(payload),
+                operation="fail_job"
             )
 
             # if the job is successfully marked as failed, return True
@@ -410,27 +758,28 @@ class CamundaService:
         request_url = f"{self.base_url}/v2/jobs/{job_key}/error"
 
         headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Content-Type": "application/json"
         }
 
-        payload = json.dumps({
+        payload = {
             "errorCode": error_code,
             "errorMessage": f"Job {job_key} has thrown error: {error_message}",
             "variables": {
                 "errorCode": error_code,
                 "errorMessage": f"Job {job_key} has thrown error: {error_message}"
             }
-        })
+        }
 
-        logger.debug("payload: %s", payload)
+        logger.debug("%s -> payload: %s", logger.name, LazyJson(payload, indent=None))
 
         try:
             # throw a business error for the job
-            response = requests.post(
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=self.codec.encode(payload),
+                operation="throw_error_job"
             )
 
             # if the error is successfully thrown, return True
@@ -463,11 +812,10 @@ class CamundaService:
 
         headers = {
             "Content-Type": "application/json",
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.access_token}"
+            "Accept": "application/json"
         }
 
-        payload = json.dumps({
+        payload = self.codec.encode({
             "filter": {
                 "name": variable_name,
                 "processInstanceKey": process_instance_key,
@@ -480,29 +828,179 @@ class CamundaService:
         })
 
         try:
-            response = requests.post(
+            response = self._send(
+                self.transport.post,
                 url=request_url,
                 headers=headers,
-                data=payload
+                data=payload,
+                operation="get_variable"
             )
 
             if response.ok:
-                variables = response.json().get("items")
+                variables = self.codec.decode_response(response).get("items")
 
-                logger.debug("%s -> %s - %s", logger.name, request_url, json.dumps(variables, indent=4))
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(variables))
 
                 if len(variables) > 0:
+                    return self.parse_variable_value(variables[0].get("value"))
+            else:
+                logger.error("%s -> Failed to get variables for process instance '%s'. Status Code: %s. Response: %s",
+                             logger.name, process_instance_key, response.status_code, response.text)
+
+        except requests.exceptions.RequestException as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return ""
+
+
+    def search_variables(self, variable_name: str, process_instance_keys: list[str]) -> dict[str, str]:
+        """
+        Gets a variable of several process instances with a single search.
+
+        Args:
+            variable_name (str): Name of variable.
+            process_instance_keys (list[str]): Keys of the process instances.
+
+        Returns:
+            dict[str, str]: Variable values keyed by process instance key. Process instances without the variable are left out.
+        """
+
+        request_url = f"{self.base_url}/v2/variables/search"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
 
-                    variable_value = variables[0].get("value")
+        payload = self.codec.encode({
+            "filter": {
+                "name": variable_name,
+                "processInstanceKey": { "$in": process_instance_keys }
+            },
+            "page": {
+                "from": 0,
+                "limit": len(process_instance_keys)
+            }
+        })
 
-                    # if the variable value is returned as a variable in quotes, strip them out so that a literal is returned
-                    if variable_value.startswith("\"") and variable_value.endswith("\""):
-                        variable_value = ast.literal_eval(variable_value)
+        try:
+            response = self._send(
+                self.transport.post,
+                url=request_url,
+                headers=headers,
+                data=payload,
+                operation="search_variables"
+            )
 
-                    return variable_value
+            if response.ok:
+                variables = self.codec.decode_response(response).get("items")
+
+                logger.debug("%s -> %s - %s", logger.name, request_url, LazyJson(variables))
+
+                # variables in the root scope of each process instance
+                return {
+                    variable.get("processInstanceKey"): self.parse_variable_value(variable.get("value"))
+                    for variable in variables if variable.get("scopeKey") == variable.get("processInstanceKey")
+                }
             else:
-                logger.error("%s -> Failed to get variables for process instance '%s'. Status Code: %s. Response: %s",
-                             logger.name, process_instance_key, response.status_code, response.text)
+                logger.error("%s -> Failed to search variable '%s'. Status Code: %s. Response: %s",
+                             logger.name, variable_name, response.status_code, response.text)
+
+        except requests.exceptions.RequestException as exception:
+            logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
+
+        return {}
+
+
+    def iter_variables(self, search_filter: dict | None = None, page_size: int = SEARCH_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Iterates over all variables matching a filter, requesting them page by page as the caller consumes them.
+        Values are returned as json, see parse_variable_value.
+
+        Usage:
+            for variable in camunda_service.iter_variables({ "name": "animal_url" }):
+                ...
+
+        Args:
+            search_filter (dict | None): Variable search filter, e.g. { "processInstanceKey": "2251799813685249" }. All variables if not set.
+            page_size (int): Maximum number of variables per request.
+
+        Raises:
+            requests.exceptions.RequestException: When a page could not be retrieved.
+
+        Yields:
+            dict: Variable
+        """
+
+        return self._iter_search(f"{self.base_url}/v2/variables/search", search_filter or {}, page_size, "iter_variables")
+
+
+    @staticmethod
+    def parse_variable_value(variable_value: str) -> str:
+        """
+        Converts a variable value returned by the REST API to a literal
+
+        Args:
+            variable_value (str): Variable value
+
+        Returns:
+            str: Variable value, without the surrounding quotes if it is a string
+        """
+
+        # if the variable value is returned as a variable in quotes, strip them out so that a literal is returned
+        if variable_value.startswith("\"") and variable_value.endswith("\""):
+            variable_value = ast.literal_eval(variable_value)
+
+        return variable_value
+
+
+    def find_process_instance_key(self, variable_name: str, variable_value: str) -> str:
+        """
+        Finds the process instance that holds a variable with the given value, e.g. a correlation ID set when it was created.
+
+        Args:
+            variable_name (str): Name of variable.
+            variable_value (str): Value of variable.
+
+        Returns:
+            str: Unique identifier of the process instance. Empty string if none was found.
+        """
+
+        request_url = f"{self.base_url}/v2/variables/search"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        payload = self.codec.encode({
+            "filter": {
+                "name": variable_name,
+                "value": json.dumps(variable_value)
+            },
+            "page": {
+                "from": 0,
+                "limit": 1
+            }
+        })
+
+        try:
+            response = self._send(
+                self.transport.post,
+                url=request_url,
+                headers=headers,
+                data=payload,
+                operation="find_process_instance_key"
+            )
+
+            if response.ok:
+                variables = self.codec.decode_response(response).get("items")
+
+                if len(variables) > 0:
+                    return variables[0].get("processInstanceKey")
+            else:
+                logger.error("%s -> Failed to search variable '%s'. Status Code: %s. Response: %s",
+                             logger.name, variable_name, response.status_code, response.text)
 
         except requests.exceptions.RequestException as exception:
             logger.error("%s -> Failed to connect to '%s' -> %s", logger.name, request_url, str(exception))
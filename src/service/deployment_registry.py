@@ -0,0 +1,60 @@
+"""
+Registry of Camunda deployments, keyed by a content hash of the deployed resources
+"""
+
+import logging
+import threading
+
+from helpers.asset_store import AssetStore
+from service.camunda_service import CamundaService
+
+logger = logging.getLogger(__name__)
+
+class DeploymentRegistry:
+
+    def __init__(self, asset_store: AssetStore):
+
+        self.asset_store = asset_store
+
+        # deployment keys of the asset sets that have already been deployed, keyed by content hash
+        self._deployment_keys = {}
+
+        # serialises deployments so that concurrent first requests result in a single deployment
+        self._lock = threading.Lock()
+
+
+    def get_or_deploy(self, camunda_service: CamundaService) -> str:
+        """
+        Returns the deployment key of the current asset set, deploying the resources only if
+        this asset set has not been deployed yet by this process.
+
+        Args:
+            camunda_service (CamundaService): CamundaService object used to deploy the resources
+
+        Returns:
+            str: Unique identifier of the deployment. Empty string if the deployment failed.
+        """
+
+        resources, assets_hash = self.asset_store.get_snapshot()
+
+        deployment_key = self._deployment_keys.get(assets_hash)
+
+        if deployment_key:
+            logger.debug("%s -> Reusing deployment %s for asset hash %s", logger.name, deployment_key, assets_hash)
+            return deployment_key
+
+        with self._lock:
+            # another request may have deployed the same asset set while this one was waiting for the lock
+            deployment_key = self._deployment_keys.get(assets_hash)
+
+            if deployment_key:
+                return deployment_key
+
+            logger.info("%s -> Deploying resources %s with asset hash %s", logger.name, list(resources), assets_hash)
+
+            deployment_key = camunda_service.deploy_resources(resources=resources)
+
+            if deployment_key:
+                self._deployment_keys[assets_hash] = deployment_key
+
+        return deployment_key
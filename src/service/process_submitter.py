@@ -0,0 +1,117 @@
+"""
+Creates process instances in the background and tracks the status of each submission
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Submission states
+PENDING = "pending"
+CREATED = "created"
+FAILED = "failed"
+
+class ProcessSubmitter:
+    """
+    Runs process instance creations on a bounded thread pool so that the web request that submits them returns right away.
+    The status of the most recent submissions is kept in memory and can be looked up by request ID.
+    """
+
+    def __init__(self, max_workers: int = 8, max_tracked_requests: int = 10000):
+        """
+        Args:
+            max_workers (int): Maximum number of process instances created concurrently.
+            max_tracked_requests (int): Number of most recent submissions whose status is kept.
+        """
+
+        self.max_tracked_requests = max_tracked_requests
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="submit")
+        self._submissions = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def submit(self, create_process_instance: Callable[[], tuple[str, str]], **details) -> str:
+        """
+        Queues the creation of a process instance
+
+        Args:
+            create_process_instance (Callable[[], tuple[str, str]]): Creates the process instance and returns its key and,
+                                                                    if it failed, an error message
+            details: Additional values reported with the status, e.g. the selected animal
+
+        Returns:
+            str: Request ID under which the status of the submission can be looked up
+        """
+
+        request_id = uuid.uuid4().hex
+
+        with self._lock:
+            self._submissions[request_id] = details | { "requestId": request_id, "status": PENDING }
+
+            # forget the oldest submissions once the limit is reached
+            while len(self._submissions) > self.max_tracked_requests:
+                self._submissions.popitem(last=False)
+
+        self._executor.submit(self._run, request_id, create_process_instance)
+
+        return request_id
+
+
+    def _run(self, request_id: str, create_process_instance: Callable[[], tuple[str, str]]):
+        """
+        Creates the process instance of a submission and records the outcome.
+
+        Args:
+            request_id (str): Request ID of the submission
+            create_process_instance (Callable[[], tuple[str, str]]): Creates the process instance
+        """
+
+        try:
+            process_instance_key, error_message = create_process_instance()
+        except Exception as exception:
+            logger.exception("%s -> Unexpected error while creating the process instance of request %s", logger.name, request_id)
+            process_instance_key, error_message = "", str(exception)
+
+        if process_instance_key:
+            update = { "status": CREATED, "processInstanceKey": process_instance_key }
+        else:
+            update = { "status": FAILED, "error": error_message }
+
+        with self._lock:
+            if request_id in self._submissions:
+                self._submissions[request_id] |= update
+
+
+    def get_status(self, request_id: str) -> dict | None:
+        """
+        Gets the status of a submission
+
+        Args:
+            request_id (str): Request ID returned by submit
+
+        Returns:
+            dict | None: Status of the submission, e.g. { "requestId": "...", "status": "created", "processInstanceKey": "..." }.
+                         None if the request ID is unknown.
+        """
+
+        with self._lock:
+            submission = self._submissions.get(request_id)
+
+            return dict(submission) if submission else None
+
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops accepting submissions.
+
+        Args:
+            wait (bool): Waits for the queued submissions to finish
+        """
+
+        self._executor.shutdown(wait=wait)
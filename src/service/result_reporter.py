@@ -0,0 +1,184 @@
+"""
+Reports job outcomes to the Camunda 8 REST API in the background
+"""
+
+import logging
+import queue
+import random
+import threading
+from dataclasses import dataclass, field
+
+from service.camunda_service import CamundaService
+
+logger = logging.getLogger(__name__)
+
+# Job outcomes, named after the CamundaService methods that report them
+COMPLETE_JOB = "complete_job"
+THROW_ERROR_JOB = "throw_error_job"
+FAIL_JOB = "fail_job"
+
+@dataclass
+class JobResult:
+    outcome: str
+    job_key: str
+    kwargs: dict = field(default_factory=dict)
+    attempts: int = 0
+
+
+class ResultReporter:
+    """
+    Queues job outcomes and reports them from a small pool of sender threads, so that handling the next job never waits
+    for the gateway to acknowledge the previous one. The senders share the pooled keep-alive connections of the
+    CamundaService, so the requests of several outcomes are in flight at the same time.
+
+    Exposes complete_job, throw_error_job and fail_job with the signatures of CamundaService, so it can be used in its place.
+    """
+
+    def __init__(self,
+                 camunda_service: CamundaService,
+                 senders: int = 4,
+                 max_attempts: int = 3,
+                 retry_base_seconds: float = 0.5,
+                 queue_size: int = 100):
+        """
+        Args:
+            camunda_service (CamundaService): Service used to report the outcomes
+            senders (int): Number of sender threads.
+            max_attempts (int): Maximum number of attempts to report an outcome before it is dropped.
+            retry_base_seconds (float): Base delay of the exponential backoff with jitter between attempts.
+            queue_size (int): Maximum number of queued outcomes. Handlers block while the queue is full.
+        """
+
+        self.camunda_service = camunda_service
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+
+        self._stats_lock = threading.Lock()
+        self._stats = { "reported": 0, "retried": 0, "dropped": 0 }
+
+        self._senders = [
+            threading.Thread(target=self._run_sender, name=f"result-sender-{sender}", daemon=True) for sender in range(senders)
+        ]
+
+        for sender in self._senders:
+            sender.start()
+
+
+    def complete_job(self, job_key: str, variables: dict):
+
+        self._enqueue(JobResult(COMPLETE_JOB, job_key, { "variables": variables }))
+
+
+    def throw_error_job(self, job_key: str, error_code: str, error_message: str):
+
+        self._enqueue(JobResult(THROW_ERROR_JOB, job_key, { "error_code": error_code, "error_message": error_message }))
+
+
+    def fail_job(self, job_key: str, error_message: str, retries: int | None = None, retry_back_off: int | None = None):
+
+        self._enqueue(JobResult(FAIL_JOB, job_key, { "error_message": error_message, "retries": retries, "retry_back_off": retry_back_off }))
+
+
+    def _enqueue(self, result: JobResult):
+        """
+        Queues an outcome for the senders, blocking while the queue is full.
+
+        Args:
+            result (JobResult): Job outcome
+        """
+
+        if self._stopped.is_set():
+            raise RuntimeError("Result reporter is closed.")
+
+        self._queue.put(result)
+
+
+    def _run_sender(self):
+        """
+        Reports queued outcomes until the reporter is closed.
+        """
+
+        while True:
+            result = self._queue.get()
+
+            try:
+                if result is None:
+                    return
+
+                self._report(result)
+            except Exception:
+                logger.exception("%s -> Unexpected error while reporting %s for job %s", logger.name, result.outcome, result.job_key)
+            finally:
+                self._queue.task_done()
+
+
+    def _report(self, result: JobResult):
+        """
+        Reports an outcome, retrying with exponential backoff and jitter until it is acknowledged or the attempts are used up.
+
+        Args:
+            result (JobResult): Job outcome
+        """
+
+        report = getattr(self.camunda_service, result.outcome)
+
+        while True:
+            result.attempts += 1
+
+            if report(job_key=result.job_key, **result.kwargs):
+                self._count("reported")
+                return
+
+            if result.attempts >= self.max_attempts or self._stopped.is_set():
+                logger.error("%s -> Dropping %s for job %s after %s attempt(s)", logger.name, result.outcome, result.job_key, result.attempts)
+                self._count("dropped")
+                return
+
+            self._count("retried")
+            self._stopped.wait(random.uniform(0, self.retry_base_seconds * 2 ** (result.attempts - 1)))
+
+
+    def _count(self, stat: str):
+
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Gets the reporting counters
+
+        Returns:
+            dict[str, int]: Number of reported, retried and dropped outcomes and the number still queued
+        """
+
+        with self._stats_lock:
+            return self._stats | { "queued": self._queue.qsize() }
+
+
+    def flush(self):
+        """
+        Waits until all queued outcomes have been reported or dropped.
+        """
+
+        self._queue.join()
+
+
+    def close(self):
+        """
+        Reports the queued outcomes, then stops the senders. Retries are cut short once the reporter is closed.
+        """
+
+        if self._stopped.is_set():
+            return
+
+        self._stopped.set()
+
+        for _ in self._senders:
+            self._queue.put(None)
+
+        for sender in self._senders:
+            sender.join()
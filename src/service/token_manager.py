@@ -0,0 +1,454 @@
+"""
+Process-wide manager of the OAuth access token used to call the Orchestration Cluster REST API
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Awaitable, Callable
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no flock. Processes then only share tokens that are already cached
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Number of seconds before expiry at which the token is refreshed in the background
+REFRESH_MARGIN_SECONDS = 60
+
+# Number of seconds before expiry at which the token is no longer handed out to callers
+EXPIRY_SKEW_SECONDS = 5
+
+# Number of seconds to wait before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = 5
+
+# Token managers shared by all CamundaService instances of this process, keyed by client credentials
+_token_managers = {}
+_token_managers_lock = threading.Lock()
+
+class TokenCache:
+    """
+    File through which several processes share one access token, e.g. the worker processes of the job worker supervisor.
+    Requests for a new token are serialised with a lock on the file, so that only one process calls the authorization server
+    and the others pick up its token.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the cache file. It is created with permissions for the current user only.
+        """
+
+        self.path = path
+
+
+    def read(self) -> str:
+        """
+        Reads the cached access token
+
+        Returns:
+            str: Access token. Empty string if there is none.
+        """
+
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                return cache_file.read().strip()
+        except OSError:
+            return ""
+
+
+    def write(self, token: str):
+        """
+        Replaces the cached access token. Readers see either the previous or the new token, never a partial one.
+
+        Args:
+            token (str): Access token
+        """
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as cache_file:
+            cache_file.write(token)
+
+        os.replace(temp_path, self.path)
+
+
+    def fetch(self, fetch_token: Callable[[], str], stale_token: str, min_lifetime: float) -> str:
+        """
+        Gets the cached access token if another process has already replaced the stale one, otherwise requests a new token
+        and caches it.
+
+        Args:
+            fetch_token (Callable[[], str]): Function that requests a new access token from the authorization server
+            stale_token (str): Token of the calling process that is missing, expired or rejected
+            min_lifetime (float): Seconds the cached token must still be valid for to be used
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        with open(os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)) as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            token = self.read()
+            expires_at = TokenManager.decode_expiry(token)
+
+            if token and token != stale_token and (expires_at is None or expires_at - time.time() > min_lifetime):
+                logger.info("%s -> Using the access token cached in '%s'", logger.name, self.path)
+                return token
+
+            token = fetch_token()
+
+            if token:
+                self.write(token)
+
+            return token
+
+
+class TokenManager:
+
+    def __init__(self, fetch_token: Callable[[], str], refresh_margin: float = REFRESH_MARGIN_SECONDS, token_cache: TokenCache | None = None):
+        """
+        Args:
+            fetch_token (Callable[[], str]): Function that requests a new access token from the authorization server.
+                                             Returns an empty string if no token could be retrieved.
+            refresh_margin (float): Number of seconds before expiry at which the token is refreshed in the background.
+            token_cache (TokenCache | None): File through which the token is shared with other processes. Not shared if not set.
+        """
+
+        self.fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.token_cache = token_cache
+
+        self._token = ""
+        self._expires_at = None
+        # last token rejected by the server, which must not be taken from the token cache again
+        self._invalidated_token = ""
+        self._lock = threading.Lock()
+        self._refresh_timer = None
+
+
+    @staticmethod
+    def decode_expiry(token: str) -> float | None:
+        """
+        Decodes the expiry time from the payload of a JWT access token.
+        The signature is not verified as the token is only inspected to schedule its refresh.
+
+        Args:
+            token (str): JWT access token
+
+        Returns:
+            float | None: Expiry time in seconds since the epoch. None if the token is not a JWT or has no expiry.
+        """
+
+        try:
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return float(claims["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+
+    def _is_expired(self, expires_at: float | None) -> bool:
+        return expires_at is not None and time.time() >= expires_at - EXPIRY_SKEW_SECONDS
+
+
+    def get_token(self) -> str:
+        """
+        Gets a valid access token, requesting a new one only if there is no token or it has expired.
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        token = self.get_cached_token()
+
+        if token:
+            return token
+
+        return self.refresh(stale_token=self._token)
+
+
+    def get_cached_token(self) -> str:
+        """
+        Gets the current access token without requesting a new one.
+
+        Returns:
+            str: Access token. Empty string if there is no token or it has expired.
+        """
+
+        token, expires_at = self._token, self._expires_at
+
+        return token if token and not self._is_expired(expires_at) else ""
+
+
+    def refresh(self, stale_token: str | None = None) -> str:
+        """
+        Requests a new access token. Concurrent callers are collapsed into a single request to the authorization server.
+
+        Args:
+            stale_token (str | None): Token that the caller found to be missing, expired or rejected.
+                                      If another caller has already replaced it, the new token is returned without a request.
+                                      None forces a new token to be requested.
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        with self._lock:
+            if stale_token is not None and self._token and self._token != stale_token and not self._is_expired(self._expires_at):
+                return self._token
+
+            logger.info("%s -> Requesting a new access token", logger.name)
+            token = self._fetch_token(stale_token=self._token)
+
+            if token:
+                self._set_token(token)
+            elif self._is_expired(self._expires_at):
+                self._set_token("")
+
+            return self._token
+
+
+    def _fetch_token(self, stale_token: str) -> str:
+        """
+        Requests a new access token, or takes the one another process has cached in the meantime.
+
+        Args:
+            stale_token (str): Token being replaced
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        if self.token_cache is None:
+            return self.fetch_token()
+
+        # a cached token is only taken if it would not be due for a refresh itself
+        return self.token_cache.fetch(self.fetch_token, stale_token or self._invalidated_token, min_lifetime=self.refresh_margin)
+
+
+    def set_token(self, token: str):
+        """
+        Sets the access token and schedules its background refresh
+
+        Args:
+            token (str): Access token
+        """
+
+        with self._lock:
+            self._set_token(token)
+
+
+    def invalidate(self, token: str):
+        """
+        Discards the access token if it is still the current one, e.g. after it was rejected with a 401 response.
+
+        Args:
+            token (str): Access token that is no longer valid
+        """
+
+        with self._lock:
+            if self._token == token:
+                self._invalidated_token = token
+                self._set_token("")
+
+
+    def _set_token(self, token: str):
+
+        self._token = token
+        self._expires_at = self.decode_expiry(token) if token else None
+
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+        if self._expires_at is not None:
+            self._schedule_refresh(max(self._expires_at - self.refresh_margin - time.time(), 0))
+
+
+    def _schedule_refresh(self, delay: float):
+
+        self._refresh_timer = threading.Timer(delay, self._refresh_in_background, args=(self._token,))
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+        logger.debug("%s -> Access token refresh scheduled in %.0f seconds", logger.name, delay)
+
+
+    def _refresh_in_background(self, scheduled_token: str):
+
+        with self._lock:
+            # the token may have been replaced while this refresh was waiting for the lock
+            if self._token != scheduled_token:
+                return
+
+            logger.info("%s -> Refreshing the access token ahead of expiry", logger.name)
+            token = self._fetch_token(stale_token=scheduled_token)
+
+            if token:
+                self._set_token(token)
+            elif not self._is_expired(self._expires_at):
+                # the current token is still usable, so try again shortly
+                self._schedule_refresh(REFRESH_RETRY_SECONDS)
+            else:
+                self._set_token("")
+
+
+class AsyncTokenManager:
+    """
+    Access token of an asyncio client. It is only used on the event loop of its client, so it never takes a thread lock:
+    concurrent callers wait on an asyncio.Lock, and the token is refreshed ahead of expiry by a task on the loop rather
+    than by a timer thread.
+    """
+
+    def __init__(self, fetch_token: Callable[[], Awaitable[str]], refresh_margin: float = REFRESH_MARGIN_SECONDS):
+        """
+        Args:
+            fetch_token (Callable[[], Awaitable[str]]): Coroutine function that requests a new access token from the
+                                                        authorization server. Returns an empty string if no token could be retrieved.
+            refresh_margin (float): Number of seconds before expiry at which the token is refreshed in the background.
+        """
+
+        self.fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+
+        self._token = ""
+        self._expires_at = None
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+        # time before which no new background refresh is started after one failed
+        self._refresh_retry_at = 0.0
+
+
+    def _is_expired(self, expires_at: float | None) -> bool:
+        return expires_at is not None and time.time() >= expires_at - EXPIRY_SKEW_SECONDS
+
+
+    async def get_token(self) -> str:
+        """
+        Gets a valid access token, requesting a new one only if there is no token or it has expired.
+        A token that is due for a refresh is still returned while a new one is requested in the background.
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        token = self.get_cached_token()
+
+        if not token:
+            return await self.refresh(stale_token=self._token)
+
+        now = time.time()
+
+        if self._expires_at is not None and now >= self._expires_at - self.refresh_margin and self._refresh_task is None and now >= self._refresh_retry_at:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_in_background(token))
+
+        return token
+
+
+    def get_cached_token(self) -> str:
+        """
+        Gets the current access token without requesting a new one.
+
+        Returns:
+            str: Access token. Empty string if there is no token or it has expired.
+        """
+
+        return self._token if self._token and not self._is_expired(self._expires_at) else ""
+
+
+    async def refresh(self, stale_token: str | None = None) -> str:
+        """
+        Requests a new access token. Concurrent callers are collapsed into a single request to the authorization server.
+
+        Args:
+            stale_token (str | None): Token that the caller found to be missing, expired or rejected.
+                                      If another caller has already replaced it, the new token is returned without a request.
+                                      None forces a new token to be requested.
+
+        Returns:
+            str: Access token. Empty string if no token could be retrieved.
+        """
+
+        async with self._lock:
+            if stale_token is not None and self._token and self._token != stale_token and not self._is_expired(self._expires_at):
+                return self._token
+
+            logger.info("%s -> Requesting a new access token", logger.name)
+            token = await self.fetch_token()
+
+            if token:
+                self.set_token(token)
+            elif self._is_expired(self._expires_at):
+                self.set_token("")
+
+            return self._token
+
+
+    async def _refresh_in_background(self, scheduled_token: str):
+
+        try:
+            logger.info("%s -> Refreshing the access token ahead of expiry", logger.name)
+
+            if await self.refresh(stale_token=scheduled_token) == scheduled_token:
+                # the current token is still usable, so try again shortly
+                self._refresh_retry_at = time.time() + REFRESH_RETRY_SECONDS
+        finally:
+            self._refresh_task = None
+
+
+    def set_token(self, token: str):
+        """
+        Sets the access token
+
+        Args:
+            token (str): Access token
+        """
+
+        self._token = token
+        self._expires_at = TokenManager.decode_expiry(token) if token else None
+
+
+    def invalidate(self, token: str):
+        """
+        Discards the access token if it is still the current one, e.g. after it was rejected with a 401 response.
+
+        Args:
+            token (str): Access token that is no longer valid
+        """
+
+        if self._token == token:
+            self.set_token("")
+
+
+def get_token_manager(auth_url: str, client_id: str, token_audience: str, fetch_token: Callable[[], str],
+                      token_cache_file: str | None = None) -> TokenManager:
+    """
+    Gets the token manager shared by this process for the given client credentials, creating it on first use.
+
+    Args:
+        auth_url (str): The URL of the authorization server.
+        client_id (str): The client ID used to request an access token.
+        token_audience (str): The audience for which the token should be valid.
+        fetch_token (Callable[[], str]): Function that requests a new access token, used if the manager is created.
+        token_cache_file (str | None): File through which the token is shared with other processes, used if the manager is created.
+
+    Returns:
+        TokenManager: Shared token manager
+    """
+
+    key = (auth_url, client_id, token_audience)
+
+    with _token_managers_lock:
+        if key not in _token_managers:
+            _token_managers[key] = TokenManager(fetch_token=fetch_token, token_cache=TokenCache(token_cache_file) if token_cache_file else None)
+
+        return _token_managers[key]
@@ -0,0 +1,129 @@
+"""
+Background poller that waits for a variable to be set on many process instances at once
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from service.camunda_service import CamundaService
+
+logger = logging.getLogger(__name__)
+
+class VariablePoller:
+    """
+    Shares one polling thread between all clients waiting for a variable. The keys of all watched process instances are
+    looked up together, in batches, with one variable search per batch. Clients waiting for the same process instance
+    share the same future.
+    """
+
+    def __init__(self,
+                 get_camunda_service: Callable[[], CamundaService],
+                 variable_name: str,
+                 poll_interval: float = 1,
+                 batch_size: int = 100,
+                 max_wait_seconds: float = 120):
+        """
+        Args:
+            get_camunda_service (Callable[[], CamundaService]): Returns the service used for the variable searches.
+            variable_name (str): Name of the variable to wait for.
+            poll_interval (float): Seconds between polls.
+            batch_size (int): Maximum number of process instances looked up by one variable search.
+            max_wait_seconds (float): Seconds after which a process instance is no longer polled. Its future then resolves to "".
+        """
+
+        self.get_camunda_service = get_camunda_service
+        self.variable_name = variable_name
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        # (future, deadline) per watched process instance key
+        self._watched = {}
+        self._condition = threading.Condition()
+        self._poller = None
+
+
+    def watch(self, process_instance_key: str) -> Future:
+        """
+        Starts waiting for the variable of a process instance
+
+        Args:
+            process_instance_key (str): Key of the process instance
+
+        Returns:
+            Future: Resolves to the variable value, or "" if it was not set within max_wait_seconds
+        """
+
+        with self._condition:
+            future, _ = self._watched.get(process_instance_key, (None, None))
+            future = future or Future()
+            self._watched[process_instance_key] = (future, time.monotonic() + self.max_wait_seconds)
+
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._run, name=f"poll-{self.variable_name}", daemon=True)
+                self._poller.start()
+
+            self._condition.notify()
+
+        return future
+
+
+    def _run(self):
+        """
+        Polls the watched process instances, sleeping while there are none.
+        """
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._watched)
+
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("%s -> Unexpected error while polling variable '%s'", logger.name, self.variable_name)
+
+            time.sleep(self.poll_interval)
+
+
+    def poll(self):
+        """
+        Looks up the variable of all watched process instances and resolves the futures of those that have it set.
+        """
+
+        now = time.monotonic()
+
+        with self._condition:
+            expired = [key for key, (_, deadline) in self._watched.items() if deadline <= now]
+
+            for process_instance_key in expired:
+                future, _ = self._watched.pop(process_instance_key)
+                future.set_result("")
+
+            keys = list(self._watched)
+
+        camunda_service = self.get_camunda_service()
+
+        for start in range(0, len(keys), self.batch_size):
+            values = camunda_service.search_variables(self.variable_name, keys[start:start + self.batch_size])
+
+            with self._condition:
+                for process_instance_key, value in values.items():
+                    future, _ = self._watched.pop(process_instance_key, (None, None))
+
+                    if future:
+                        future.set_result(value)
+
+
+    def get_watched_count(self) -> int:
+        """
+        Gets the number of process instances being polled
+
+        Returns:
+            int: Number of watched process instances
+        """
+
+        with self._condition:
+            return len(self._watched)
@@ -0,0 +1,26 @@
+import json
+
+from benchmarks.codec_benchmark import create_activation_response, run_benchmark
+
+def test_run_benchmark_reports_cpu_time_per_call():
+
+    # Act
+    benchmark_results = run_benchmark(iterations=10, jobs=4, variables=5)
+
+    # Assert
+    results = benchmark_results["results"]
+    assert results["before"]["activation"]["speedup"] == 1
+    assert "after_json" in results
+
+    for operations in results.values():
+        assert operations["activation"]["cpu_microseconds_per_call"] > 0
+        assert operations["search"]["cpu_microseconds_per_call"] > 0
+
+
+def test_activation_response_holds_the_requested_jobs():
+
+    # Act
+    body = json.loads(create_activation_response(jobs=3))
+
+    # Assert
+    assert [job["variables"]["animal"] for job in body["jobs"]] == ["dog", "duck", "fox"]
@@ -0,0 +1,31 @@
+import pytest
+
+from benchmarks.fake_servers import LatencyDistribution
+from benchmarks.worker_benchmark import percentile, run_benchmark
+
+def test_run_benchmark_reports_all_jobs():
+
+    # Act
+    benchmark_results = run_benchmark(jobs=20, max_concurrent_jobs=4, zeebe_latency="constant:0", animal_latency="constant:0")
+
+    # Assert
+    results = benchmark_results["results"]
+    assert results["reported"] == 20
+    assert results["outcomes"]["completion"] == 20
+    assert results["jobs_per_second"] > 0
+    assert results["completion_latency_seconds"]["p50"] <= results["completion_latency_seconds"]["p99"]
+
+
+def test_percentile_uses_nearest_rank():
+
+    # Act / Assert
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([], 50) is None
+
+
+@pytest.mark.parametrize("spec", ["constant", "uniform:1", "normal:1:2"])
+def test_latency_distribution_rejects_invalid_spec(spec):
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        LatencyDistribution(spec)
@@ -0,0 +1,90 @@
+from src.helpers.activation_scheduler import ActivationScheduler
+from src.helpers.hedging import LatencyTracker
+
+def test_batch_limit_follows_how_full_activations_are():
+
+    # Arrange
+    scheduler = ActivationScheduler(max_concurrent_jobs=16)
+
+    # Act
+    scheduler.record_activation(requested=16, activated=3)
+    after_partial = scheduler.get_batch_limit()
+    scheduler.record_activation(requested=8, activated=1)
+    after_second_partial = scheduler.get_batch_limit()
+    scheduler.record_activation(requested=4, activated=4)
+    after_full = scheduler.get_batch_limit()
+    scheduler.record_activation(requested=8, activated=8)
+    scheduler.record_activation(requested=16, activated=16)
+
+    # Assert
+    assert after_partial == 8
+    assert after_second_partial == 4
+    assert after_full == 8
+    assert scheduler.get_batch_limit() == 16
+
+
+def test_empty_activation_keeps_batch_limit():
+
+    # Arrange
+    scheduler = ActivationScheduler(max_concurrent_jobs=16)
+
+    # Act
+    scheduler.record_activation(requested=16, activated=0)
+
+    # Assert
+    assert scheduler.get_batch_limit() == 16
+    assert scheduler.get_slot_wait() == 0
+
+
+def test_job_timeout_follows_p99_job_duration_within_bounds():
+
+    # Arrange
+    scheduler = ActivationScheduler(max_concurrent_jobs=5, min_job_timeout_ms=10000, job_timeout_factor=3,
+                                    latency_tracker=LatencyTracker(minimum_samples=3))
+
+    # Act
+    default_timeout = scheduler.get_job_timeout(60000)
+
+    for duration in (2, 4, 5):
+        scheduler.record_job_duration(duration)
+
+    adaptive_timeout = scheduler.get_job_timeout(60000)
+    capped_timeout = scheduler.get_job_timeout(12000)
+
+    # Assert
+    assert default_timeout == 60000
+    assert adaptive_timeout == 15000
+    assert capped_timeout == 12000
+
+
+def test_job_timeout_covers_slow_job_after_fast_jobs():
+
+    # Arrange
+    scheduler = ActivationScheduler(max_concurrent_jobs=5, latency_tracker=LatencyTracker(minimum_samples=3))
+
+    for duration in (0.2, 0.3, 0.5, 0.4, 0.3):
+        scheduler.record_job_duration(duration)
+
+    # Act
+    job_timeout = scheduler.get_job_timeout(120000)
+    slow_job_duration = 45
+
+    # Assert
+    assert job_timeout == 60000
+    assert job_timeout > slow_job_duration * 1000
+
+
+def test_slot_wait_and_request_timeout_are_jittered_within_bounds():
+
+    # Arrange
+    scheduler = ActivationScheduler(max_concurrent_jobs=5, max_slot_wait_seconds=0.5, jitter=0.1, latency_tracker=LatencyTracker(minimum_samples=1))
+    scheduler.record_job_duration(2)
+    scheduler.record_activation(requested=5, activated=5)
+
+    # Act
+    slot_waits = [scheduler.get_slot_wait() for _ in range(50)]
+    request_timeouts = [scheduler.get_request_timeout(20000) for _ in range(50)]
+
+    # Assert
+    assert all(0.18 <= slot_wait <= 0.22 for slot_wait in slot_waits)
+    assert all(18000 <= request_timeout <= 22000 for request_timeout in request_timeouts)
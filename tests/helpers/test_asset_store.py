@@ -0,0 +1,59 @@
+import os
+import pytest
+
+from src.helpers.asset_store import AssetStore
+
+@pytest.fixture
+def asset_dir(tmp_path):
+
+    (tmp_path / "process.bpmn").write_bytes(b"<bpmn/>")
+    (tmp_path / "form.form").write_bytes(b"{}")
+    (tmp_path / "notes.txt").write_bytes(b"not a resource")
+
+    return tmp_path
+
+
+def test_get_snapshot_loads_resources(asset_dir):
+
+    # Act
+    resources, digest = AssetStore(asset_dir=str(asset_dir)).get_snapshot()
+
+    # Assert
+    assert dict(resources) == { "form.form": b"{}", "process.bpmn": b"<bpmn/>" }
+    assert digest
+    with pytest.raises(TypeError):
+        resources["process.bpmn"] = b""
+
+
+def test_get_snapshot_without_reload_ignores_changes(asset_dir):
+
+    # Arrange
+    asset_store = AssetStore(asset_dir=str(asset_dir))
+    _, digest = asset_store.get_snapshot()
+
+    (asset_dir / "process.bpmn").write_bytes(b"<bpmn version='2'/>")
+
+    # Act
+    resources, new_digest = asset_store.get_snapshot()
+
+    # Assert
+    assert new_digest == digest
+    assert resources["process.bpmn"] == b"<bpmn/>"
+
+
+def test_get_snapshot_reloads_changed_files(asset_dir):
+
+    # Arrange
+    asset_store = AssetStore(asset_dir=str(asset_dir), reload_interval=0)
+    _, digest = asset_store.get_snapshot()
+
+    process_path = asset_dir / "process.bpmn"
+    process_path.write_bytes(b"<bpmn version='2'/>")
+    os.utime(process_path, ns=(0, 0))
+
+    # Act
+    resources, new_digest = asset_store.get_snapshot()
+
+    # Assert
+    assert new_digest != digest
+    assert resources["process.bpmn"] == b"<bpmn version='2'/>"
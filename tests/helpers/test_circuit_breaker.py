@@ -0,0 +1,84 @@
+import pytest
+
+from src.helpers.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+@pytest.fixture
+def circuit_breaker():
+
+    return CircuitBreaker(name="test", window_size=4, minimum_calls=4, failure_rate_threshold=0.5, slow_call_seconds=1, open_seconds=0)
+
+
+def test_circuit_opens_on_failure_rate(circuit_breaker):
+
+    # Arrange
+    circuit_breaker.open_seconds = 60
+
+    # Act
+    for success in [True, True, False, False]:
+        circuit_breaker.record(success=success, duration=0.1)
+
+    # Assert
+    assert circuit_breaker.state == OPEN
+    assert not circuit_breaker.allow_request()
+
+
+def test_circuit_opens_on_slow_call_rate(circuit_breaker):
+
+    # Arrange
+    circuit_breaker.open_seconds = 60
+
+    # Act
+    for _ in range(4):
+        circuit_breaker.record(success=True, duration=2)
+
+    # Assert
+    assert circuit_breaker.state == OPEN
+
+
+def test_circuit_closes_after_successful_trial(circuit_breaker):
+
+    # Arrange
+    for _ in range(4):
+        circuit_breaker.record(success=False, duration=0.1)
+
+    # Act
+    trial_allowed = circuit_breaker.allow_request()
+    second_call_allowed = circuit_breaker.allow_request()
+    circuit_breaker.record(success=True, duration=0.1)
+
+    # Assert
+    assert trial_allowed
+    assert not second_call_allowed
+    assert circuit_breaker.state == CLOSED
+
+
+def test_circuit_reopens_after_failed_trial(circuit_breaker):
+
+    # Arrange
+    for _ in range(4):
+        circuit_breaker.record(success=False, duration=0.1)
+
+    circuit_breaker.allow_request()
+    assert circuit_breaker.state == HALF_OPEN
+
+    # Act
+    circuit_breaker.record(success=False, duration=0.1)
+
+    # Assert
+    assert circuit_breaker.state == OPEN
+
+
+def test_released_trial_lets_next_trial_through(circuit_breaker):
+
+    # Arrange
+    for _ in range(4):
+        circuit_breaker.record(success=False, duration=0.1)
+
+    circuit_breaker.allow_request()
+
+    # Act
+    circuit_breaker.release()
+
+    # Assert
+    assert circuit_breaker.state == HALF_OPEN
+    assert circuit_breaker.allow_request()
@@ -0,0 +1,102 @@
+import os
+import pytest
+
+from unittest.mock import patch
+from src.helpers.config import ConfigStore, HedgingConfig, JobWorkerConfig, parse_config
+
+@pytest.fixture
+def config_file(tmp_path):
+
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("animal_api_url:\n  dog: https://random.dog/woof.json\njob_worker:\n  max_concurrent_jobs: 3\n")
+
+    return config_path
+
+
+def test_parse_config_fills_defaults():
+
+    # Act
+    app_config = parse_config({ "animal_api_url": { "dog": "https://random.dog/woof.json" }, "job_worker": { "backoff_max_seconds": 10 } })
+
+    # Assert
+    assert app_config.job_worker == JobWorkerConfig(backoff_max_seconds=10.0)
+    assert app_config.animal_service.hedging == HedgingConfig()
+    assert app_config.assets.reload_interval is None
+
+
+@pytest.mark.parametrize("yaml_config", [
+    { "job_worker": {} },
+    { "animal_api_url": {}, "job_worker": { "max_concurrent_jobs": "5" } },
+    { "animal_api_url": {}, "job_worker": { "max_concurrent_job": 5 } },
+    { "animal_api_url": {}, "logging": { "log_level": "VERBOSE" } },
+    { "animal_api_url": {}, "logging": { "handlers": ["syslog"] } },
+    { "animal_api_url": {}, "logging": { "handlers": ["file"] } },
+    { "animal_api_url": {}, "http_transport": { "json_backend": "ujson" } },
+    { "animal_api_url": {}, "web_app": { "bulk_max_concurrency": 4, "bulk_max_concurrency_per_request": 8 } },
+    { "animal_api_url": { "dog": "https://random.dog/woof.json" }, "animal_service": { "hedging": { "animals": ["fox"] } } }
+])
+def test_parse_config_rejects_invalid_values(yaml_config):
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        parse_config(yaml_config)
+
+
+def test_repo_config_file_is_valid():
+
+    # Act
+    app_config = ConfigStore(os.path.join(os.path.dirname(__file__), "..", "..", "src", "config.yaml")).get()
+
+    # Assert
+    assert set(app_config.animal_api_url) == { "dog", "duck", "fox" }
+    assert app_config.animal_service.hedging.animals == ("duck", "fox")
+
+
+def test_get_does_no_io(config_file):
+
+    # Arrange
+    config_store = ConfigStore(str(config_file))
+
+    # Act
+    with patch("builtins.open") as mock_open, patch("os.stat") as mock_stat:
+        app_config = config_store.get()
+
+    # Assert
+    assert app_config.job_worker.max_concurrent_jobs == 3
+    mock_open.assert_not_called()
+    mock_stat.assert_not_called()
+
+
+def test_reload_if_changed_applies_new_file(config_file):
+
+    # Arrange
+    config_store = ConfigStore(str(config_file))
+
+    # Act
+    unchanged = config_store.reload_if_changed()
+
+    config_file.write_text("animal_api_url:\n  dog: https://random.dog/woof.json\njob_worker:\n  max_concurrent_jobs: 7\n")
+    os.utime(config_file, ns=(os.stat(config_file).st_atime_ns, os.stat(config_file).st_mtime_ns + 1_000_000))
+
+    changed = config_store.reload_if_changed()
+
+    # Assert
+    assert not unchanged
+    assert changed
+    assert config_store.get().job_worker.max_concurrent_jobs == 7
+
+
+def test_reload_keeps_current_config_when_file_is_invalid(config_file):
+
+    # Arrange
+    config_store = ConfigStore(str(config_file))
+    app_config = config_store.get()
+
+    config_file.write_text("animal_api_url:\n  dog: https://random.dog/woof.json\njob_worker:\n  max_concurrent_jobs: many\n")
+
+    # Act
+    reloaded = config_store.reload()
+
+    # Assert
+    assert not reloaded
+    assert config_store.get() is app_config
@@ -0,0 +1,59 @@
+import pytest
+
+from src.helpers.hedging import HedgeBudget, LatencyTracker
+
+def test_percentile_requires_minimum_samples():
+
+    # Arrange
+    latency_tracker = LatencyTracker(window_size=100, minimum_samples=3)
+    latency_tracker.record(1.0)
+
+    # Act / Assert
+    assert latency_tracker.percentile(95) is None
+
+
+def test_percentile_of_recent_latencies():
+
+    # Arrange
+    latency_tracker = LatencyTracker(window_size=100, minimum_samples=1)
+
+    for latency in range(1, 101):
+        latency_tracker.record(float(latency))
+
+    # Act / Assert
+    assert latency_tracker.percentile(50) == 50.0
+    assert latency_tracker.percentile(95) == 95.0
+    assert latency_tracker.percentile(100) == 100.0
+
+
+def test_hedge_budget_caps_hedge_ratio():
+
+    # Arrange
+    hedge_budget = HedgeBudget(max_hedge_ratio=0.1, max_concurrent_hedges=100)
+
+    # Act
+    hedges = 0
+    for _ in range(100):
+        hedge_budget.record_request()
+
+        if hedge_budget.try_acquire():
+            hedges += 1
+            hedge_budget.release()
+
+    # Assert
+    assert hedges == pytest.approx(10, abs=1)
+
+
+def test_hedge_budget_caps_concurrent_hedges():
+
+    # Arrange
+    hedge_budget = HedgeBudget(max_hedge_ratio=1, max_concurrent_hedges=2)
+
+    for _ in range(5):
+        hedge_budget.record_request()
+
+    # Act
+    acquired = [hedge_budget.try_acquire() for _ in range(3)]
+
+    # Assert
+    assert acquired == [True, True, False]
@@ -0,0 +1,47 @@
+import threading
+import pytest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.helpers.http_transport import HttpTransport
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"url": "https://example.com/dog.jpg"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_pool_stats_counts_connection_reuse(server_url):
+
+    # Arrange
+    transport = HttpTransport(pool_connections=1, pool_maxsize=1)
+
+    # Act
+    for _ in range(3):
+        response = transport.get(url=f"{server_url}/woof.json")
+        assert response.ok
+
+    # Assert
+    assert transport.get_pool_stats() == { "127.0.0.1": { "hits": 2, "misses": 1 } }
+
@@ -0,0 +1,60 @@
+import json
+import pytest
+import requests
+
+from unittest.mock import Mock
+from src.helpers.json_codec import JsonCodec, orjson
+
+BACKENDS = ["json", "orjson"] if orjson is not None else ["json"]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_encode_and_decode_round_trip(backend):
+
+    # Arrange
+    codec = JsonCodec(backend)
+    value = { "type": "retrieve-animal-image", "variables": { "animal": "fox", "caption": "Füchsin" }, "retries": 3 }
+
+    # Act
+    encoded = codec.encode(value)
+
+    # Assert
+    assert isinstance(encoded, bytes)
+    assert b" " not in encoded.replace("Füchsin".encode(), b"")
+    assert codec.decode(encoded) == value
+    assert json.loads(encoded) == value
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_payload_template_renders_constant_and_varying_fields(backend):
+
+    # Arrange
+    template = JsonCodec(backend).template(type="retrieve-animal-image", worker="animal-image-worker")
+
+    # Act
+    payload = template.render(timeout=60000, maxJobsToActivate=5)
+
+    # Assert
+    assert json.loads(payload) == { "type": "retrieve-animal-image", "worker": "animal-image-worker", "timeout": 60000, "maxJobsToActivate": 5 }
+    assert json.loads(template.render()) == { "type": "retrieve-animal-image", "worker": "animal-image-worker" }
+    assert json.loads(JsonCodec(backend).template().render(timeout=1)) == { "timeout": 1 }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_decode_response_raises_requests_json_error(backend):
+
+    # Arrange
+    response = Mock()
+    response.content = b"<html>Bad Gateway</html>"
+
+    # Act / Assert
+    with pytest.raises(requests.exceptions.RequestException) as exception_info:
+        JsonCodec(backend).decode_response(response)
+
+    assert isinstance(exception_info.value, ValueError)
+
+
+def test_unknown_backend_is_rejected():
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        JsonCodec("ujson")
@@ -0,0 +1,56 @@
+import logging
+import pytest
+
+from logging.handlers import QueueHandler
+from unittest.mock import Mock
+from src.helpers.config import LoggingConfig
+from src.helpers.logging_setup import LazyJson, configure_logging, stop_logging
+
+@pytest.fixture
+def root_logger():
+
+    root_logger = logging.getLogger()
+    handlers, level = list(root_logger.handlers), root_logger.level
+
+    yield root_logger
+
+    stop_logging()
+
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+
+    for handler in handlers:
+        root_logger.addHandler(handler)
+
+    root_logger.setLevel(level)
+
+
+def test_lazy_json_is_only_serialised_when_the_level_is_enabled(root_logger):
+
+    # Arrange
+    configure_logging(LoggingConfig(log_level="INFO", queue=False))
+    get_payload = Mock(return_value={ "jobs": [] })
+
+    # Act
+    logging.getLogger("test").debug("%s", LazyJson(get_payload))
+
+    # Assert
+    get_payload.assert_not_called()
+    assert str(LazyJson(get_payload, indent=None)) == '{"jobs": []}'
+
+
+def test_configure_logging_writes_records_from_the_queue_listener(root_logger, tmp_path):
+
+    # Arrange
+    log_path = tmp_path / "app.log"
+
+    # Act
+    listener = configure_logging(LoggingConfig(log_level="DEBUG", format="%(levelname)s %(message)s", handlers=("file",), file_path=str(log_path)))
+    logging.getLogger("test").debug("payload: %s", LazyJson({ "animal": "dog" }, indent=None))
+    stop_logging()
+
+    # Assert
+    assert listener is not None
+    assert isinstance(root_logger.handlers[0], QueueHandler)
+    assert root_logger.level == logging.DEBUG
+    assert log_path.read_text() == 'DEBUG payload: {"animal": "dog"}\n'
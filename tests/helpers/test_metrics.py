@@ -0,0 +1,72 @@
+import pytest
+import requests
+
+from src.helpers.metrics import Counter, Gauge, Histogram, MetricsRegistry, start_metrics_server
+
+@pytest.fixture
+def registry():
+
+    registry = MetricsRegistry()
+    registry.enabled = True
+
+    return registry
+
+
+def test_render_uses_prometheus_text_format(registry):
+
+    # Arrange
+    counter = Counter("requests_total", "Requests", ("status",), registry=registry)
+    gauge = Gauge("in_flight", "In flight", registry=registry)
+    histogram = Histogram("duration_seconds", "Duration", ("operation",), registry=registry, buckets=(0.1, 1))
+
+    # Act
+    counter.inc("200")
+    counter.inc("200", amount=2)
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    histogram.observe(0.1, "complete_job")
+    histogram.observe(0.5, "complete_job")
+    histogram.observe(5, "complete_job")
+
+    # Assert
+    assert registry.render() == (
+        "# HELP requests_total Requests\n# TYPE requests_total counter\n"
+        'requests_total{status="200"} 3\n'
+        "# HELP in_flight In flight\n# TYPE in_flight gauge\n"
+        "in_flight 1\n"
+        "# HELP duration_seconds Duration\n# TYPE duration_seconds histogram\n"
+        'duration_seconds_bucket{operation="complete_job",le="0.1"} 1\n'
+        'duration_seconds_bucket{operation="complete_job",le="1"} 2\n'
+        'duration_seconds_bucket{operation="complete_job",le="+Inf"} 3\n'
+        'duration_seconds_sum{operation="complete_job"} 5.6\n'
+        'duration_seconds_count{operation="complete_job"} 3\n'
+    )
+
+
+def test_nothing_is_recorded_while_disabled(registry):
+
+    # Arrange
+    registry.enabled = False
+    counter = Counter("requests_total", "Requests", registry=registry)
+
+    # Act
+    counter.inc()
+
+    # Assert
+    assert registry.render() == "# HELP requests_total Requests\n# TYPE requests_total counter\n"
+
+
+def test_metrics_server_serves_metrics(registry):
+
+    # Arrange
+    Counter("requests_total", "Requests", registry=registry).inc()
+    server = start_metrics_server(0, registry=registry)
+
+    # Act
+    response = requests.get(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5)
+    server.shutdown()
+
+    # Assert
+    assert response.status_code == 200
+    assert "requests_total 1" in response.text
@@ -0,0 +1,89 @@
+import threading
+import time
+import pytest
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from src.helpers.rate_limiter import RateLimiter, parse_retry_after
+
+def test_acquire_admits_burst_then_queues_at_rate():
+
+    # Arrange
+    rate_limiter = RateLimiter(name="dog", rate=20, burst=2, max_wait_seconds=1)
+    admitted_at = []
+
+    def call():
+        rate_limiter.acquire()
+        admitted_at.append(time.monotonic())
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+
+    # Act
+    started_at = time.monotonic()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert len(admitted_at) == 6
+    assert max(admitted_at) - started_at == pytest.approx(0.2, abs=0.08)
+    assert rate_limiter.get_stats()["admitted"] == 6
+    assert rate_limiter.get_stats()["max_wait_seconds"] > 0.1
+
+
+def test_acquire_rejects_callers_whose_token_is_not_due_before_the_deadline():
+
+    # Arrange
+    rate_limiter = RateLimiter(name="fox", rate=1, burst=1, max_wait_seconds=0.1)
+    rate_limiter.acquire()
+
+    # Act
+    started_at = time.monotonic()
+    admitted = rate_limiter.acquire()
+
+    # Assert
+    assert not admitted
+    assert time.monotonic() - started_at < 0.05
+    assert rate_limiter.get_stats()["rejected"] == 1
+
+
+def test_pause_holds_back_queued_callers():
+
+    # Arrange
+    rate_limiter = RateLimiter(name="duck", rate=20, burst=5, max_wait_seconds=1)
+
+    # Act
+    rate_limiter.pause(0.2)
+    started_at = time.monotonic()
+    admitted = rate_limiter.acquire()
+    waited = time.monotonic() - started_at
+
+    # Assert
+    assert admitted
+    assert waited >= 0.2
+    assert not rate_limiter.acquire(timeout=0)
+    assert rate_limiter.get_stats()["throttled"] == 1
+
+
+@pytest.mark.parametrize("retry_after, expected", [
+    ("3", 3.0),
+    ("-1", 0.0),
+    (None, None),
+    ("soon", None)
+])
+def test_parse_retry_after(retry_after, expected):
+
+    # Act / Assert
+    assert parse_retry_after(retry_after) == expected
+
+
+def test_parse_retry_after_http_date():
+
+    # Arrange
+    retry_after = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+    # Act / Assert
+    assert parse_retry_after(retry_after) == pytest.approx(30, abs=2)
@@ -0,0 +1,65 @@
+import pytest
+import requests
+
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from src.helpers.retry_policy import RetryPolicy, get_backoff_delay, is_transient_exception, is_transient_status, is_unsent_request_error
+
+@pytest.mark.parametrize("status_code, transient", [
+    (429, True),
+    (503, True),
+    (501, True),
+    (507, True),
+    (408, True),
+    (400, False),
+    (404, False)
+])
+def test_is_transient_status(status_code, transient):
+
+    # Act / Assert
+    assert is_transient_status(status_code) == transient
+
+
+def test_is_transient_exception():
+
+    # Act / Assert
+    assert is_transient_exception(requests.exceptions.ReadTimeout())
+    assert is_transient_exception(requests.exceptions.ConnectionError())
+    assert not is_transient_exception(KeyError("cat"))
+
+
+def test_is_unsent_request_error():
+
+    # Arrange
+    refused = requests.exceptions.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "Connection refused")))
+
+    # Act / Assert
+    assert is_unsent_request_error(refused)
+    assert is_unsent_request_error(requests.exceptions.ConnectTimeout())
+    assert not is_unsent_request_error(requests.exceptions.ConnectionError("Connection reset by peer"))
+
+
+def test_get_backoff_delay_is_capped():
+
+    # Act
+    delays = [get_backoff_delay(attempt, 0.1, 1) for attempt in range(1, 20)]
+
+    # Assert
+    assert all(0 <= delay <= 1 for delay in delays)
+
+
+def test_retry_back_off_grows_with_used_retries():
+
+    # Arrange
+    retry_policy = RetryPolicy(initial_retries=3, backoff_base_ms=1000, backoff_max_ms=3000)
+
+    # Act
+    first_back_off = retry_policy.get_retry_back_off(3)
+    second_back_off = retry_policy.get_retry_back_off(2)
+    capped_back_off = retry_policy.get_retry_back_off(0)
+
+    # Assert
+    assert 500 <= first_back_off <= 1000
+    assert 1000 <= second_back_off <= 2000
+    assert 1500 <= capped_back_off <= 3000
+    assert retry_policy.can_retry(2)
+    assert not retry_policy.can_retry(1)
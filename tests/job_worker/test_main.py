@@ -0,0 +1,231 @@
+import sys
+import threading
+import time
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+import src.job_worker.main as job_worker
+from src.helpers.activation_scheduler import ActivationScheduler
+from src.helpers.config import JobWorkerConfig, SupervisorConfig
+from src.helpers.retry_policy import RetryPolicy
+
+@pytest.fixture
+def mock_animal_service():
+
+    return Mock()
+
+@pytest.fixture
+def mock_camunda_service():
+
+    camunda_service = Mock()
+    camunda_service.activate_jobs.return_value = [
+        { "jobKey": str(job_key), "variables": { "animal": "duck" } } for job_key in range(5)
+    ]
+
+    return camunda_service
+
+
+def test_main_handles_jobs_concurrently(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    running = []
+    max_running = []
+    lock = threading.Lock()
+
+    def slow_get_animal_url(animal):
+        with lock:
+            running.append(animal)
+            max_running.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.pop()
+        return "https://random-d.uk/api/1.jpg"
+
+    mock_animal_service.get_animal_url.side_effect = slow_get_animal_url
+
+    job_slots = threading.Semaphore(5)
+
+    # Act
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        job_worker.main(mock_camunda_service, mock_animal_service, executor, job_slots, JobWorkerConfig(max_concurrent_jobs=5))
+
+    # Assert
+    assert max(max_running) == 5
+    assert mock_camunda_service.complete_job.call_count == 5
+    assert job_slots._value == 5
+
+
+def test_main_activates_only_free_capacity(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    job_slots = threading.Semaphore(5)
+    job_slots.acquire()
+    job_slots.acquire()
+
+    mock_camunda_service.activate_jobs.return_value = []
+
+    # Act
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        jobs = job_worker.main(mock_camunda_service, mock_animal_service, executor, job_slots,
+                               JobWorkerConfig(max_concurrent_jobs=5, request_timeout_ms=20000, worker_name="animal-image-worker-2"))
+
+    # Assert
+    assert jobs == []
+    assert mock_camunda_service.activate_jobs.call_args[1]["max_jobs_to_activate"] == 3
+    assert mock_camunda_service.activate_jobs.call_args[1]["request_timeout"] == 20000
+    assert mock_camunda_service.activate_jobs.call_args[1]["worker"] == "animal-image-worker-2"
+    assert job_slots._value == 3
+
+
+def test_main_sizes_activation_with_scheduler(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    job_slots = threading.Semaphore(5)
+    scheduler = ActivationScheduler(max_concurrent_jobs=5)
+    scheduler.record_activation(requested=5, activated=2)
+
+    mock_camunda_service.activate_jobs.return_value = []
+
+    # Act
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        job_worker.main(mock_camunda_service, mock_animal_service, executor, job_slots, JobWorkerConfig(max_concurrent_jobs=5), scheduler=scheduler)
+
+    # Assert
+    assert mock_camunda_service.activate_jobs.call_args[1]["max_jobs_to_activate"] == 2
+    assert job_slots._value == 5
+
+
+def test_get_backoff_delay_is_capped():
+
+    # Arrange
+    worker_config = JobWorkerConfig(backoff_base_seconds=0.5, backoff_max_seconds=2)
+
+    # Act
+    delays = [job_worker.get_backoff_delay(failures, worker_config) for failures in range(1, 20)]
+
+    # Assert
+    assert all(0 <= delay <= 2 for delay in delays)
+    assert job_worker.get_backoff_delay(1, worker_config) <= 0.5
+
+
+def test_get_restart_delay_doubles_per_crash_up_to_the_max():
+
+    # Arrange
+    supervisor_config = SupervisorConfig(restart_delay_seconds=1, restart_delay_max_seconds=5)
+
+    # Act
+    delays = [job_worker.get_restart_delay(crashes, supervisor_config) for crashes in range(1, 6)]
+
+    # Assert
+    assert delays == [1, 2, 4, 5, 5]
+
+
+def crash_worker(process_number: int, token_cache_file: str):
+    """
+    Helper worker process target that records its start next to the token cache file and crashes
+    """
+
+    with open(f"{token_cache_file}.{process_number}", "a", encoding="utf-8") as starts_file:
+        starts_file.write("started\n")
+
+    sys.exit(1)
+
+
+def test_supervise_restarts_crashed_worker_processes(tmp_path):
+
+    # Arrange
+    token_cache_file = tmp_path / "access_token"
+    supervisor_config = SupervisorConfig(restart_delay_seconds=0.05, restart_delay_max_seconds=0.05, token_cache_file=str(token_cache_file))
+    stop_event = threading.Event()
+
+    def count_starts(process_number):
+        starts_path = tmp_path / f"access_token.{process_number}"
+        return len(starts_path.read_text().splitlines()) if starts_path.exists() else 0
+
+    supervisor = threading.Thread(target=job_worker.supervise, args=(2, supervisor_config, crash_worker, stop_event))
+
+    # Act
+    supervisor.start()
+
+    deadline = time.monotonic() + 30
+
+    while (count_starts(1) < 2 or count_starts(2) < 2) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    stop_event.set()
+    supervisor.join(timeout=30)
+
+    # Assert
+    assert not supervisor.is_alive()
+    assert count_starts(1) >= 2
+    assert count_starts(2) >= 2
+
+
+def test_handle_job_throws_error_for_missing_url(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    mock_animal_service.get_animal_url.return_value = ""
+
+    # Act
+    job_worker.handle_job(mock_camunda_service, mock_animal_service, { "jobKey": "1", "variables": { "animal": "duck" } })
+
+    # Assert
+    mock_camunda_service.throw_error_job.assert_called_once()
+    assert mock_camunda_service.throw_error_job.call_args[1]["error_code"] == "1"
+
+
+def test_handle_job_throws_error_on_unexpected_error(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    mock_animal_service.get_animal_url.side_effect = KeyError("cat")
+
+    # Act
+    job_worker.handle_job(mock_camunda_service, mock_animal_service, { "jobKey": "1", "retries": 3, "variables": { "animal": "cat" } }, RetryPolicy())
+
+    # Assert
+    mock_camunda_service.fail_job.assert_not_called()
+    assert mock_camunda_service.throw_error_job.call_args[1]["error_code"] == "1"
+    mock_camunda_service.complete_job.assert_not_called()
+
+
+def test_handle_job_throws_error_on_permanent_api_error(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    mock_animal_service.get_animal_url.side_effect = job_worker.AnimalApiError("duck", 404)
+
+    # Act
+    job_worker.handle_job(mock_camunda_service, mock_animal_service, { "jobKey": "1", "retries": 3, "variables": { "animal": "duck" } }, RetryPolicy())
+
+    # Assert
+    mock_camunda_service.fail_job.assert_not_called()
+    assert mock_camunda_service.throw_error_job.call_args[1]["error_code"] == "1"
+    assert "404" in mock_camunda_service.throw_error_job.call_args[1]["error_message"]
+
+
+def test_handle_job_fails_transient_failure_with_retries(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    mock_animal_service.get_animal_url.return_value = ""
+    retry_policy = RetryPolicy(initial_retries=3, backoff_base_ms=1000, backoff_max_ms=10000)
+
+    # Act
+    job_worker.handle_job(mock_camunda_service, mock_animal_service, { "jobKey": "1", "retries": 3, "variables": { "animal": "duck" } }, retry_policy)
+
+    # Assert
+    mock_camunda_service.throw_error_job.assert_not_called()
+    assert mock_camunda_service.fail_job.call_args[1]["retries"] == 2
+    assert 500 <= mock_camunda_service.fail_job.call_args[1]["retry_back_off"] <= 1000
+
+
+def test_handle_job_throws_error_once_retries_are_used_up(mock_animal_service, mock_camunda_service):
+
+    # Arrange
+    mock_animal_service.get_animal_url.return_value = ""
+
+    # Act
+    job_worker.handle_job(mock_camunda_service, mock_animal_service, { "jobKey": "1", "retries": 1, "variables": { "animal": "duck" } }, RetryPolicy())
+
+    # Assert
+    mock_camunda_service.fail_job.assert_not_called()
+    assert mock_camunda_service.throw_error_job.call_args[1]["error_code"] == "1"
@@ -1,7 +1,13 @@
+import time
 import pytest
 import validators
 
-from src.service.animal_api_service import AnimalService
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from src.helpers.hedging import HedgeBudget
+from src.helpers.rate_limiter import RateLimiter
+from src.service.animal_api_service import AnimalApiError, AnimalService
 
 
 @pytest.fixture
@@ -23,4 +29,198 @@ def test_get_animal_url(animal):
     animal_service = AnimalService()
     animal_url = animal_service.get_animal_url(animal)
 
-    assert validators.url(animal_url)
\ No newline at end of file
+    assert validators.url(animal_url)
+
+@pytest.fixture
+def prefetching_animal_service():
+
+    with patch.object(AnimalService, "_fetch_animal_url", side_effect=lambda animal, **kwargs: f"https://example.com/{animal}.jpg"):
+        animal_service = AnimalService(prefetch=True)
+
+        # wait for the background fetchers to fill the buffers
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and any(stats["buffered"] < animal_service.buffer_size for stats in animal_service.get_prefetch_stats().values()):
+            time.sleep(0.01)
+
+        yield animal_service
+
+        animal_service.close()
+
+
+def test_get_animal_url_from_prefetch_buffer(prefetching_animal_service):
+
+    # Act
+    animal_url = prefetching_animal_service.get_animal_url("fox")
+
+    # Assert
+    assert animal_url == "https://example.com/fox.jpg"
+    assert prefetching_animal_service.get_prefetch_stats()["fox"]["hits"] == 1
+    assert prefetching_animal_service.get_prefetch_stats()["fox"]["misses"] == 0
+
+
+def test_get_animal_url_discards_stale_prefetched_urls(prefetching_animal_service):
+
+    # Arrange
+    prefetching_animal_service.max_age_seconds = 0
+    time.sleep(0.01)
+
+    # Act
+    animal_url = prefetching_animal_service.get_animal_url("duck")
+
+    # Assert
+    assert animal_url == "https://example.com/duck.jpg"
+    assert prefetching_animal_service.get_prefetch_stats()["duck"]["misses"] == 1
+
+
+@pytest.mark.parametrize("url, valid", [
+    ("https://random.dog/1.jpg", True),
+    ("https://random.dog/1.MP4", False),
+    ("", False)
+])
+def test_is_valid_url(url, valid):
+
+    assert AnimalService.is_valid_url(url) == valid
+
+
+def test_get_animal_url_serves_recent_url_while_circuit_open():
+
+    # Arrange
+    animal_service = AnimalService()
+    circuit_breaker = animal_service._circuit_breakers["dog"]
+    circuit_breaker.open_seconds = 60
+
+    with patch.object(animal_service, "_request_animal_url", return_value="https://random.dog/1.jpg"):
+        animal_service.get_animal_url("dog")
+
+    # Act
+    with patch.object(animal_service, "_request_animal_url", return_value="") as mock_request_animal_url:
+        for _ in range(circuit_breaker.minimum_calls):
+            animal_service.get_animal_url("dog")
+
+        mock_request_animal_url.reset_mock()
+        animal_url = animal_service.get_animal_url("dog")
+
+    # Assert
+    mock_request_animal_url.assert_not_called()
+    assert animal_url == "https://random.dog/1.jpg"
+
+
+def test_get_animal_url_hedges_slow_request():
+
+    # Arrange
+    animal_service = AnimalService()
+    animal_service.hedged_animals = { "fox" }
+    animal_service._hedge_executor = ThreadPoolExecutor(max_workers=2)
+    animal_service._hedge_budget = HedgeBudget(max_hedge_ratio=1, max_concurrent_hedges=1)
+
+    for _ in range(animal_service._latency_trackers["fox"].minimum_samples):
+        animal_service._latency_trackers["fox"].record(0.01)
+
+    responses = iter([(1, "https://randomfox.ca/slow.jpg"), (0, "https://randomfox.ca/fast.jpg")])
+
+    def request_animal_url(animal):
+        delay, url = next(responses)
+        time.sleep(delay)
+        return url
+
+    # Act
+    with patch.object(animal_service, "_request_animal_url", side_effect=request_animal_url):
+        started_at = time.monotonic()
+        animal_url = animal_service.get_animal_url("fox")
+        elapsed = time.monotonic() - started_at
+
+    animal_service.close()
+
+    # Assert
+    assert animal_url == "https://randomfox.ca/fast.jpg"
+    assert elapsed < 0.5
+
+
+def test_get_animal_url_pauses_rate_limiter_on_429():
+
+    # Arrange
+    animal_service = AnimalService()
+    animal_service._rate_limiters = { "dog": RateLimiter(name="dog", rate=100, burst=1, max_wait_seconds=0.5) }
+
+    throttled_response = Mock(ok=False, status_code=429, headers={ "Retry-After": "5" }, text="Too Many Requests")
+
+    # Act
+    with patch.object(animal_service.transport, "get", return_value=throttled_response) as mock_get:
+        first_url = animal_service.get_animal_url("dog")
+        second_url = animal_service.get_animal_url("dog")
+
+    # Assert
+    assert first_url == second_url == ""
+    mock_get.assert_called_once()
+    assert animal_service.get_rate_limit_stats()["dog"]["throttled"] == 1
+    assert animal_service.get_rate_limit_stats()["dog"]["rejected"] == 1
+
+
+def test_rate_limited_trial_call_does_not_wedge_half_open_circuit():
+
+    # Arrange
+    animal_service = AnimalService()
+    circuit_breaker = animal_service._circuit_breakers["dog"]
+    circuit_breaker.open_seconds = 0
+
+    with patch.object(animal_service, "_request_animal_url", return_value=""):
+        for _ in range(circuit_breaker.minimum_calls):
+            animal_service.get_animal_url("dog")
+
+    # Act
+    with patch.object(animal_service, "_acquire_rate_limit", side_effect=[False, True]), \
+         patch.object(animal_service, "_request_animal_url", return_value="https://random.dog/1.jpg") as mock_request_animal_url:
+        rejected_trial_url = animal_service.get_animal_url("dog")
+        animal_url = animal_service.get_animal_url("dog")
+
+    # Assert
+    assert rejected_trial_url == ""
+    mock_request_animal_url.assert_called_once_with("dog")
+    assert animal_url == "https://random.dog/1.jpg"
+    assert circuit_breaker.state == "closed"
+
+
+def test_unexpected_error_is_recorded_by_the_circuit_breaker():
+
+    # Arrange
+    animal_service = AnimalService()
+    circuit_breaker = animal_service._circuit_breakers["dog"]
+
+    # Act
+    with patch.object(circuit_breaker, "record") as mock_record:
+        with patch.object(animal_service, "_request_animal_url", side_effect=AttributeError("'list' object has no attribute 'get'")):
+            with pytest.raises(AttributeError):
+                animal_service.get_animal_url("dog")
+
+    # Assert
+    assert mock_record.call_args[1]["success"] is False
+
+
+@pytest.mark.parametrize("status_code", [400, 404])
+def test_get_animal_url_raises_permanent_error_status(status_code):
+
+    # Arrange
+    animal_service = AnimalService()
+    failed_response = Mock(ok=False, status_code=status_code, headers={}, text="error")
+
+    # Act / Assert
+    with patch.object(animal_service.transport, "get", return_value=failed_response):
+        with pytest.raises(AnimalApiError) as exception_info:
+            animal_service.get_animal_url("duck")
+
+    assert exception_info.value.status_code == status_code
+
+
+@pytest.mark.parametrize("status_code", [500, 503])
+def test_get_animal_url_returns_empty_url_on_transient_error_status(status_code):
+
+    # Arrange
+    animal_service = AnimalService()
+    failed_response = Mock(ok=False, status_code=status_code, headers={}, text="error")
+
+    # Act
+    with patch.object(animal_service.transport, "get", return_value=failed_response):
+        animal_url = animal_service.get_animal_url("duck")
+
+    # Assert
+    assert animal_url == ""
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import httpx
+
+from unittest.mock import Mock, patch
+
+from src.service.async_camunda_service import AsyncCamundaService
+from src.service.async_animal_api_service import AsyncAnimalService
+from src.service.camunda_service import CamundaService
+
+BASE_URL = "https://zeebe.test"
+AUTH_URL = "https://login.test/oauth/token"
+
+def create_service(handler) -> AsyncCamundaService:
+    """
+    Helper method that creates an AsyncCamundaService whose requests are answered by the handler
+
+    Returns:
+        AsyncCamundaService: Service under test
+    """
+
+    return AsyncCamundaService(
+        base_url=BASE_URL,
+        token_audience="async_test_audience",
+        client_id="async_test_client",
+        client_secret="async_test_secret",
+        auth_url=AUTH_URL,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+def test_activate_jobs_requests_token_once_for_concurrent_calls():
+
+    # Arrange
+    requests_by_path = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_by_path.append(request.url.path)
+
+        if request.url == AUTH_URL:
+            return httpx.Response(200, json={ "access_token": "async_test_token" })
+
+        assert request.headers["Authorization"] == "Bearer async_test_token"
+        assert json.loads(request.content)["type"] == "retrieve-animal-image"
+        return httpx.Response(200, json={ "jobs": [{ "jobKey": "1" }] })
+
+    async def activate_concurrently():
+        async with create_service(handler) as camunda_service:
+            return await asyncio.gather(*[
+                camunda_service.activate_jobs(service_task_job_type="retrieve-animal-image", timeout=60000, max_jobs_to_activate=1)
+                for _ in range(50)
+            ])
+
+    # Act
+    results = asyncio.run(activate_concurrently())
+
+    # Assert
+    assert results == [[{ "jobKey": "1" }]] * 50
+    assert requests_by_path.count("/oauth/token") == 1
+    assert requests_by_path.count("/v2/jobs/activation") == 50
+
+
+def test_complete_job_retries_once_on_unauthorised():
+
+    # Arrange
+    tokens = iter(["expired_token", "fresh_token"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == AUTH_URL:
+            return httpx.Response(200, json={ "access_token": next(tokens) })
+
+        if request.headers["Authorization"] == "Bearer expired_token":
+            return httpx.Response(401)
+
+        return httpx.Response(204)
+
+    async def complete_job():
+        async with create_service(handler) as camunda_service:
+            return await camunda_service.complete_job(job_key="1", variables={ "animal_url": "https://example.com/dog.jpg" })
+
+    # Act
+    result = asyncio.run(complete_job())
+
+    # Assert
+    assert result is True
+
+
+def test_create_process_instance_failure_returns_empty_string():
+
+    # Arrange
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == AUTH_URL:
+            return httpx.Response(200, json={ "access_token": "async_test_token" })
+
+        return httpx.Response(500, text="error")
+
+    async def create_process_instance():
+        async with create_service(handler) as camunda_service:
+            return await camunda_service.create_process_instance(process_model="Process_AnimalImageRetrieval", variables={ "animal": "dog" })
+
+    # Act
+    result = asyncio.run(create_process_instance())
+
+    # Assert
+    assert result == ""
+
+
+def test_async_animal_service_get_animal_url():
+
+    # Arrange
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={ "image": "https://randomfox.ca/images/1.jpg" })
+
+    async def get_animal_url():
+        async with AsyncAnimalService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler))) as animal_service:
+            return await animal_service.get_animal_url("fox")
+
+    # Act
+    result = asyncio.run(get_animal_url())
+
+    # Assert
+    assert result == "https://randomfox.ca/images/1.jpg"
+
+
+def test_async_animal_service_non_json_response_returns_empty_string():
+
+    # Arrange
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text="<html>Bad Gateway</html>")
+
+    async def get_animal_url():
+        async with AsyncAnimalService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler))) as animal_service:
+            return await animal_service.get_animal_url("fox")
+
+    # Act
+    result = asyncio.run(get_animal_url())
+
+    # Assert
+    assert result == ""
+
+
+def test_get_variable_non_json_response_returns_empty_string():
+
+    # Arrange
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == AUTH_URL:
+            return httpx.Response(200, json={ "access_token": "async_test_token" })
+
+        return httpx.Response(200, text="<html>Bad Gateway</html>")
+
+    async def get_variable():
+        async with create_service(handler) as camunda_service:
+            return await camunda_service.get_variable(process_instance_key="2251799813690000", variable_name="animal_url")
+
+    # Act
+    result = asyncio.run(get_variable())
+
+    # Assert
+    assert result == ""
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_sync_client_requests_its_own_token_after_async_client_is_created(mock_post):
+
+    # Arrange
+    create_service(lambda request: httpx.Response(200))
+
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_response.content = b'{ "access_token": "sync_test_token" }'
+    mock_post.return_value = mock_response
+
+    camunda_service = CamundaService(
+        base_url=BASE_URL,
+        token_audience="async_test_audience",
+        client_id="async_test_client",
+        client_secret="async_test_secret",
+        auth_url=AUTH_URL
+    )
+
+    # Act
+    access_token = camunda_service.access_token
+
+    # Assert
+    assert access_token == "sync_test_token"
+    assert mock_post.call_count == 1
+
+    # the token manager of the sync client is shared by all sync clients with the same client credentials
+    camunda_service.token_manager.set_token("")
+
+
+def test_get_variable_parses_quoted_value():
+
+    # Arrange
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == AUTH_URL:
+            return httpx.Response(200, json={ "access_token": "async_test_token" })
+
+        return httpx.Response(200, json={ "items": [{ "value": "\"https://random.dog/1.jpg\"" }] })
+
+    async def get_variable():
+        async with create_service(handler) as camunda_service:
+            return await camunda_service.get_variable(process_instance_key="1", variable_name="animal_url")
+
+    # Act
+    result = asyncio.run(get_variable())
+
+    # Assert
+    assert result == "https://random.dog/1.jpg"
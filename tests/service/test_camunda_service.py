@@ -1,6 +1,8 @@
+import json
 import os
 import pytest
 import requests
+import sys
 from pathlib import Path
 
 from unittest.mock import Mock, patch
@@ -44,13 +46,13 @@ def mock_headers():
     return headers
 
 
-@patch("src.service.camunda_service.requests.post")
+@patch("src.service.camunda_service.HttpTransport.post")
 def test_get_token_success(mock_post, camunda_service_client):
 
     # Arrange
     mock_response = Mock()
     mock_response.ok = True
-    mock_response.json.return_value = { "access_token": "test_token"}
+    mock_response.content = b'{ "access_token": "test_token" }'
     mock_post.return_value = mock_response
     
     # Act
@@ -74,7 +76,7 @@ def test_get_token_success(mock_post, camunda_service_client):
 
 
 @patch("src.service.camunda_service.logger")
-@patch("src.service.camunda_service.requests.post")
+@patch("src.service.camunda_service.HttpTransport.post")
 def test_get_token_response_exception(mock_post, mock_logger, camunda_service_client):
 
     # Arrange
@@ -91,7 +93,7 @@ def test_get_token_response_exception(mock_post, mock_logger, camunda_service_cl
 
 
 @patch("src.service.camunda_service.logger")
-@patch("src.service.camunda_service.requests.post")
+@patch("src.service.camunda_service.HttpTransport.post")
 def test_get_token_request_exception(mock_post, mock_logger, camunda_service_client):
    
     # Arrange
@@ -105,7 +107,7 @@ def test_get_token_request_exception(mock_post, mock_logger, camunda_service_cli
     assert "Failed to connect" in mock_logger.error.call_args[0][0]
 
 
-@patch("src.service.camunda_service.requests.get")
+@patch("src.service.camunda_service.HttpTransport.get")
 def test_get_cluster_topology_success(mock_get, camunda_service_client_with_token, mock_headers):
 
     # Arrange
@@ -128,7 +130,7 @@ def test_get_cluster_topology_success(mock_get, camunda_service_client_with_toke
 
 
 @patch("src.service.camunda_service.logger")
-@patch("src.service.camunda_service.requests.get")
+@patch("src.service.camunda_service.HttpTransport.get")
 def test_get_cluster_topology_response_exception(mock_get, mock_logger, camunda_service_client_with_token):
 
     # Arrange
@@ -146,7 +148,7 @@ def test_get_cluster_topology_response_exception(mock_get, mock_logger, camunda_
 
 
 @patch("src.service.camunda_service.logger")
-@patch("src.service.camunda_service.requests.get")
+@patch("src.service.camunda_service.HttpTransport.get")
 def test_get_cluster_topology_request_exception(mock_get, mock_logger, camunda_service_client_with_token):
 
     # Arrange
@@ -173,7 +175,7 @@ def get_deploy_resources() -> list[str]:
     resource_paths = [resources_dir + "/" + file for file in os.listdir(resources_dir)]
     return resource_paths
 
-@patch("src.service.camunda_service.requests.post")
+@patch("src.service.camunda_service.HttpTransport.post")
 def test_deploy_resources_success(mock_post, camunda_service_client_with_token):
 
     # Arrange
@@ -183,7 +185,7 @@ def test_deploy_resources_success(mock_post, camunda_service_client_with_token):
 
     mock_response = Mock()
     mock_response.ok = True
-    mock_response.json.return_value = { "deploymentKey": "test_deployment_key" }
+    mock_response.content = b'{ "deploymentKey": "test_deployment_key" }'
     mock_post.return_value = mock_response
 
     # Act
@@ -201,7 +203,7 @@ def test_deploy_resources_success(mock_post, camunda_service_client_with_token):
 
 
 @patch("src.service.camunda_service.logger")
-@patch("src.service.camunda_service.requests.post")
+@patch("src.service.camunda_service.HttpTransport.post")
 def test_deploy_resources_response_exception(mock_post, mock_logger, camunda_service_client_with_token):
 
     # Arrange
@@ -216,4 +218,273 @@ def test_deploy_resources_response_exception(mock_post, mock_logger, camunda_ser
 
     # Assert
     assert result == ""
-    assert "Failed to deploy resources" in mock_logger.error.call_args[0][0]
\ No newline at end of file
+    assert "Failed to deploy resources" in mock_logger.error.call_args[0][0]
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_deploy_resources_from_memory(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    resources = { "process.bpmn": b"<bpmn/>", "form.form": b"{}" }
+
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_response.content = b'{ "deploymentKey": "test_deployment_key" }'
+    mock_post.return_value = mock_response
+
+    # Act
+    result = camunda_service_client_with_token.deploy_resources(resources=resources)
+
+    files = mock_post.call_args[1]["files"]
+
+    # Assert
+    assert result == "test_deployment_key"
+    assert files == [
+        ('resources', ("process.bpmn", b"<bpmn/>", 'application/octet-stream')),
+        ('resources', ("form.form", b"{}", 'application/octet-stream'))
+    ]
+
+
+@patch("src.service.camunda_service.HttpTransport.get")
+def test_request_retried_once_on_unauthorised(mock_get, camunda_service_client_with_token):
+
+    # Arrange
+    unauthorised_response = Mock()
+    unauthorised_response.ok = False
+    unauthorised_response.status_code = 401
+
+    ok_response = Mock()
+    ok_response.ok = True
+    ok_response.status_code = 200
+
+    mock_get.side_effect = [unauthorised_response, ok_response]
+
+    # Act
+    with patch.object(camunda_service_client_with_token.token_manager, "fetch_token", return_value="new_test_token"):
+        result = camunda_service_client_with_token.get_cluster_topology()
+
+    # Assert
+    assert result == True
+    assert mock_get.call_count == 2
+    assert mock_get.call_args[1]["headers"]["Authorization"] == "Bearer new_test_token"
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_search_variables_returns_root_scope_values(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_response.content = json.dumps({ "items": [
+        { "processInstanceKey": "1", "scopeKey": "1", "value": "\"https://random.dog/1.jpg\"" },
+        { "processInstanceKey": "2", "scopeKey": "3", "value": "\"https://random.dog/local.jpg\"" }
+    ] }).encode()
+    mock_post.return_value = mock_response
+
+    # Act
+    result = camunda_service_client_with_token.search_variables("animal_url", ["1", "2"])
+
+    # Assert
+    assert result == { "1": "https://random.dog/1.jpg" }
+    assert json.loads(mock_post.call_args[1]["data"])["filter"]["processInstanceKey"] == { "$in": ["1", "2"] }
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_create_process_instance_awaits_completion(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_response.content = b'{ "processInstanceKey": "1", "variables": { "animal_url": "https://random.dog/1.jpg" } }'
+    mock_post.return_value = mock_response
+
+    # Act
+    result = camunda_service_client_with_token.create_process_instance(
+        process_model="Process_AnimalImageRetrieval",
+        variables={ "animal": "dog" },
+        await_completion=True,
+        request_timeout=10000,
+        fetch_variables=["animal_url"]
+    )
+
+    # Assert
+    assert result["variables"]["animal_url"] == "https://random.dog/1.jpg"
+    payload = json.loads(mock_post.call_args[1]["data"])
+    assert (payload["awaitCompletion"], payload["requestTimeout"], payload["fetchVariables"]) == (True, 10000, ["animal_url"])
+    assert mock_post.call_args[1]["timeout"][1] == camunda_service_client_with_token.transport.timeout[1] + 10
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_create_process_instance_await_timeout_returns_none(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_response = Mock()
+    mock_response.ok = False
+    mock_response.status_code = 504
+    mock_post.return_value = mock_response
+
+    # Act
+    result = camunda_service_client_with_token.create_process_instance(
+        process_model="Process_AnimalImageRetrieval", variables={ "animal": "dog" }, await_completion=True, request_timeout=10000
+    )
+
+    # Assert
+    assert result is None
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_requests_are_recorded_per_operation_and_status(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_response = Mock()
+    mock_response.ok = False
+    mock_response.status_code = 404
+    mock_post.return_value = mock_response
+
+    camunda_service_module = sys.modules[CamundaService.__module__]
+
+    # Act
+    with patch.object(camunda_service_module.REGISTRY, "enabled", True):
+        camunda_service_client_with_token.complete_job(job_key="1", variables={ "animal_url": "https://random.dog/1.jpg" })
+
+    # Assert
+    metrics = camunda_service_module.REGISTRY.render()
+    assert 'camunda_request_duration_seconds_count{operation="complete_job",status="404"} 1' in metrics
+    assert 'camunda_request_errors_total{operation="complete_job",status="404"} 1' in metrics
+
+
+@patch("src.service.camunda_service.HttpTransport.get")
+def test_connection_errors_are_retried(mock_get, camunda_service_client_with_token):
+
+    # Arrange
+    camunda_service_client_with_token.connection_retry_base_seconds = 0
+
+    ok_response = Mock()
+    ok_response.ok = True
+    ok_response.status_code = 200
+
+    mock_get.side_effect = [requests.exceptions.ConnectionError("reset"), requests.exceptions.ConnectTimeout("timeout"), ok_response]
+
+    # Act
+    result = camunda_service_client_with_token.get_cluster_topology()
+
+    # Assert
+    assert result == True
+    assert mock_get.call_count == 3
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_create_process_instance_is_only_retried_if_unsent(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    camunda_service_client_with_token.connection_retry_base_seconds = 0
+    mock_post.side_effect = [requests.exceptions.ConnectTimeout("timeout"), requests.exceptions.ConnectionError("reset")]
+
+    # Act
+    result = camunda_service_client_with_token.create_process_instance(process_model="Process_AnimalImageRetrieval", variables={ "animal": "dog" })
+
+    # Assert
+    assert result == ""
+    assert mock_post.call_count == 2
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_fail_job_sends_retries_and_backoff(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_post.return_value = mock_response
+
+    # Act
+    result = camunda_service_client_with_token.fail_job(job_key="1", error_message="timeout", retries=2, retry_back_off=5000)
+
+    # Assert
+    assert result == True
+    payload = json.loads(mock_post.call_args[1]["data"])
+    assert (payload["retries"], payload["retryBackOff"]) == (2, 5000)
+
+
+def create_search_response(items: list, end_cursor: str) -> Mock:
+
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_response.status_code = 200
+    mock_response.content = json.dumps({ "items": items, "page": { "totalItems": 5, "endCursor": end_cursor } }).encode()
+
+    return mock_response
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_iter_jobs_follows_cursors_until_the_last_page(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_post.side_effect = [
+        create_search_response([{ "jobKey": "1" }, { "jobKey": "2" }], "cursor-1"),
+        create_search_response([{ "jobKey": "3" }, { "jobKey": "4" }], "cursor-2"),
+        create_search_response([{ "jobKey": "5" }], "cursor-3")
+    ]
+
+    # Act
+    jobs = camunda_service_client_with_token.iter_jobs({ "type": "retrieve-animal-image" }, page_size=2)
+
+    # Assert
+    assert mock_post.call_count == 0
+    assert [job["jobKey"] for job in jobs] == ["1", "2", "3", "4", "5"]
+
+    payloads = [json.loads(call[1]["data"]) for call in mock_post.call_args_list]
+    assert [payload["page"] for payload in payloads] == [{ "limit": 2 }, { "limit": 2, "after": "cursor-1" }, { "limit": 2, "after": "cursor-2" }]
+    assert all(payload["filter"] == { "type": "retrieve-animal-image" } for payload in payloads)
+    assert mock_post.call_args[1]["url"].endswith("/v2/jobs/search")
+
+
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_iter_variables_prefetches_only_the_next_page(mock_post, camunda_service_client_with_token):
+
+    # Arrange
+    mock_post.side_effect = [create_search_response([{ "name": "animal_url" }] * 2, f"cursor-{page}") for page in range(10)]
+
+    # Act
+    variables = camunda_service_client_with_token.iter_variables({ "name": "animal_url" }, page_size=2)
+    first_variable = next(variables)
+    variables.close()
+
+    # Assert
+    assert first_variable == { "name": "animal_url" }
+    assert mock_post.call_count == 2
+    assert mock_post.call_args[1]["url"].endswith("/v2/variables/search")
+
+
+@patch("src.service.camunda_service.logger")
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_iter_jobs_raises_when_a_page_fails(mock_post, mock_logger, camunda_service_client_with_token):
+
+    # Arrange
+    failed_response = requests.Response()
+    failed_response.status_code = 500
+
+    mock_post.side_effect = [create_search_response([{ "jobKey": "1" }], "cursor-1"), failed_response]
+
+    # Act / Assert
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(camunda_service_client_with_token.iter_jobs(page_size=1))
+
+    assert "Failed to search" in mock_logger.error.call_args[0][0]
+
+
+@patch("src.service.camunda_service.logger")
+@patch("src.service.camunda_service.HttpTransport.post")
+def test_throw_error_job_logs_payload_lazily(mock_post, mock_logger, camunda_service_client_with_token):
+
+    # Arrange
+    mock_response = Mock()
+    mock_response.ok = True
+    mock_post.return_value = mock_response
+
+    # Act
+    camunda_service_client_with_token.throw_error_job(job_key="1", error_code="2", error_message="video")
+
+    # Assert
+    payload_argument = mock_logger.debug.call_args_list[0][0][2]
+    assert not isinstance(payload_argument, (str, bytes))
+    assert json.loads(str(payload_argument))["errorCode"] == "2"
+    assert json.loads(mock_post.call_args[1]["data"])["errorCode"] == "2"
@@ -0,0 +1,94 @@
+import threading
+import time
+import pytest
+
+from unittest.mock import Mock
+from src.helpers.asset_store import AssetStore
+from src.service.deployment_registry import DeploymentRegistry
+
+@pytest.fixture
+def asset_dir(tmp_path):
+
+    (tmp_path / "process.bpmn").write_bytes(b"<bpmn/>")
+    (tmp_path / "form.form").write_bytes(b"{}")
+
+    return tmp_path
+
+@pytest.fixture
+def mock_camunda_service():
+
+    camunda_service = Mock()
+    camunda_service.deploy_resources.return_value = "test_deployment_key"
+
+    return camunda_service
+
+
+def test_get_or_deploy_deploys_once(asset_dir, mock_camunda_service):
+
+    # Arrange
+    registry = DeploymentRegistry(asset_store=AssetStore(asset_dir=str(asset_dir)))
+
+    # Act
+    first_key = registry.get_or_deploy(mock_camunda_service)
+    second_key = registry.get_or_deploy(mock_camunda_service)
+
+    # Assert
+    assert first_key == second_key == "test_deployment_key"
+    mock_camunda_service.deploy_resources.assert_called_once()
+
+
+def test_get_or_deploy_redeploys_on_asset_change(asset_dir, mock_camunda_service):
+
+    # Arrange
+    registry = DeploymentRegistry(asset_store=AssetStore(asset_dir=str(asset_dir)))
+    registry.get_or_deploy(mock_camunda_service)
+
+    (asset_dir / "process.bpmn").write_bytes(b"<bpmn version='2'/>")
+    registry.asset_store.load()
+    mock_camunda_service.deploy_resources.return_value = "new_deployment_key"
+
+    # Act
+    result = registry.get_or_deploy(mock_camunda_service)
+
+    # Assert
+    assert result == "new_deployment_key"
+    assert mock_camunda_service.deploy_resources.call_count == 2
+
+
+def test_get_or_deploy_does_not_cache_failure(asset_dir, mock_camunda_service):
+
+    # Arrange
+    registry = DeploymentRegistry(asset_store=AssetStore(asset_dir=str(asset_dir)))
+    mock_camunda_service.deploy_resources.return_value = ""
+
+    # Act
+    registry.get_or_deploy(mock_camunda_service)
+    registry.get_or_deploy(mock_camunda_service)
+
+    # Assert
+    assert mock_camunda_service.deploy_resources.call_count == 2
+
+
+def test_get_or_deploy_collapses_concurrent_deployments(asset_dir, mock_camunda_service):
+
+    # Arrange
+    registry = DeploymentRegistry(asset_store=AssetStore(asset_dir=str(asset_dir)))
+
+    def slow_deploy(resources):
+        time.sleep(0.05)
+        return "test_deployment_key"
+
+    mock_camunda_service.deploy_resources.side_effect = slow_deploy
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get_or_deploy(mock_camunda_service))) for _ in range(8)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert results == ["test_deployment_key"] * 8
+    mock_camunda_service.deploy_resources.assert_called_once()
@@ -0,0 +1,59 @@
+import threading
+
+from src.service.process_submitter import ProcessSubmitter
+
+def test_submit_returns_before_the_process_instance_is_created():
+
+    # Arrange
+    process_submitter = ProcessSubmitter(max_workers=1)
+    release = threading.Event()
+
+    def create_process_instance():
+        release.wait()
+        return "2251799813685249", None
+
+    # Act
+    request_id = process_submitter.submit(create_process_instance, animal="fox")
+    pending = process_submitter.get_status(request_id)
+
+    release.set()
+    process_submitter.shutdown()
+
+    # Assert
+    assert pending == { "requestId": request_id, "animal": "fox", "status": "pending" }
+    assert process_submitter.get_status(request_id) == {
+        "requestId": request_id, "animal": "fox", "status": "created", "processInstanceKey": "2251799813685249"
+    }
+
+
+def test_failed_submissions_report_the_error():
+
+    # Arrange
+    process_submitter = ProcessSubmitter(max_workers=1)
+
+    def raise_error():
+        raise RuntimeError("boom")
+
+    # Act
+    failed_request_id = process_submitter.submit(lambda: ("", "Failed to deploy resources"))
+    raised_request_id = process_submitter.submit(raise_error)
+    process_submitter.shutdown()
+
+    # Assert
+    assert process_submitter.get_status(failed_request_id)["error"] == "Failed to deploy resources"
+    assert process_submitter.get_status(raised_request_id) | { "requestId": "" } == { "requestId": "", "status": "failed", "error": "boom" }
+
+
+def test_oldest_submissions_are_forgotten():
+
+    # Arrange
+    process_submitter = ProcessSubmitter(max_workers=1, max_tracked_requests=2)
+
+    # Act
+    request_ids = [process_submitter.submit(lambda: ("1", None)) for _ in range(3)]
+    process_submitter.shutdown()
+
+    # Assert
+    assert process_submitter.get_status(request_ids[0]) is None
+    assert process_submitter.get_status("unknown") is None
+    assert all(process_submitter.get_status(request_id) for request_id in request_ids[1:])
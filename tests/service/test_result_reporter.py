@@ -0,0 +1,62 @@
+import threading
+import time
+
+from unittest.mock import Mock
+from src.service.result_reporter import ResultReporter
+
+def test_outcomes_are_reported_concurrently():
+
+    # Arrange
+    camunda_service = Mock()
+    running = []
+    max_running = []
+    lock = threading.Lock()
+
+    def slow_complete_job(job_key, variables):
+        with lock:
+            running.append(job_key)
+            max_running.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(job_key)
+        return True
+
+    camunda_service.complete_job.side_effect = slow_complete_job
+
+    result_reporter = ResultReporter(camunda_service, senders=4)
+
+    # Act
+    start = time.monotonic()
+    for job_key in range(4):
+        result_reporter.complete_job(job_key=str(job_key), variables={ "animal_url": "https://random-d.uk/api/1.jpg" })
+    enqueue_duration = time.monotonic() - start
+
+    result_reporter.flush()
+    result_reporter.close()
+
+    # Assert
+    assert enqueue_duration < 0.1
+    assert max(max_running) == 4
+    assert result_reporter.get_stats() == { "reported": 4, "retried": 0, "dropped": 0, "queued": 0 }
+
+
+def test_failed_reports_are_retried_up_to_max_attempts():
+
+    # Arrange
+    camunda_service = Mock()
+    camunda_service.throw_error_job.side_effect = [False, True]
+    camunda_service.fail_job.return_value = False
+
+    result_reporter = ResultReporter(camunda_service, senders=1, max_attempts=3, retry_base_seconds=0.01)
+
+    # Act
+    result_reporter.throw_error_job(job_key="1", error_code="1", error_message="Failed to get animal image for duck.")
+    result_reporter.fail_job(job_key="2", error_message="boom")
+    result_reporter.flush()
+    result_reporter.close()
+
+    # Assert
+    assert camunda_service.throw_error_job.call_count == 2
+    assert camunda_service.throw_error_job.call_args[1] == { "job_key": "1", "error_code": "1", "error_message": "Failed to get animal image for duck." }
+    assert camunda_service.fail_job.call_count == 3
+    assert result_reporter.get_stats() == { "reported": 1, "retried": 3, "dropped": 1, "queued": 0 }
@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import json
+import threading
+import time
+import pytest
+
+from unittest.mock import AsyncMock, Mock
+from src.service.token_manager import AsyncTokenManager, TokenCache, TokenManager
+
+def make_jwt(expires_at: float) -> str:
+    """
+    Helper method that builds an unsigned JWT with the given expiry
+
+    Returns:
+        str: JWT access token
+    """
+
+    payload = base64.urlsafe_b64encode(json.dumps({ "exp": expires_at }).encode("utf-8")).decode("utf-8").rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def test_decode_expiry():
+
+    # Arrange
+    expires_at = time.time() + 3600
+
+    # Act / Assert
+    assert TokenManager.decode_expiry(make_jwt(expires_at)) == pytest.approx(expires_at)
+    assert TokenManager.decode_expiry("not_a_jwt") is None
+
+
+def test_get_token_reuses_valid_token():
+
+    # Arrange
+    fetch_token = Mock(return_value=make_jwt(time.time() + 3600))
+    token_manager = TokenManager(fetch_token=fetch_token)
+
+    # Act
+    first_token = token_manager.get_token()
+    second_token = token_manager.get_token()
+
+    # Assert
+    assert first_token == second_token
+    fetch_token.assert_called_once()
+
+
+def test_get_token_refreshes_expired_token():
+
+    # Arrange
+    fresh_token = make_jwt(time.time() + 3600)
+    fetch_token = Mock(side_effect=[make_jwt(time.time() - 10), fresh_token])
+    token_manager = TokenManager(fetch_token=fetch_token)
+    token_manager.get_token()
+
+    # Act
+    result = token_manager.get_token()
+
+    # Assert
+    assert result == fresh_token
+    assert fetch_token.call_count == 2
+
+
+def test_get_token_collapses_concurrent_refreshes():
+
+    # Arrange
+    def slow_fetch_token():
+        time.sleep(0.05)
+        return make_jwt(time.time() + 3600)
+
+    fetch_token = Mock(side_effect=slow_fetch_token)
+    token_manager = TokenManager(fetch_token=fetch_token)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(token_manager.get_token())) for _ in range(8)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert len(set(results)) == 1
+    fetch_token.assert_called_once()
+
+
+def test_refresh_ahead_of_expiry_in_background():
+
+    # Arrange
+    fresh_token = make_jwt(time.time() + 3600)
+    fetch_token = Mock(return_value=fresh_token)
+    token_manager = TokenManager(fetch_token=fetch_token, refresh_margin=60)
+
+    # Act
+    token_manager.set_token(make_jwt(time.time() + 60.05))
+    time.sleep(0.2)
+
+    # Assert
+    assert token_manager.get_token() == fresh_token
+    fetch_token.assert_called_once()
+
+
+def test_invalidate_discards_current_token():
+
+    # Arrange
+    fetch_token = Mock(side_effect=["first_token", "second_token"])
+    token_manager = TokenManager(fetch_token=fetch_token)
+    token_manager.get_token()
+
+    # Act
+    token_manager.invalidate("first_token")
+
+    # Assert
+    assert token_manager.get_token() == "second_token"
+
+
+def test_token_cache_shares_token_between_managers(tmp_path):
+
+    # Arrange
+    token = make_jwt(time.time() + 3600)
+    first_fetch_token = Mock(return_value=token)
+    second_fetch_token = Mock(return_value=make_jwt(time.time() + 3600))
+
+    first_token_manager = TokenManager(fetch_token=first_fetch_token, token_cache=TokenCache(str(tmp_path / "access_token")))
+    second_token_manager = TokenManager(fetch_token=second_fetch_token, token_cache=TokenCache(str(tmp_path / "access_token")))
+
+    # Act
+    first_token = first_token_manager.get_token()
+    second_token = second_token_manager.get_token()
+
+    # Assert
+    assert first_token == second_token == token
+    first_fetch_token.assert_called_once()
+    second_fetch_token.assert_not_called()
+
+
+def test_token_cache_replaces_rejected_token(tmp_path):
+
+    # Arrange
+    rejected_token = make_jwt(time.time() + 3600)
+    fresh_token = make_jwt(time.time() + 7200)
+    fetch_token = Mock(side_effect=[rejected_token, fresh_token])
+    token_manager = TokenManager(fetch_token=fetch_token, token_cache=TokenCache(str(tmp_path / "access_token")))
+    token_manager.get_token()
+
+    # Act
+    token_manager.invalidate(rejected_token)
+    result = token_manager.refresh(stale_token=rejected_token)
+
+    # Assert
+    assert result == fresh_token
+    assert (tmp_path / "access_token").read_text() == fresh_token
+
+
+def test_async_token_manager_refreshes_ahead_of_expiry_on_the_loop():
+
+    # Arrange
+    expiring_token = make_jwt(time.time() + 30)
+    fresh_token = make_jwt(time.time() + 3600)
+    fetch_token = AsyncMock(side_effect=[expiring_token, fresh_token])
+    token_manager = AsyncTokenManager(fetch_token=fetch_token)
+
+    async def get_tokens():
+        first_token = await token_manager.get_token()
+        second_token = await token_manager.get_token()
+        await asyncio.sleep(0)
+        token_manager.invalidate("unknown_token")
+
+        return first_token, second_token, await token_manager.get_token()
+
+    # Act
+    first_token, second_token, third_token = asyncio.run(get_tokens())
+
+    # Assert
+    assert first_token == second_token == expiring_token
+    assert third_token == fresh_token
+    assert fetch_token.await_count == 2
@@ -0,0 +1,57 @@
+from unittest.mock import Mock
+from src.service.variable_poller import VariablePoller
+
+def test_poll_looks_up_watched_instances_in_batches():
+
+    # Arrange
+    camunda_service = Mock()
+    camunda_service.search_variables.side_effect = lambda name, keys: { key: f"https://random.dog/{key}.jpg" for key in keys if key != "3" }
+
+    variable_poller = VariablePoller(lambda: camunda_service, "animal_url", poll_interval=60, batch_size=2)
+    variable_poller._poller = Mock()
+
+    futures = { key: variable_poller.watch(key) for key in ["1", "2", "3"] }
+
+    # Act
+    variable_poller.poll()
+
+    # Assert
+    assert camunda_service.search_variables.call_count == 2
+    assert futures["1"].result(timeout=0) == "https://random.dog/1.jpg"
+    assert futures["2"].result(timeout=0) == "https://random.dog/2.jpg"
+    assert not futures["3"].done()
+    assert variable_poller.get_watched_count() == 1
+
+
+def test_watchers_of_the_same_instance_share_the_result():
+
+    # Arrange
+    camunda_service = Mock()
+    camunda_service.search_variables.return_value = { "1": "https://random.dog/1.jpg" }
+
+    variable_poller = VariablePoller(lambda: camunda_service, "animal_url", poll_interval=0.01)
+
+    # Act
+    first = variable_poller.watch("1")
+    second = variable_poller.watch("1")
+
+    # Assert
+    assert first is second
+    assert first.result(timeout=5) == "https://random.dog/1.jpg"
+
+
+def test_expired_instances_resolve_to_empty_value():
+
+    # Arrange
+    camunda_service = Mock()
+    variable_poller = VariablePoller(lambda: camunda_service, "animal_url", max_wait_seconds=0)
+    variable_poller._poller = Mock()
+
+    future = variable_poller.watch("1")
+
+    # Act
+    variable_poller.poll()
+
+    # Assert
+    assert future.result(timeout=0) == ""
+    camunda_service.search_variables.assert_not_called()
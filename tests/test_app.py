@@ -1,6 +1,12 @@
+import dataclasses
+import threading
+import time
 import pytest
 from flask import Flask
+from concurrent.futures import Future
+from unittest.mock import patch
 import src.app as web_app
+from src.helpers.config import get_config
 
 app = Flask(__name__)
 
@@ -14,4 +20,171 @@ def test_home_route(setup):
     html_content = response.data.decode("utf-8")
 
     assert response.status_code == 200
-    assert "<h2>Animal Image Retrieval</h2>" in html_content
\ No newline at end of file
+    assert "<h2>Animal Image Retrieval</h2>" in html_content
+
+def test_submit_route_returns_request_id(setup):
+
+    # Arrange
+    with patch("src.app.process_submitter") as mock_process_submitter:
+        mock_process_submitter.submit.return_value = "abc"
+
+        # Act
+        response = pytest.app_test_client.post("/submit", json={ "animal": "dog" })
+
+    # Assert
+    assert response.status_code == 202
+    assert response.get_json() == { "requestId": "abc", "statusUrl": "/status/abc" }
+    assert mock_process_submitter.submit.call_args[1] == { "animal": "dog" }
+
+
+def test_status_route_reports_process_instance_state(setup):
+
+    # Arrange
+    with patch("src.app.start_process_instance", return_value=("2251799813685249", None)), \
+         patch("src.app.initialise_camunda_service") as mock_initialise_camunda_service:
+        mock_initialise_camunda_service.return_value.get_process_instance.return_value = { "state": "ACTIVE" }
+
+        request_id = web_app.process_submitter.submit(lambda: web_app.start_process_instance("dog"), animal="dog")
+
+        # Act
+        response = pytest.app_test_client.get(f"/status/{request_id}")
+        while response.get_json()["status"] == "pending":
+            response = pytest.app_test_client.get(f"/status/{request_id}")
+
+    # Assert
+    assert response.get_json() == {
+        "requestId": request_id, "animal": "dog", "status": "created", "processInstanceKey": "2251799813685249", "state": "ACTIVE"
+    }
+    assert pytest.app_test_client.get("/status/unknown").status_code == 404
+
+
+def test_submit_route_rejects_unknown_animal(setup):
+
+    # Act
+    response = pytest.app_test_client.post("/submit", data={ "animal": "cat" })
+
+    # Assert
+    assert response.status_code == 400
+
+
+def test_stream_route_sends_animal_url(setup):
+
+    # Arrange
+    future = Future()
+    future.set_result("https://random.dog/1.jpg")
+
+    with patch.object(web_app.animal_url_poller, "watch", return_value=future):
+
+        # Act
+        response = pytest.app_test_client.get("/stream/2251799813685249")
+
+    # Assert
+    assert response.mimetype == "text/event-stream"
+    assert response.data.decode("utf-8") == "event: animal_url\ndata: https://random.dog/1.jpg\n\n"
+
+
+def test_home_await_mode_renders_image(setup):
+
+    # Arrange
+    await_config = dataclasses.replace(get_config(), web_app=dataclasses.replace(get_config().web_app, submit_mode="await"))
+
+    with patch("src.app.get_config", return_value=await_config), \
+         patch("src.app.start_process_instance", return_value=({ "variables": { "animal_url": "https://random.dog/1.jpg" } }, None)):
+
+        # Act
+        response = pytest.app_test_client.post("/", data={ "animal": "dog" })
+
+    # Assert
+    assert '<img src="https://random.dog/1.jpg"' in response.data.decode("utf-8")
+
+
+def test_home_await_mode_falls_back_to_async_on_timeout(setup):
+
+    # Arrange
+    await_config = dataclasses.replace(get_config(), web_app=dataclasses.replace(get_config().web_app, submit_mode="await"))
+
+    with patch("src.app.get_config", return_value=await_config), \
+         patch("src.app.start_process_instance", return_value=(None, None)), \
+         patch("src.app.process_submitter") as mock_process_submitter:
+        mock_process_submitter.submit.return_value = "abc"
+
+        # Act
+        response = pytest.app_test_client.post("/", data={ "animal": "dog" })
+
+    # Assert
+    assert "Request ID: abc" in response.data.decode("utf-8")
+    mock_process_submitter.submit.assert_called_once()
+
+
+def test_create_requests_route_returns_result_per_request(setup):
+
+    # Arrange
+    with patch("src.app.prepare_camunda_service") as mock_prepare_camunda_service:
+        mock_camunda_service = mock_prepare_camunda_service.return_value[0]
+        mock_prepare_camunda_service.return_value = (mock_camunda_service, None)
+        mock_camunda_service.create_process_instance.side_effect = lambda process_model, variables: "1" if variables["animal"] == "dog" else ""
+
+        # Act
+        response = pytest.app_test_client.post("/api/requests", json={ "requests": [{ "animal": "dog" }, { "animal": "cat" }, { "animal": "fox" }] })
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json()["created"] == 1
+    assert response.get_json()["results"] == [
+        { "animal": "dog", "processInstanceKey": "1" },
+        { "animal": "cat", "error": "Unknown animal 'cat'." },
+        { "animal": "fox", "error": "Failed to create process instance" }
+    ]
+    mock_prepare_camunda_service.assert_called_once()
+
+
+def test_create_requests_route_bounds_instances_in_flight_per_request(setup):
+
+    # Arrange
+    bulk_config = dataclasses.replace(get_config(), web_app=dataclasses.replace(get_config().web_app, bulk_max_concurrency_per_request=2))
+    in_flight = { "current": 0, "max": 0 }
+    lock = threading.Lock()
+
+    def create_process_instance(process_model, variables):
+        with lock:
+            in_flight["current"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["current"])
+
+        time.sleep(0.01)
+
+        with lock:
+            in_flight["current"] -= 1
+
+        return variables["animal"]
+
+    with patch("src.app.get_config", return_value=bulk_config), \
+         patch("src.app.prepare_camunda_service") as mock_prepare_camunda_service:
+        mock_camunda_service = mock_prepare_camunda_service.return_value[0]
+        mock_prepare_camunda_service.return_value = (mock_camunda_service, None)
+        mock_camunda_service.create_process_instance.side_effect = create_process_instance
+
+        # Act
+        response = pytest.app_test_client.post("/api/requests", json=[{ "animal": animal } for animal in ["dog", "duck", "fox"] * 4])
+
+    # Assert
+    assert response.get_json()["created"] == 12
+    assert [result["processInstanceKey"] for result in response.get_json()["results"]] == ["dog", "duck", "fox"] * 4
+    assert in_flight["max"] == 2
+
+
+def test_create_requests_route_rejects_invalid_body(setup):
+
+    # Act
+    response = pytest.app_test_client.post("/api/requests", json={ "requests": "dog" })
+
+    # Assert
+    assert response.status_code == 400
+
+
+def test_metrics_route_is_not_found_while_disabled(setup):
+
+    # Act
+    response = pytest.app_test_client.get("/metrics")
+
+    # Assert
+    assert response.status_code == 404